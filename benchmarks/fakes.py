@@ -0,0 +1,439 @@
+# 벤치마크용 로컬 대역 - Reddit 목록 서버, 메모리 워크시트, Ollama 호환 LLM 스텁, WordPress REST 엔드포인트
+#
+# 네트워크 없이 main 파이프라인 전체를 돌릴 수 있도록 실제 클라이언트 코드(praw, gspread 호출,
+# OllamaProvider, requests)는 그대로 두고 상대편만 같은 프로세스 안에서 흉내낸다.
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urlparse
+
+from gspread.exceptions import WorksheetNotFound
+from gspread.utils import a1_range_to_grid_range
+
+LOREM = ("오늘 발표된 내용은 업계 전반에 큰 영향을 줄 것으로 보입니다. 전문가들은 향후 시장의 흐름이 "
+         "빠르게 바뀔 수 있다고 전망하며, 관련 기업들의 대응 전략에 관심이 모이고 있습니다. ")
+VOCABULARY = LOREM.split() + [f"키워드{n}" for n in range(500)]
+
+
+def article_text(seed: str, words: int = 120) -> str:
+    """기사마다 다른 본문 (내용 지문/SimHash 중복 제거에 걸리지 않도록)"""
+    rng = random.Random(seed)
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+
+class CallCounter:
+    """대역 서비스별 호출 횟수 (스레드 안전)"""
+
+    def __init__(self):
+        self._counts: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, name: str):
+        with self._lock:
+            self._counts[name] += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(sorted(self._counts.items()))
+
+
+# ---------------------------------------------------------------------------
+# 메모리 워크시트 (gspread Spreadsheet/Worksheet 중 spreadsheet.py가 쓰는 부분만)
+# ---------------------------------------------------------------------------
+
+def _grid(range_name: str):
+    """A1 범위 -> (시작 행, 끝 행, 시작 열, 끝 열) 0부터, 끝은 미포함 (열린 범위는 None)"""
+    grid = a1_range_to_grid_range(range_name)
+    return (grid.get("startRowIndex", 0), grid.get("endRowIndex"),
+            grid.get("startColumnIndex", 0), grid.get("endColumnIndex"))
+
+
+class MemoryWorksheet:
+    def __init__(self, spreadsheet: "MemorySpreadsheet", sheet_id: int, title: str, rows: int = 1000):
+        self._spreadsheet = spreadsheet
+        self.id = sheet_id
+        self.title = title
+        self.row_count = rows
+        self.rows: List[List[str]] = []
+
+    def _count(self, method: str):
+        self._spreadsheet.calls.add(f"sheets.{method}")
+
+    def _set(self, row: int, col: int, value):
+        while len(self.rows) <= row:
+            self.rows.append([])
+        cells = self.rows[row]
+        while len(cells) <= col:
+            cells.append("")
+        cells[col] = "" if value is None else str(value)
+
+    def row_values(self, row: int) -> List[str]:
+        self._count("row_values")
+        values = self.rows[row - 1] if row - 1 < len(self.rows) else []
+        while values and values[-1] == "":
+            values = values[:-1]
+        return list(values)
+
+    def update(self, values: List[List], range_name: str = "A1"):
+        self._count("update")
+        start_row, _, start_col, _ = _grid(range_name)
+        for r, row in enumerate(values):
+            for c, value in enumerate(row):
+                self._set(start_row + r, start_col + c, value)
+
+    def update_cell(self, row: int, col: int, value):
+        self._count("update_cell")
+        self._set(row - 1, col - 1, value)
+
+    def append_rows(self, values: List[List], **kwargs):
+        self._count("append_rows")
+        # 실제 시트처럼 마지막으로 값이 있는 행 다음부터 추가
+        last = len(self.rows)
+        while last > 0 and not any(self.rows[last - 1]):
+            last -= 1
+        del self.rows[last:]
+        for row in values:
+            self.rows.append(["" if value is None else str(value) for value in row])
+        self.row_count = max(self.row_count, len(self.rows))
+
+    def batch_get(self, ranges: List[str], major_dimension: Optional[str] = None, **kwargs):
+        self._count("batch_get")
+        result = []
+        for range_name in ranges:
+            start_row, end_row, start_col, end_col = _grid(range_name)
+            end_row = len(self.rows) if end_row is None else min(end_row, len(self.rows))
+            width = max((len(row) for row in self.rows), default=0)
+            end_col = width if end_col is None else end_col
+            block = [
+                [self.rows[r][c] if c < len(self.rows[r]) else "" for c in range(start_col, end_col)]
+                for r in range(start_row, end_row)
+            ]
+            if major_dimension in ("COLUMNS", "cols"):
+                block = [list(column) for column in zip(*block)] if block else []
+            # API처럼 뒤쪽 빈 값은 잘라서 반환
+            trimmed = []
+            for line in block:
+                while line and line[-1] == "":
+                    line = line[:-1]
+                trimmed.append(line)
+            while trimmed and not trimmed[-1]:
+                trimmed.pop()
+            result.append(trimmed)
+        return result
+
+
+class MemorySpreadsheet:
+    def __init__(self, calls: Optional[CallCounter] = None):
+        self.calls = calls or CallCounter()
+        self._sheets: List[MemoryWorksheet] = []
+        self._next_id = 1
+
+    def worksheet(self, title: str) -> MemoryWorksheet:
+        self.calls.add("sheets.worksheet")
+        for sheet in self._sheets:
+            if sheet.title == title:
+                return sheet
+        raise WorksheetNotFound(title)
+
+    def worksheets(self) -> List[MemoryWorksheet]:
+        self.calls.add("sheets.worksheets")
+        return list(self._sheets)
+
+    def add_worksheet(self, title: str, rows=1000, cols=26, sheet_id: Optional[int] = None) -> MemoryWorksheet:
+        self.calls.add("sheets.add_worksheet")
+        if sheet_id is None:
+            sheet_id, self._next_id = self._next_id, self._next_id + 1
+        sheet = MemoryWorksheet(self, sheet_id, title, int(rows))
+        self._sheets.append(sheet)
+        return sheet
+
+    def _by_id(self, sheet_id: int) -> MemoryWorksheet:
+        return next(sheet for sheet in self._sheets if sheet.id == sheet_id)
+
+    def batch_update(self, body: dict):
+        """spreadsheet.py가 보내는 요청 종류만 처리"""
+        self.calls.add("sheets.batch_update")
+        for request in body.get("requests", []):
+            (kind, payload), = request.items()
+            if kind == "updateSheetProperties":
+                props = payload["properties"]
+                sheet = self._by_id(props["sheetId"])
+                if "title" in props:
+                    sheet.title = props["title"]
+                row_count = props.get("gridProperties", {}).get("rowCount")
+                if row_count is not None:
+                    sheet.row_count = row_count
+                    del sheet.rows[row_count:]
+            elif kind == "appendDimension":
+                self._by_id(payload["sheetId"]).row_count += payload["length"]
+            elif kind == "addSheet":
+                props = payload["properties"]
+                self.calls.add("sheets.add_worksheet")
+                self._sheets.append(MemoryWorksheet(self, props["sheetId"], props["title"]))
+            elif kind == "deleteSheet":
+                self._sheets.remove(self._by_id(payload["sheetId"]))
+            elif kind == "updateCells":
+                start = payload["start"]
+                sheet = self._by_id(start["sheetId"])
+                for r, row in enumerate(payload["rows"]):
+                    for c, cell in enumerate(row["values"]):
+                        value = next(iter(cell["userEnteredValue"].values()))
+                        sheet._set(start.get("rowIndex", 0) + r, start.get("columnIndex", 0) + c, value)
+            else:
+                raise NotImplementedError(kind)
+        return {"replies": []}
+
+
+# ---------------------------------------------------------------------------
+# HTTP 대역 (Reddit / Ollama / WordPress)
+# ---------------------------------------------------------------------------
+
+class _Handler(BaseHTTPRequestHandler):
+    service = None  # FakeService 인스턴스 (서버마다 서브클래스로 주입)
+    protocol_version = "HTTP/1.1"  # 스트리밍 응답에 chunked 전송을 쓰기 위함
+
+    def log_message(self, format, *args):
+        pass
+
+    def _body(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        if not raw:
+            return {}
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return {"raw": raw.decode("utf-8", "replace")}
+
+    def _reply(self, status: int, payload):
+        if isinstance(payload, Iterator):
+            return self._reply_stream(status, payload)
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _reply_stream(self, status: int, chunks: Iterator[dict]):
+        """NDJSON 스트리밍 응답 (실제 Ollama처럼 chunked 전송), 클라이언트가 끊으면 생성 중단"""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for chunk in chunks:
+                line = json.dumps(chunk, ensure_ascii=False).encode("utf-8") + b"\n"
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+        finally:
+            chunks.close()
+
+    def do_GET(self):
+        status, payload = self.service.handle("GET", urlparse(self.path), {})
+        self._reply(status, payload)
+
+    def do_POST(self):
+        status, payload = self.service.handle("POST", urlparse(self.path), self._body())
+        self._reply(status, payload)
+
+
+class FakeService:
+    """ThreadingHTTPServer 하나를 127.0.0.1 임의 포트로 띄우는 대역 서비스"""
+
+    name = "fake"
+
+    def __init__(self, calls: CallCounter):
+        self.calls = calls
+        handler = type(f"{type(self).__name__}Handler", (_Handler,), {"service": self})
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name=self.name, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def handle(self, method: str, url, body: dict):
+        raise NotImplementedError
+
+
+class FakeReddit(FakeService):
+    """praw가 호출하는 토큰 발급 + /r/<sub>/top, /r/<sub>/hot 목록"""
+
+    name = "reddit"
+
+    def __init__(self, calls: CallCounter, posts_per_subreddit: Dict[str, int]):
+        super().__init__(calls)
+        self.posts_per_subreddit = posts_per_subreddit
+
+    def handle(self, method, url, body):
+        if url.path.startswith("/api/v1/access_token"):
+            self.calls.add("reddit.access_token")
+            return 200, {"access_token": "bench", "token_type": "bearer", "expires_in": 86400, "scope": "*"}
+
+        match = re.match(r"^/r/([^/]+)/(top|hot)", url.path)
+        if not match:
+            return 404, {"error": 404}
+        subreddit, listing = match.groups()
+        self.calls.add(f"reddit.{listing}")
+        now = int(time.time())
+        children = [
+            {"kind": "t3", "data": {
+                "id": f"{subreddit}{i}",
+                "name": f"t3_{subreddit}{i}",
+                "title": f"[{subreddit}] 벤치마크 주제 {i}",
+                "selftext": article_text(f"{subreddit}{i}"),
+                "url": f"https://example.com/{subreddit}/{i}",
+                "created_utc": now - i * 60,
+                "score": 1000 - i,
+                "subreddit": subreddit,
+            }}
+            for i in range(self.posts_per_subreddit.get(subreddit, 0))
+        ]
+        return 200, {"kind": "Listing", "data": {"after": None, "before": None, "children": children}}
+
+
+def _fill(schema: dict, defs: dict, prompt: str, output_tokens: int):
+    """JSON 스키마를 만족하는 값 생성 (정수 배열은 프롬프트의 '정확히 N개'만큼 1..N)"""
+    if "$ref" in schema:
+        return _fill(defs[schema["$ref"].split("/")[-1]], defs, prompt, output_tokens)
+    if "anyOf" in schema:
+        return _fill(next(s for s in schema["anyOf"] if s.get("type") != "null"), defs, prompt, output_tokens)
+    kind = schema.get("type")
+    if kind == "object":
+        return {
+            name: _fill(prop, defs, prompt, output_tokens) if name == "content"
+            else _fill(prop, defs, prompt, 8)
+            for name, prop in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        items = schema.get("items", {})
+        if items.get("type") == "integer":
+            match = re.search(r"정확히 (\d+)개", prompt)
+            return list(range(1, int(match.group(1)) + 1 if match else 6))
+        # 객체 배열은 프롬프트의 [1], [2] ... 항목 수만큼 만들고 index 필드를 순서대로 채움
+        count = len(re.findall(r"^\[\d+\]$", prompt, re.M)) or max(1, schema.get("minItems", 2))
+        values = [_fill(items, defs, prompt, output_tokens) for _ in range(count)]
+        for position, value in enumerate(values, start=1):
+            if isinstance(value, dict) and "index" in value:
+                value["index"] = position
+        return values
+    if kind == "integer":
+        return 1
+    if kind == "number":
+        return 0.5
+    if kind == "boolean":
+        return True
+    # 문자열은 대략 토큰 수(한 글자 ~ 1토큰)에 맞춰 만들고 스키마 길이 제한을 지킴
+    text = (LOREM * (output_tokens // len(LOREM) + 1))[:max(output_tokens, schema.get("minLength", 1))]
+    if schema.get("maxLength"):
+        text = text[:schema["maxLength"]]
+    return text
+
+
+class FakeOllama(FakeService):
+    """OllamaProvider가 쓰는 /api/tags, /api/generate - 지연 시간과 토큰 생성 속도를 설정 가능"""
+
+    name = "ollama"
+    STREAM_CHUNKS = 20
+
+    def __init__(self, calls: CallCounter, latency: float = 0.02, tokens_per_second: float = 5000.0,
+                 output_tokens: int = 800, fail_rate: float = 0.0):
+        super().__init__(calls)
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.output_tokens = output_tokens
+        self.fail_rate = fail_rate  # 빈 응답(생성 실패)을 돌려줄 확률
+        self._random = random.Random(0)
+        self._lock = threading.Lock()
+
+    def handle(self, method, url, body):
+        if url.path == "/api/tags":
+            self.calls.add("ollama.tags")
+            return 200, {"models": [{"name": "bench"}]}
+        if url.path != "/api/generate":
+            return 404, {"error": "not found"}
+
+        self.calls.add("ollama.generate")
+        prompt = body.get("prompt", "")
+        schema = body.get("format")
+        with self._lock:
+            failed = self._random.random() < self.fail_rate
+        if failed:
+            self.calls.add("ollama.failed")
+            response = ""
+        elif isinstance(schema, dict):
+            response = json.dumps(_fill(schema, schema.get("$defs", {}), prompt, self.output_tokens), ensure_ascii=False)
+        else:
+            response = (LOREM * (self.output_tokens // len(LOREM) + 1))[:self.output_tokens]
+
+        eval_seconds = self.output_tokens / self.tokens_per_second
+        final = {
+            "model": body.get("model"),
+            "response": response,
+            "done": True,
+            "prompt_eval_count": len(prompt),
+            "prompt_eval_duration": int(self.latency * 1e9),
+            "eval_count": self.output_tokens,
+            "eval_duration": int(eval_seconds * 1e9),
+            "load_duration": 0,
+        }
+        if not body.get("stream", True):
+            time.sleep(self.latency + eval_seconds)
+            return 200, final
+        return 200, self._stream(final, eval_seconds)
+
+    def _stream(self, final: dict, eval_seconds: float) -> Iterator[dict]:
+        """응답을 STREAM_CHUNKS개 조각으로 나눠 생성 속도에 맞춰 보냄 (중간에 끊기면 ollama.cancelled 집계)"""
+        response = final["response"]
+        size = max(1, -(-len(response) // self.STREAM_CHUNKS))
+        finished = False
+        try:
+            time.sleep(self.latency)
+            for start in range(0, len(response), size):
+                time.sleep(eval_seconds / self.STREAM_CHUNKS)
+                yield {"model": final["model"], "response": response[start:start + size], "done": False}
+            yield {**final, "response": ""}
+            finished = True
+        finally:
+            if not finished:
+                self.calls.add("ollama.cancelled")
+
+
+class FakeWordPress(FakeService):
+    """WordPress.com REST API의 /wp/v2/sites/<site>/posts"""
+
+    name = "wordpress"
+
+    def __init__(self, calls: CallCounter):
+        super().__init__(calls)
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def handle(self, method, url, body):
+        match = re.match(r"^/wp/v2/sites/([^/]+)/posts$", url.path)
+        if method != "POST" or not match:
+            return 404, {"code": "rest_no_route"}
+        self.calls.add("wordpress.posts")
+        with self._lock:
+            self._next_id += 1
+            post_id = self._next_id
+        return 201, {"id": post_id, "link": f"https://{match.group(1)}.example.com/?p={post_id}", "status": body.get("status")}
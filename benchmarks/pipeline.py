@@ -0,0 +1,201 @@
+# 파이프라인 오프라인 벤치마크 - 로컬 대역(benchmarks/fakes.py)을 상대로 main.main() 전체를 실행
+#
+# 사용법 (프로젝트 루트에서):
+#   python -m benchmarks.pipeline                          # 기본 규모 (세트 1/10/50 x 주제 10/100/1000)
+#   python -m benchmarks.pipeline --sets 1,5 --topics 10,100 --llm-latency 0.2 --llm-tok-rate 40
+#
+# 규모마다 새 프로세스 + 임시 작업 디렉터리에서 실행하므로 발행 기록/체크포인트/캐시가 섞이지 않고,
+# 최대 메모리(ru_maxrss)도 규모별로 따로 측정된다. 결과 표는 콘솔에, 원본은 data/benchmarks/에 저장.
+import argparse
+import json
+import math
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULT_DIR = os.path.join(ROOT, "data", "benchmarks")
+
+DEFAULT_SETS = [1, 10, 50]
+DEFAULT_TOPICS = [10, 100, 1000]
+POSTS_PER_LISTING = 30  # reddit.fetch_reddit_posts의 top(limit=30)
+SPECULATIVE_CONCURRENCY = 8  # --speculative 사용 시 대역 Ollama 호스트의 동시 실행 제한
+STAGES = ["collect", "generate", "generate_sns", "enqueue", "publish", "clear_worksheet"]
+
+
+def _write_config(workdir: str, sets: int, topics: int, ollama_url: str, speculative: int = 0) -> Dict[str, int]:
+    """임시 작업 디렉터리에 accounts.yaml / praw.ini 작성, 서브레딧별 게시물 수 반환"""
+    import yaml
+
+    posts_per_subreddit = {}
+    account_sets = {}
+    for s in range(sets):
+        subreddits = []
+        for j in range(math.ceil(topics / POSTS_PER_LISTING)):
+            name = f"bench{s}x{j}"
+            posts_per_subreddit[name] = min(POSTS_PER_LISTING, topics - j * POSTS_PER_LISTING)
+            subreddits.append(name)
+        account_sets[f"bench_{s:02d}"] = {
+            "topic": "기술",
+            "description": "벤치마크용 세트",
+            "language": "한국어",
+            "category": ["기술"],
+            "sources": [{"type": "reddit", "subreddits": subreddits}],
+            "llm": {"provider": "ollama", "model": "bench", "base_url": ollama_url},
+            "speculative_topics": speculative,
+            "wordpress_categories": {"기술": 1},
+            "accounts": [
+                {"platform": "wordpress", "SITE_ID": 1000 + s, "OAUTH2_TOKEN": "bench"},
+                {"platform": "x", "username": f"bench{s}"},
+            ],
+        }
+
+    if speculative:
+        # 여유 후보를 실제로 동시에 생성하도록 대역 호스트의 동시 실행 제한을 풀어 줌
+        for account_set in account_sets.values():
+            account_set["llm"]["max_concurrency"] = SPECULATIVE_CONCURRENCY
+
+    with open(os.path.join(workdir, "accounts.yaml"), "w", encoding="utf-8") as f:
+        yaml.safe_dump({"account_sets": account_sets}, f, allow_unicode=True)
+    return posts_per_subreddit
+
+
+def run_worker(sets: int, topics: int, llm_latency: float, llm_tok_rate: float, llm_output_tokens: int,
+               llm_fail_rate: float = 0.0, speculative: int = 0) -> dict:
+    """현재 프로세스에서 대역을 띄우고 main.main()을 한 번 실행 (작업 디렉터리는 호출 측에서 지정)"""
+    from benchmarks.fakes import CallCounter, FakeOllama, FakeReddit, FakeWordPress, MemorySpreadsheet
+
+    calls = CallCounter()
+    ollama = FakeOllama(calls, latency=llm_latency, tokens_per_second=llm_tok_rate,
+                        output_tokens=llm_output_tokens, fail_rate=llm_fail_rate).start()
+    posts_per_subreddit = _write_config(os.getcwd(), sets, topics, ollama.url, speculative)
+    reddit = FakeReddit(calls, posts_per_subreddit).start()
+    wordpress_api = FakeWordPress(calls).start()
+
+    # praw는 작업 디렉터리의 praw.ini를 읽으므로 Reddit 주소를 대역으로 돌림
+    with open("praw.ini", "w", encoding="utf-8") as f:
+        f.write(f"[DEFAULT]\noauth_url={reddit.url}\nreddit_url={reddit.url}\ncheck_for_updates=False\n")
+    os.environ.update({
+        "CLIENT_ID": "bench", "CLIENT_SECRET": "bench", "USER_AGENT": "autopost-bench",
+        "GOOGLE_SHEET_KEY": "bench",
+    })
+
+    import main
+    from modules.publisher import wordpress
+    from modules.storage import spreadsheet
+    from modules.utils import logger
+
+    spreadsheet._spreadsheet = MemorySpreadsheet(calls)
+    wordpress.API_BASE = wordpress_api.url
+
+    started = time.perf_counter()
+    try:
+        main.main()
+    finally:
+        wall = time.perf_counter() - started
+        logger.shutdown()
+        for service in (reddit, ollama, wordpress_api):
+            service.stop()
+
+    return {
+        "sets": sets,
+        "topics": topics,
+        "wall_seconds": wall,
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "calls": calls.snapshot(),
+        "spans": logger.summary(),
+    }
+
+
+def _run_scale(sets: int, topics: int, args) -> dict:
+    """규모 하나를 새 프로세스 + 임시 디렉터리에서 실행"""
+    with tempfile.TemporaryDirectory(prefix="autopost-bench-") as workdir:
+        out_path = os.path.join(workdir, "result.json")
+        command = [
+            sys.executable, "-m", "benchmarks.pipeline", "--worker",
+            "--sets", str(sets), "--topics", str(topics),
+            "--llm-latency", str(args.llm_latency), "--llm-tok-rate", str(args.llm_tok_rate),
+            "--llm-output-tokens", str(args.llm_output_tokens), "--llm-fail-rate", str(args.llm_fail_rate),
+            "--speculative", str(args.speculative), "--out", out_path,
+        ]
+        env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")]))}
+        output = None if args.verbose else subprocess.DEVNULL
+        subprocess.run(command, cwd=workdir, env=env, stdout=output, stderr=output, check=True)
+        with open(out_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+
+def _calls_by_service(calls: Dict[str, int]) -> Dict[str, int]:
+    totals: Dict[str, int] = {}
+    for name, count in calls.items():
+        service = name.split(".")[0]
+        totals[service] = totals.get(service, 0) + count
+    return totals
+
+
+def print_table(results: List[dict]):
+    header = f"{'sets':>5}{'topics':>8}{'wall':>9}" + "".join(f"{s[:8]:>10}" for s in STAGES) \
+             + f"{'reddit':>8}{'sheets':>8}{'llm':>6}{'wp':>6}{'rss MB':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        spans = r["spans"]
+        services = _calls_by_service(r["calls"])
+        line = f"{r['sets']:>5}{r['topics']:>8}{r['wall_seconds']:>8.2f}s"
+        line += "".join(f"{spans.get(stage, {}).get('total', 0.0):>9.2f}s" for stage in STAGES)
+        line += f"{services.get('reddit', 0):>8}{services.get('sheets', 0):>8}"
+        line += f"{r['calls'].get('ollama.generate', 0):>6}{services.get('wordpress', 0):>6}{r['max_rss_mb']:>9.1f}"
+        print(line)
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="AutoPost AI 오프라인 파이프라인 벤치마크")
+    parser.add_argument("--sets", type=_int_list, default=DEFAULT_SETS, help="세트 수 목록 (예: 1,10,50)")
+    parser.add_argument("--topics", type=_int_list, default=DEFAULT_TOPICS, help="세트당 주제 수 목록 (예: 10,100,1000)")
+    parser.add_argument("--llm-latency", type=float, default=0.02, help="LLM 호출당 고정 지연(초)")
+    parser.add_argument("--llm-tok-rate", type=float, default=5000.0, help="LLM 출력 토큰 생성 속도(tok/s)")
+    parser.add_argument("--llm-output-tokens", type=int, default=800, help="LLM 응답당 출력 토큰 수")
+    parser.add_argument("--llm-fail-rate", type=float, default=0.0, help="글 생성 호출이 깨진 응답을 돌려줄 확률 (0~1)")
+    parser.add_argument("--speculative", type=int, default=0, help="세트별 여유 후보 수 (speculative_topics)")
+    parser.add_argument("--verbose", action="store_true", help="파이프라인 로그를 그대로 출력")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--out", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.worker:
+        result = run_worker(args.sets[0], args.topics[0], args.llm_latency, args.llm_tok_rate, args.llm_output_tokens,
+                            args.llm_fail_rate, args.speculative)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False)
+        return
+
+    results = []
+    for sets in args.sets:
+        for topics in args.topics:
+            print(f"▶ 세트 {sets}개 x 주제 {topics}개 실행 중...", flush=True)
+            results.append(_run_scale(sets, topics, args))
+    print()
+    print_table(results)
+
+    os.makedirs(RESULT_DIR, exist_ok=True)
+    path = os.path.join(RESULT_DIR, f"pipeline_{datetime.now().strftime('%Y-%m-%d_%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"args": {k: v for k, v in vars(args).items() if k not in ("worker", "out")},
+                   "results": results}, f, ensure_ascii=False, indent=2)
+    print(f"\n결과 저장: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+# 데몬 모드 - 클라이언트와 LLM Provider를 데운 채로 상주하며 세트별 스케줄에 따라 수집/글 작성 작업 실행
+#
+# cron으로 main.py를 매번 새로 띄우는 대신 한 번 띄워두면
+#   - 스프레드시트 인증, LLM Provider, Ollama 모델 로딩을 시작할 때 한 번만 하고
+#   - 세트마다 accounts.yaml의 daemon 설정 시간(+지터)에 작업을 영속 큐(data/job_queue.db)에 넣고
+#   - 워커가 큐에서 꺼내 실행한다 (재시작해도 같은 날 같은 작업은 다시 넣지 않음)
+# 상태는 http://127.0.0.1:8765/status 에서 확인 (큐 깊이, 실행 중인 작업, 다음 실행 예정)
+#
+# accounts.yaml 예시:
+#   daemon:
+#     collect_at: ["09:00", "21:00"]   # 수집 시각 (여러 번 가능)
+#     generate_at: "23:00"             # 글 작성 + 발행 시각
+#     jitter_minutes: 10               # 각 시각에 ±지터 (세트끼리 몰리지 않도록)
+import argparse
+import json
+import os
+import random
+import signal
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+
+from config import load_accounts
+from main import collect_set, generate_set, enqueue_set, finish_run
+from modules.ai.llm_providers import get_task_providers
+from modules.collect import rss
+from modules.publisher import runner, scheduler, publish_queue
+from modules.storage import spreadsheet
+from modules.storage.checkpoint import CheckpointStore
+from modules.storage.job_queue import get_queue
+from modules.utils import logger
+
+ACCOUNTS_PATH = "accounts.yaml"
+DAEMON_QUEUE = "daemon"
+DEFAULT_COLLECT_AT = ["21:00"]
+DEFAULT_GENERATE_AT = "23:00"  # 그날의 베스트 글을 쓰도록 최대한 늦게
+DEFAULT_JITTER_MINUTES = 10
+DEFAULT_WORKERS = 2
+DEFAULT_PUBLISH_WORKERS = publish_queue.PUBLISH_WORKERS
+DEFAULT_STATUS_PORT = 8765
+TICK_SECONDS = 30
+JOB_VISIBILITY_TIMEOUT = 2 * 60 * 60  # 글 작성 + 발행은 오래 걸릴 수 있음
+IDLE_POLL_SECONDS = 1
+
+Plan = List[Tuple[datetime, str, str, str]]  # (실행 시각, 작업 종류, 세트, 설정 시각)
+
+
+def plan_day(account_sets: dict, day) -> Plan:
+    """하루 동안의 세트별 작업 시각 계산 (지터는 날짜/세트/작업별 시드로 고정되어 재시작해도 같음)"""
+    midnight = scheduler.TIMEZONE.localize(datetime(day.year, day.month, day.day))
+    plan: Plan = []
+    for set_name, account_set in account_sets.items():
+        config = account_set.get("daemon", {})
+        jitter = int(config.get("jitter_minutes", DEFAULT_JITTER_MINUTES))
+        times = [("collect", at) for at in config.get("collect_at", DEFAULT_COLLECT_AT)]
+        times.append(("generate", config.get("generate_at", DEFAULT_GENERATE_AT)))
+        for kind, at in times:
+            hour, minute = (int(part) for part in str(at).split(":"))
+            rng = random.Random(f"{day}:{set_name}:{kind}:{at}")
+            offset = hour * 60 + minute + rng.uniform(-jitter, jitter)
+            offset = min(max(offset, 0), 24 * 60 - 1)  # 지터 때문에 날짜가 바뀌지 않도록
+            plan.append((midnight + timedelta(minutes=offset), kind, set_name, str(at)))
+    return sorted(plan)
+
+
+class Daemon:
+    def __init__(self, workers: int = DEFAULT_WORKERS, port: int = DEFAULT_STATUS_PORT,
+                 publish_workers: int = DEFAULT_PUBLISH_WORKERS):
+        self.workers = workers
+        self.publish_workers = publish_workers
+        self.port = port
+        self.queue = get_queue()
+        self.store = CheckpointStore()
+        self.stop_event = threading.Event()
+        self.started_at = time.time()
+        self._accounts: dict = {}
+        self._accounts_mtime = 0.0
+        self._set_locks: Dict[str, threading.Lock] = {}
+        self._running: Dict[int, dict] = {}  # 이 프로세스에서 실행 중인 작업
+        self._lock = threading.Lock()
+        self._schedule_lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._server = None
+
+    # --- 설정 / 준비 ---
+
+    def accounts(self) -> dict:
+        """accounts.yaml이 바뀌었을 때만 다시 읽음"""
+        mtime = os.path.getmtime(ACCOUNTS_PATH)
+        if mtime != self._accounts_mtime:
+            self._accounts = load_accounts(ACCOUNTS_PATH)
+            self._accounts_mtime = mtime
+            logger.log(f"[Daemon] 계정 설정 로드: 세트 {len(self._accounts)}개")
+        return self._accounts
+
+    def warm_up(self):
+        """스프레드시트 인증과 세트별 LLM Provider(모델 로딩 포함)를 미리 준비"""
+        with logger.span("daemon.warm_up"):
+            try:
+                spreadsheet._get_spreadsheet()
+            except Exception as e:
+                logger.log(f"[Daemon] 스프레드시트 연결 실패 (작업 실행 시 다시 시도): {e}")
+            account_sets = self.accounts()
+            for set_name in account_sets:
+                try:
+                    # 작업별 모델이 다르면 각각 로딩 (같은 설정은 같은 Provider 하나)
+                    for provider in {id(p): p for p in get_task_providers(set_name, account_sets).values()}.values():
+                        provider.warm_up()
+                except Exception as e:
+                    logger.log(f"[Daemon] [{set_name}] LLM Provider 준비 실패: {e}")
+
+    # --- 스케줄 → 큐 ---
+
+    def enqueue_due(self):
+        """오늘 실행 시각이 지난 작업을 큐에 등록 (같은 작업은 dedup_key로 한 번만)"""
+        now = datetime.now(scheduler.TIMEZONE)
+        for run_at, kind, set_name, at in plan_day(self.accounts(), now.date()):
+            if run_at > now:
+                break
+            payload = {"kind": kind, "set": set_name, "date": now.strftime("%Y-%m-%d")}
+            job_id = self.queue.put(DAEMON_QUEUE, payload, dedup_key=f"{kind}:{set_name}:{payload['date']}:{at}")
+            if job_id is not None:
+                logger.log(f"[Daemon] 작업 등록 #{job_id}: [{set_name}] {kind} ({run_at.strftime('%H:%M')})")
+
+    def next_runs(self, limit: int = 20) -> List[dict]:
+        now = datetime.now(scheduler.TIMEZONE)
+        upcoming = []
+        for day in (now.date(), now.date() + timedelta(days=1)):
+            upcoming.extend(entry for entry in plan_day(self.accounts(), day) if entry[0] > now)
+        return [
+            {"at": run_at.isoformat(timespec="minutes"), "kind": kind, "set": set_name}
+            for run_at, kind, set_name, _ in upcoming[:limit]
+        ]
+
+    # --- 워커 ---
+
+    def _set_lock(self, set_name: str) -> threading.Lock:
+        with self._lock:
+            return self._set_locks.setdefault(set_name, threading.Lock())
+
+    def run_job(self, payload: dict, resume: bool = False):
+        """작업 하나 실행 - resume이면(재시도) 이전 시도에서 끝난 단계는 체크포인트를 사용"""
+        kind, set_name, today = payload["kind"], payload["set"], payload["date"]
+        account_set = self.accounts().get(set_name)
+        if account_set is None:
+            logger.log(f"[Daemon] 설정에서 사라진 세트 - 작업 건너뜀: {set_name}")
+            return
+
+        # 같은 세트의 수집/글 작성은 겹치지 않게
+        with self._set_lock(set_name):
+            if kind == "collect":
+                # 수집은 하루 여러 번 실행되므로 첫 시도에서 이전 수집의 체크포인트를 지움
+                # (재시도가 이번 작업이 아닌 이전 수집 결과를 완료로 보고 건너뛰지 않도록)
+                if not resume:
+                    self.store.clear(today, set_name, "collect")
+                collect_set(self.store, today, set_name, account_set, resume=resume)
+            elif kind == "generate":
+                # 발행은 대기열에 넣기만 하고 발행 워커가 따로 처리
+                # 재시도에서는 이미 작성/등록한 글을 그대로 써서 토큰을 다시 쓰거나 글을 중복 등록하지 않음
+                blog_posts, sns_posts = generate_set(self.store, today, set_name, account_set, resume=resume)
+                # 세트마다 따로 배치하므로 다른 세트가 이미 잡은 시각을 피하고, 배치~등록 사이에 끼어들지 않게 잠금
+                with self._schedule_lock:
+                    schedule = scheduler.build_schedule([(set_name, account_set, blog_posts or [])],
+                                                        reserved=publish_queue.reserved_times(self.queue))
+                    enqueue_set(self.store, today, set_name, account_set, blog_posts or [], sns_posts, schedule,
+                                resume=resume)
+            else:
+                raise ValueError(f"알 수 없는 작업 종류: {kind}")
+
+    def _worker(self):
+        while not self.stop_event.is_set():
+            job = self.queue.lease(DAEMON_QUEUE, visibility_timeout=JOB_VISIBILITY_TIMEOUT)
+            if job is None:
+                self.stop_event.wait(IDLE_POLL_SECONDS)
+                continue
+
+            with self._lock:
+                self._running[job.id] = {**job.payload, "id": job.id, "attempt": job.attempts,
+                                         "started_at": datetime.now().isoformat(timespec="seconds")}
+            try:
+                with logger.span("daemon.job", job=job.id, kind=job.payload["kind"], set=job.payload["set"]):
+                    self.run_job(job.payload, resume=job.attempts > 1)
+                if not self.queue.ack(job):
+                    logger.log(f"[Daemon] 작업 #{job.id} 점유 시간이 지나 다른 워커가 다시 가져감 - 완료 처리 생략")
+            except Exception as e:
+                retry = self.queue.fail(job, str(e))
+                logger.log(f"❌ [Daemon] 작업 #{job.id} 실패 ({'재시도 예정' if retry else '재시도 한도 초과'}): {e}")
+            finally:
+                with self._lock:
+                    self._running.pop(job.id, None)
+
+    def _publish_worker(self):
+        """발행 대기열을 계속 비우는 워커 (글 작성 작업과 독립적으로 실행/실패)"""
+        while not self.stop_event.is_set():
+            try:
+                if publish_queue.work_once(self.accounts(), self.queue) is None:
+                    self.stop_event.wait(IDLE_POLL_SECONDS)
+            except Exception as e:
+                logger.log(f"❌ [Daemon] 발행 워커 오류: {e}")
+                self.stop_event.wait(IDLE_POLL_SECONDS)
+
+    # --- 상태 엔드포인트 ---
+
+    def status(self) -> dict:
+        with self._lock:
+            running = list(self._running.values())
+        return {
+            "started_at": datetime.fromtimestamp(self.started_at).isoformat(timespec="seconds"),
+            "uptime_seconds": round(time.time() - self.started_at),
+            "queue": self.queue.depth(),
+            "in_flight": self.queue.in_flight(),
+            "running": running,
+            "next_runs": self.next_runs(),
+        }
+
+    def _serve_status(self):
+        daemon = self
+
+        class StatusHandler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.rstrip("/") in ("", "/status"):
+                    status, payload = 200, daemon.status()
+                elif self.path == "/health":
+                    status, payload = 200, {"ok": True}
+                else:
+                    status, payload = 404, {"error": "not found"}
+                body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        # 외부에 노출하지 않도록 로컬에서만 접근 가능
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), StatusHandler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="status", daemon=True).start()
+        logger.log(f"[Daemon] 상태 확인: http://127.0.0.1:{self.port}/status")
+
+    # --- 실행 ---
+
+    def run(self):
+        logger.log("🚀 AutoPost AI 데몬 시작")
+        self.warm_up()
+        self._serve_status()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"daemon-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        for i in range(self.publish_workers):
+            thread = threading.Thread(target=self._publish_worker, name=f"daemon-publisher-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        last_prune_day = None
+        while not self.stop_event.is_set():
+            try:
+                self.enqueue_due()
+                today = datetime.now().date()
+                if last_prune_day != today:
+                    self.queue.prune()
+                    # 기록 정리와 LLM 지표/구간 지연 시간 출력은 하루에 한 번 (작업마다 하면 동시에 실행 중인
+                    # 다른 작업의 기록까지 비워버림, 아직 끝나지 않은 작업의 기록은 다음 리포트에 들어감)
+                    finish_run()
+                    logger.print_summary(reset=True)
+                    last_prune_day = today
+            except Exception as e:
+                logger.log(f"❌ [Daemon] 스케줄 처리 실패: {e}")
+            self.stop_event.wait(TICK_SECONDS)
+
+        self.shutdown()
+
+    def shutdown(self):
+        logger.log("[Daemon] 종료 중... (실행 중인 작업이 끝날 때까지 대기)")
+        for thread in self._threads:
+            thread.join()
+        if self._server:
+            self._server.shutdown()
+        runner.close_publishers()
+        rss.close_pool()
+        finish_run()
+        self.queue.close()
+        logger.log("✅ AutoPost AI 데몬 종료")
+        logger.print_summary()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="AutoPost AI 데몬")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="동시에 실행할 작업 수")
+    parser.add_argument("--publish-workers", type=int, default=DEFAULT_PUBLISH_WORKERS, help="동시에 발행할 글 수")
+    parser.add_argument("--port", type=int, default=DEFAULT_STATUS_PORT, help="상태 확인 HTTP 포트 (127.0.0.1)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    daemon = Daemon(workers=args.workers, port=args.port, publish_workers=args.publish_workers)
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: daemon.stop_event.set())
+    daemon.run()
@@ -1,72 +1,192 @@
 from config import load_accounts
-from modules.collect import google_trends, news_api, rss, reddit
-# from modules.collect.news_api import fetch_top_headlines, fetch_news_by_keywords, NewsCategory
+from modules.collect import fanin, news_api, rss
 from modules.storage import spreadsheet
-from modules.ai import content_writer, post_writer
-from modules.publisher import runner
+from modules.ai import content_writer, post_writer, llm_metrics
+from modules.publisher import runner, scheduler, publish_queue
+from modules.storage.publish_ledger import get_ledger
+from modules.storage.checkpoint import CheckpointStore
+from modules.storage.summary_cache import get_cache as get_summary_cache
+from modules.storage.rss_state import get_state as get_rss_state
+from modules.models.article import Article
+from modules.ai.content_writer import Post
 from modules.utils import logger
 
-import pprint
+import argparse
 
-from modules.utils.helpers import save_posts_to_file
+# 그날의 가장 베스트 글을 보여주기 때문에 최대한 늦은 시간에 실행하는게 좋음.
 
-dummy_content = """# 알리바바, 중국 AI 시장 판도 뒤흔들다
+# 파이프라인 단계와 결과 타입 (체크포인트 복원용)
+STAGES = {
+    "collect": Article,
+    "save_news": None,
+    "generate": Post,
+    "generate_sns": None,
+    "enqueue": None,
+    "clear_worksheet": None,
+}
+# 단계 -> 그 결과로 만들어지는 이후 단계 (--only-stage로 다시 실행하면 이 체크포인트들은 낡은 결과가 됨)
+# generate는 수집 체크포인트가 아니라 스프레드시트를 읽으므로 collect와 이어지지 않음
+STAGE_DEPENDENTS = {
+    "collect": ("save_news",),
+    "generate": ("generate_sns", "enqueue"),
+    "generate_sns": ("enqueue",),
+}
 
-최근 알리바바가 자체 개발한 AI 칩을 공개하며 중국 AI 시장의 새로운 주자로 떠올랐습니다. 기존 Nvidia의 H20 칩을 대체할 수 있는 이 칩은 중국 기업들이 미국 제재로 인해 Nvidia 칩의 접근성이 떨어지는 상황에서, 중국 시장 점유율 확보를 위한 전략적 움직임으로 해석됩니다. 특히 알리바바의 이번 행보는 단순한 기술 개발을 넘어, 중국 정부의 ‘기술 자립’ 정책을 뒷받침하는 중요한 사례로 평가받고 있습니다.
 
-## H20 칩, 중국 시장의 ‘블랙박스’
+def run_stage(store: CheckpointStore, today: str, set_name: str, stage: str, func,
+              resume: bool = False, only_stage: str = None):
+    """단계를 실행하고 결과를 체크포인트로 저장
 
-Nvidia의 H20 칩은 미국 정부의 수출 규제에 따라 중국 시장에 판매가 제한되던 ‘블랙박스’와 같은 존재였습니다. 미국 정부는 H20 칩의 성능과 기술이 중국 군사 기술 개발에 활용될 수 있다는 우려를 이유로 수출을 제한했습니다. 하지만 알리바바는 이러한 상황을 기회로 삼아 자체 AI 칩 개발에 박차를 가했습니다.
-"""
+    - only_stage가 지정되면 해당 단계만 실행하고 나머지는 체크포인트에서 복원
+    - resume이면 이미 완료된 단계는 건너뛰고 체크포인트에서 복원
+    """
+    cls = STAGES[stage]
+    if only_stage and stage != only_stage:
+        return store.load(today, set_name, stage, cls)
+    if resume and not only_stage and store.is_done(today, set_name, stage):
+        logger.log(f"⏭️ [{set_name}] {stage} 단계 완료됨 - 체크포인트 사용")
+        return store.load(today, set_name, stage, cls)
 
-# 그날의 가장 베스트 글을 보여주기 때문에 최대한 늦은 시간에 실행하는게 좋음.
+    # 단계 안의 모든 로그에 세트/단계 이름이 붙음
+    with logger.span(stage, set=set_name, stage=stage):
+        output = func()
+    store.save(today, set_name, stage, output)
+    if only_stage == stage:
+        stale = [name for name in STAGE_DEPENDENTS.get(stage, ()) if store.is_done(today, set_name, name)]
+        for name in stale:
+            store.clear(today, set_name, name)
+        if stale:
+            logger.log(f"[{set_name}] {stage} 결과가 바뀌어 이후 단계 체크포인트 삭제: {', '.join(stale)} "
+                       f"- --resume으로 다시 실행하면 이어서 반영")
+    return output
+
+
+def collect_set(store: CheckpointStore, today: str, set_name: str, account_set: dict,
+                resume: bool = False, only_stage: str = None):
+    """세트 하나의 수집 단계 (수집하면서 스프레드시트에 바로 저장)"""
+    stage = lambda name, func: run_stage(store, today, set_name, name, func, resume, only_stage)
+
+    # 1. 데이터 수집 - accounts.yaml의 sources를 병렬로 수집하며 스프레드시트에 바로 저장
+    articles = stage("collect", lambda: fanin.collect_for_set(
+        set_name, account_set, on_batch=lambda batch: spreadsheet.save_news(set_name, batch)))
+
+    # 2. 스프레드 시트 저장 - 수집 단계에서 스트리밍 저장되므로 재실행 요청 시에만 체크포인트로 다시 저장
+    #    (save_news는 시트에 이미 있는 지문을 건너뛰므로 collect/save_news를 다시 실행해도 행이 중복되지 않음)
+    if only_stage == "save_news":
+        stage("save_news", lambda: spreadsheet.save_news(set_name, articles or []))
+    return articles
+
+
+def generate_set(store: CheckpointStore, today: str, set_name: str, account_set: dict,
+                 resume: bool = False, only_stage: str = None):
+    """세트 하나의 글 작성 단계, (블로그 글 목록, SNS 글) 반환"""
+    stage = lambda name, func: run_stage(store, today, set_name, name, func, resume, only_stage)
+
+    # 3. 뉴스 선정 및 글 작성
+    blog_posts = stage("generate", lambda: content_writer.generate_blog_post(set_name, max_posts=5))
+
+    # 3-1. 업로드가 구현된 SNS 계정이 있는 세트만 블로그 글 전체를 LLM 호출 한 번으로 SNS 글로 변환
+    sns_posts = None
+    if blog_posts and any(runner.sns_implemented(acc.get('platform', '')) for acc in account_set.get('accounts', [])):
+        try:
+            sns_posts = stage("generate_sns", lambda: post_writer.generate_sns_posts(set_name, blog_posts))
+        except Exception as e:
+            logger.log(f"❌ [{set_name}] SNS 글 생성 실패: {e}")
+    return blog_posts, sns_posts
+
+
+def enqueue_set(store: CheckpointStore, today: str, set_name: str, account_set: dict, blog_posts, sns_posts,
+                schedule, resume: bool = False, only_stage: str = None):
+    """세트 하나의 발행 대기열 추가 + 워크시트 초기화 단계"""
+    stage = lambda name, func: run_stage(store, today, set_name, name, func, resume, only_stage)
+
+    # 5. 발행 대기열(data/job_queue.db)에 추가 - 실제 발행은 publish_queue 워커가 처리
+    #    (--only-stage로 실행했는데 오늘 작성한 글이 없으면 넣을 글이 없으므로 건너뜀)
+    if blog_posts is None:
+        if only_stage == "enqueue":
+            logger.log(f"⚠️ [{set_name}] 오늘 generate 체크포인트가 없어 enqueue 건너뜀 - 먼저 --only-stage generate 실행")
+    else:
+        stage("enqueue", lambda: publish_queue.enqueue_posts(
+            set_name, account_set, blog_posts, sns_posts=sns_posts, schedule=schedule))
 
-def main():
+    # 6. 스프레드 시트 초기화
+    stage("clear_worksheet", lambda: spreadsheet.clear_worksheet(
+        set_name, archive=account_set.get('archive_worksheet', False)))
+
+
+def finish_run():
+    """실행(또는 데몬 작업) 마무리 - 오래된 기록 정리와 지표 저장"""
+    # 7. 오래된 발행 기록 정리
+    pruned = get_ledger().prune(older_than_days=90)
+    logger.log(f"발행 기록 {pruned}개 정리")
+    pruned = get_summary_cache().prune(older_than_days=30)
+    logger.log(f"원문 요약 캐시 {pruned}개 정리")
+    pruned = get_rss_state().prune()
+    logger.log(f"RSS 수집 기록 {pruned}개 정리")
+    pruned = news_api.prune_cache()
+    logger.log(f"NewsAPI 캐시 {pruned}일치 정리")
+
+    # 8. LLM 사용량 지표 저장 (Prometheus textfile + JSON 리포트)
+    llm_metrics.export()
+
+
+def main(resume: bool = False, only_stage: str = None):
     from datetime import datetime
     today = datetime.now().strftime('%Y-%m-%d')
     logger.log(f"🚀 AutoPost AI 시작 ({today})")
 
     account_sets = load_accounts()
+    store = CheckpointStore()
+    generated = []
+    sns_by_set = {}
 
     for set_name, account_set in account_sets.items():
         logger.log(f"▶ [{set_name}] 세트 실행")
+        try:
+            collect_set(store, today, set_name, account_set, resume, only_stage)
+            blog_posts, sns_posts = generate_set(store, today, set_name, account_set, resume, only_stage)
+        except Exception as e:
+            # 실패한 세트는 건너뛰고 다음 실행에서 --resume으로 이어서 진행
+            logger.log(f"❌ [{set_name}] 세트 실행 실패: {e}")
+            continue
+
+        # 글이 없어도(--only-stage로 generate 체크포인트가 없는 경우) clear_worksheet 등 이후 단계는 실행
+        if blog_posts is None and only_stage == "generate_sns":
+            logger.log(f"⚠️ [{set_name}] 오늘 generate 체크포인트가 없어 generate_sns 건너뜀 - 먼저 --only-stage generate 실행")
+        generated.append((set_name, account_set, blog_posts))
+        sns_by_set[set_name] = sns_posts
 
-        # 1. 데이터 수집
-        # keywords = google_trends.get_trending_keywords()
-        
-        # news_list = news_api.fetch_news(keywords)
-        # news_list = news_api.fetch_top_headlines(category=NewsCategory.BUSINESS)
-        # news_list = news_api.fetch_news_by_keywords(keywords=set_name)
-        
-        # rss_news = rss.fetch_news_by_rss()
-        # pprint.pprint(rss_news)
-        
-        reddit_posts = reddit.fetch_reddit_posts(subreddits=account_set['subreddits'])
-
-        # # 2. 스프레드 시트 저장
-        spreadsheet.save_news(set_name, reddit_posts)
-
-        # # 3. 뉴스 선정 및 글 작성
-        blog_posts = content_writer.generate_blog_post(set_name, max_posts=5)
-        
-        # from modules.ai.content_writer import Post
-        # blog_posts = [
-        #     Post(
-        #         title="test",
-        #         content=dummy_content,
-        #         category="재테크",
-        #         tag=[],
-        #         upload_hour=1
-        #     )
-        # ]
-        
-        # 4. 계정 세트별 업로드
-        runner.publish_all(account_set, blog_posts, set_name, sns_posts=[])
-        
-        # 5. 스프레드 시트 초기화
-        spreadsheet.clear_worksheet(set_name)
+    # 4. 전체 세트의 예약 발행 시간을 한 번에 배치
+    schedule = scheduler.build_schedule([(set_name, account_set, blog_posts or [])
+                                         for set_name, account_set, blog_posts in generated])
+
+    for set_name, account_set, blog_posts in generated:
+        try:
+            enqueue_set(store, today, set_name, account_set, blog_posts, sns_by_set.get(set_name),
+                        schedule, resume, only_stage)
+        except Exception as e:
+            logger.log(f"❌ [{set_name}] 세트 발행 대기열 추가 실패: {e}")
+
+    # 6-1. 발행 대기열 처리 - 이전 실행에서 실패해 남아 있던 글도 함께 발행
+    if only_stage in (None, "enqueue"):
+        with logger.span("publish"):
+            publish_queue.drain(account_sets)
+
+    runner.close_publishers()
+    rss.close_pool()
+    finish_run()
 
     logger.log("✅ AutoPost AI 완료")
+    logger.print_summary()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="AutoPost AI")
+    parser.add_argument("--resume", action="store_true", help="오늘 완료된 단계는 체크포인트를 사용하고 건너뜀")
+    parser.add_argument("--only-stage", choices=list(STAGES), help="지정한 단계만 다시 실행")
+    return parser.parse_args()
+
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    main(resume=args.resume, only_stage=args.only_stage)
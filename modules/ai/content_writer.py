@@ -1,47 +1,40 @@
 # 블로그 글 작성
-import pprint
 from typing import List, Dict, Optional
 from dataclasses import dataclass
 import random
 import re
 import json
-import os
-from modules.storage.spreadsheet import _get_worksheet
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from modules.storage.spreadsheet import _get_worksheet, get_header, set_header, iter_unused_topics
 from modules.utils import logger
 from config import load_accounts
-from pydantic import BaseModel
 from modules.ai.prompts import get_prompt_template_for_set
-from modules.ai.llm_providers import get_llm_provider
+from modules.ai.llm_providers import get_llm_provider, budget_exhausted, TASK_SELECTION, TASK_WRITING
+from modules.ai import html_normalizer, llm_metrics, summarizer
+from modules.storage import post_archive
+from modules.storage.similarity_index import SimilarityIndex, get_index
+from modules.utils.fingerprint import text_simhash
 from modules.ai.pydantic_models import TopicSelection, BlogContentResponse
 
+MAX_REGENERATIONS = 2  # 본문 HTML 검증에 실패한 글을 다시 생성하는 횟수
+REGENERATE_TEMPERATURE = 0.7
+
 @dataclass
 class Post:
     title: str
     content: str
     category: str
     tag: List[str]
+    source_url: str = ""
+    summary: str = ""  # SNS 글 생성에 쓰는 요약 (본문 HTML 대신 전달)
 
 # LLM Provider는 함수 호출시 동적으로 생성
 
 def get_topics_from_spreadsheet(set_name: str) -> List[Dict]:
     """스프레드시트에서 사용되지 않은 주제 목록 가져오기"""
     try:
-        worksheet = _get_worksheet(set_name=set_name)
-        records = worksheet.get_all_records()
-        
-        # 아직 사용되지 않은 뉴스들만 필터링 (used 컬럼이 없거나 빈 값)
-        unused_topics = []
-        for record in records:
-            if not record.get('used', ''):  # used 컬럼이 비어있으면 미사용
-                unused_topics.append({
-                    'title': record.get('title', ''),
-                    'content': record.get('content', ''),
-                    'url': record.get('url', ''),
-                    'source': record.get('source', ''),
-                    'subject': record.get('subject', ''),
-                    'row_index': records.index(record) + 2  # 헤더 포함해서 +2
-                })
-        
+        unused_topics = list(iter_unused_topics(set_name))
         logger.log(f"스프레드시트에서 {len(unused_topics)}개의 미사용 주제를 가져왔습니다.")
         return unused_topics
         
@@ -101,7 +94,7 @@ def select_topics_with_ai(topics: List[Dict], set_name: str, count: int = 10) ->
     
     try:
         # LLM Provider 가져오기
-        llm_provider = get_llm_provider(set_name)
+        llm_provider = get_llm_provider(set_name, task=TASK_SELECTION)
         system_prompt = f'당신은 {account_topic} 블로그를 운영하는 파워 블로거입니다.'
         
         messages = [
@@ -204,8 +197,9 @@ def select_topics_with_ai(topics: List[Dict], set_name: str, count: int = 10) ->
         return random.sample(topics, min(count, len(topics)))
 
 
-def generate_blog_content(set_name:str, topic: Dict) -> Optional[Post]:
-    """AI로 블로그 글 생성"""
+def _request_blog_content(set_name: str, topic: Dict, temperature: float = 0,
+                          cancel: Optional[threading.Event] = None) -> Optional[Post]:
+    """LLM에 블로그 글을 한 번 요청해서 응답을 Post로 파싱 (본문 HTML은 검증 전 상태)"""
     
     # 계정 정보 로드
     accounts = load_accounts()
@@ -214,12 +208,15 @@ def generate_blog_content(set_name:str, topic: Dict) -> Optional[Post]:
     account_language = account_info.get('language', '한국어')
     account_category = account_info.get('category', [])
     
+    # 긴 원문은 요약 브리프로 바꿔서 프롬프트에 넣음 (지문별 캐시 - 재생성 시 다시 요약하지 않음)
+    prompt_topic = summarizer.brief_topic(set_name, topic)
+
     # 프롬프트 템플릿 선택 및 생성
-    prompt = get_prompt_template_for_set(set_name, topic, account_topic, account_language, account_category)
+    prompt = get_prompt_template_for_set(set_name, prompt_topic, account_topic, account_language, account_category)
     
     try:
         # LLM Provider 가져오기
-        llm_provider = get_llm_provider(set_name)
+        llm_provider = get_llm_provider(set_name, task=TASK_WRITING)
         system_prompt = f'당신은 {account_topic} 블로그를 운영하는 파워 블로거이자 SEO 최적화 전문가입니다.'
         
         messages = [
@@ -234,9 +231,13 @@ def generate_blog_content(set_name:str, topic: Dict) -> Optional[Post]:
             messages=messages,
             system_prompt=system_prompt,
             max_tokens=4096,
-            temperature=0,
-            format=BlogContentResponse  # Ollama에서 구조화된 출력 사용
+            temperature=temperature,
+            format=BlogContentResponse,  # Ollama에서 구조화된 출력 사용
+            cancel=cancel
         )
+
+        if cancel is not None and cancel.is_set():
+            return None
         
         if not raw_response:
             logger.log("LLM에서 응답을 받지 못했습니다")
@@ -255,6 +256,7 @@ def generate_blog_content(set_name:str, topic: Dict) -> Optional[Post]:
                 blog_content = blog_response.content
                 category = blog_response.category or ''
                 tags = blog_response.tags or []
+                summary = blog_response.summary or ''
                 
                 logger.log(f"구조화된 파싱 성공 - 제목: {title}")
                 logger.log(f"구조화된 파싱 성공 - 내용 길이: {len(blog_content)}")
@@ -278,6 +280,7 @@ def generate_blog_content(set_name:str, topic: Dict) -> Optional[Post]:
                     blog_content = json_data.get('content', '')
                     category = json_data.get('category', '')
                     tags = json_data.get('tags', [])
+                    summary = json_data.get('summary', '')
                     
                     logger.log(f"JSON 파싱 성공 - 제목: {title}")
                     logger.log(f"JSON 파싱 성공 - 내용 길이: {len(blog_content)}")
@@ -295,6 +298,7 @@ def generate_blog_content(set_name:str, topic: Dict) -> Optional[Post]:
             title = lines[0].replace('#', '').strip() if lines else topic['title']
             category = ''
             tags = []
+            summary = ''
             
             logger.log(f"Fallback 처리 - 제목: {title}")
         
@@ -302,13 +306,39 @@ def generate_blog_content(set_name:str, topic: Dict) -> Optional[Post]:
             title=title,
             content=blog_content,
             category=category,
-            tag=tags
+            tag=tags,
+            source_url=topic.get('url', ''),
+            summary=summary
         )
         
     except Exception as e:
         logger.log(f"블로그 글 생성 중 오류 발생: {e}")
         return None 
 
+def generate_blog_content(set_name:str, topic: Dict, cancel: Optional[threading.Event] = None) -> Optional[Post]:
+    """AI로 블로그 글 생성 (cancel이 설정되면 생성을 중단하고 None)"""
+    for attempt in range(MAX_REGENERATIONS + 1):
+        # 같은 프롬프트를 temperature 0으로 다시 보내면 같은 글이 나오므로 재생성 때는 올림
+        post = _request_blog_content(set_name, topic, temperature=0 if attempt == 0 else REGENERATE_TEMPERATURE,
+                                     cancel=cancel)
+        if post is None:
+            return None
+
+        # 발행 전에 본문 HTML 정리/검증 - 닫히지 않은 태그, 마크다운, JSON 원문이 섞인 글은 다시 생성
+        result = html_normalizer.normalize(post.content)
+        if result.ok:
+            post.content = result.html
+            if result.fixes:
+                logger.log(f"본문 HTML 보정: {result.fixes}")
+            logger.log(f"본문 통계 - 글자 수: {result.stats.get('text_chars', 0)}, "
+                       f"소제목: {result.stats.get('headings', 0)}, 문단: {result.stats.get('paragraphs', 0)}")
+            return post
+        logger.log(f"본문 HTML 검증 실패 ({', '.join(result.problems)}): {post.title}"
+                   + (f" - 다시 생성 ({attempt + 1}/{MAX_REGENERATIONS})" if attempt < MAX_REGENERATIONS else ""))
+        if budget_exhausted():
+            break
+    return None
+
 def mark_topic_as_used(topic: Dict, set_name: str):
     """스프레드시트에서 해당 주제를 사용됨으로 표시"""
     try:
@@ -319,22 +349,104 @@ def mark_topic_as_used(topic: Dict, set_name: str):
         from datetime import datetime
         used_info = f"{set_name}_{datetime.now().strftime('%Y%m%d_%H%M')}"
         
-        # used 컬럼이 몇 번째인지 확인 (없으면 추가)
-        headers = worksheet.row_values(1)
+        # used 컬럼이 몇 번째인지 확인 (없으면 추가) - 헤더는 캐시 사용
+        headers = get_header(set_name)
         if 'used' not in headers:
-            headers.append('used')
-            worksheet.update('1:1', [headers])
-            used_col = len(headers)
-        else:
-            used_col = headers.index('used') + 1
+            headers = headers + ['used']
+            set_header(set_name, headers)
+        used_col = headers.index('used') + 1
         
         # 해당 행의 used 컬럼 업데이트
-        worksheet.update_cell(row_index, used_col, used_info)
+        with logger.span("sheets.mark_used"):
+            worksheet.update_cell(row_index, used_col, used_info)
         logger.log(f"주제 '{topic['title']}'을 사용됨으로 표시했습니다.")
         
     except Exception as e:
         logger.log(f"주제 사용 표시 중 오류 발생: {e}")
 
+def _topic_simhash(topic: Dict) -> int:
+    """주제의 SimHash (수집 시 시트에 기록된 값 우선, 없으면 제목+본문으로 계산)"""
+    return topic.get('simhash') or text_simhash(f"{topic.get('title', '')}\n{topic.get('content', '')}")
+
+def _drop_written_topics(topics: List[Dict], index: SimilarityIndex) -> List[Dict]:
+    """이전에 글로 쓴 이야기와 비슷한 주제 제외 (주제 선정 LLM 호출 전에 후보를 줄임)"""
+    remaining = [topic for topic in topics if index.find(_topic_simhash(topic)) is None]
+    if len(remaining) < len(topics):
+        logger.log(f"이미 작성한 글과 비슷한 주제 {len(topics) - len(remaining)}개 제외")
+    return remaining
+
+def _generate_speculative(set_name: str, topics: List[Dict], max_posts: int, index: SimilarityIndex, accept) -> int:
+    """
+    후보 주제를 동시에 생성하다가 max_posts개가 모이면 나머지 호출을 취소, 받아들인 글 수 반환
+    실패한 후보는 여유 후보가 채우므로 글 수가 모자라지 않고, 걸리는 시간은 빠른 생성 몇 개의 시간에 가까움
+    """
+    cancel = threading.Event()
+    candidates = [topic for topic in topics if index.find(_topic_simhash(topic)) is None]
+    accepted = 0
+
+    def work(topic: Dict):
+        if cancel.is_set() or budget_exhausted():
+            return topic, None, None
+        with llm_metrics.track_usage() as usage:
+            post = generate_blog_content(set_name, topic, cancel=cancel)
+        return topic, post, usage
+
+    with ThreadPoolExecutor(max_workers=max(1, len(candidates)), thread_name_prefix=f"generate-{set_name}") as executor:
+        futures = [logger.submit(executor, work, topic) for topic in candidates]
+        for finished, future in enumerate(as_completed(futures), start=1):
+            try:
+                topic, post, usage = future.result()
+            except Exception as e:
+                logger.log(f"글 생성 중 오류 발생: {e}")
+                continue
+            if accepted >= max_posts:
+                continue  # 취소 전에 끝난 남는 글은 버림 (주제는 사용됨 표시하지 않음)
+            if post is None:
+                if not cancel.is_set():
+                    logger.log(f"글 생성 실패: {topic['title']}")
+                continue
+
+            # 동시에 생성한 후보끼리 같은 이야기면 먼저 끝난 글만 사용
+            topic_hash = _topic_simhash(topic)
+            if index.find(topic_hash) is not None:
+                logger.log(f"이미 작성한 글과 비슷한 주제라 건너뜀: {topic['title']}")
+                continue
+
+            accept(topic, topic_hash, post, usage)
+            accepted += 1
+            if accepted == max_posts:
+                cancel.set()
+                logger.log(f"글 {max_posts}개 확보 - 남은 후보 {len(candidates) - finished}개 생성 취소")
+    return accepted
+
+def _generate_sequential(set_name: str, topics: List[Dict], index: SimilarityIndex, accept):
+    """주제를 하나씩 차례로 생성, 받아들인 글 수 반환"""
+    accepted = 0
+    for topic in topics:
+        # 일일 LLM 예산을 다 쓰면 여기까지 만든 글만 넘기고 중단
+        if budget_exhausted():
+            logger.log(f"LLM 예산 소진으로 글 생성 중단 ({accepted}/{len(topics)})")
+            break
+        try:
+            # 같은 배치에서 먼저 쓴 글과 겹치는 주제는 LLM 호출 전에 건너뜀
+            topic_hash = _topic_simhash(topic)
+            if index.find(topic_hash) is not None:
+                logger.log(f"이미 작성한 글과 비슷한 주제라 건너뜀: {topic['title']}")
+                continue
+
+            with llm_metrics.track_usage() as usage:
+                post = generate_blog_content(set_name, topic)
+            if post:
+                accept(topic, topic_hash, post, usage)
+                accepted += 1
+            else:
+                logger.log(f"글 생성 실패: {topic['title']}")
+                
+        except Exception as e:
+            logger.log(f"글 생성 중 오류 발생: {e}")
+            continue
+    return accepted
+
 def generate_blog_post(set_name: str, max_posts: int) -> List[Post]:
     """계정 세트별로 블로그 글 생성"""
     
@@ -343,33 +455,47 @@ def generate_blog_post(set_name: str, max_posts: int) -> List[Post]:
     if not topics:
         logger.log("사용 가능한 주제가 없습니다.")
         return []
+
+    # 지난 며칠 동안 이미 쓴 이야기 제외 (시트의 used 표시는 매일 초기화됨)
+    index = get_index(set_name)
+    topics = _drop_written_topics(topics, index)
+    if not topics:
+        logger.log("새로 쓸 주제가 없습니다.")
+        return []
     
     # AI로 주제로 사용할 항목 선정
     accounts = load_accounts()
     account_info = accounts.get(set_name, {})
+    # 여유 후보 수 - 0보다 크면 max_posts + k개를 뽑아 동시에 생성하고 max_posts개가 모이면 나머지는 취소
+    speculative = int(account_info.get('speculative_topics', 0) or 0)
     
-    selected_topics = select_topics_with_ai(topics, set_name, max_posts)
+    selected_topics = select_topics_with_ai(topics, set_name, max_posts + speculative)
     if not selected_topics:
         logger.log("선정된 주제가 없습니다.")
         return []
     
     posts: List[Post] = []
+    archive_records = []
+
+    def accept(topic: Dict, topic_hash: int, post: Post, usage: llm_metrics.LLMUsage):
+        posts.append(post)
+        index.add(topic_hash, text_simhash(f"{post.title}\n{post.content}"))
+        archive_records.append(post_archive.generated_record(post, topic, usage))
+        # 스프레드시트에 사용됨 표시
+        mark_topic_as_used(topic, set_name)
+        logger.log(f"블로그 글 생성 완료: {post.title}")
     
     # AI로 글 생성
-    for topic in selected_topics:
-        try:
-            post = generate_blog_content(set_name, topic)
-            if post:
-                posts.append(post)
-                # 스프레드시트에 사용됨 표시
-                mark_topic_as_used(topic, set_name)
-                logger.log(f"블로그 글 생성 완료: {post.title}")
-            else:
-                logger.log(f"글 생성 실패: {topic['title']}")
-                
-        except Exception as e:
-            logger.log(f"글 생성 중 오류 발생: {e}")
-            continue
-    
+    if speculative > 0:
+        _generate_speculative(set_name, selected_topics, max_posts, index, accept)
+    else:
+        _generate_sequential(set_name, selected_topics, index, accept)
+
+    # 생성 글 아카이브에 원본 주제/LLM 사용량과 함께 보관
+    try:
+        post_archive.append(archive_records, set_name)
+    except Exception as e:
+        logger.log(f"생성 글 아카이브 저장 실패: {e}")
+
     logger.log(f"{set_name} 세트용 블로그 글 {len(posts)}개 생성 완료")
     return posts
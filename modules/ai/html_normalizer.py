@@ -0,0 +1,261 @@
+# 생성된 HTML 후처리 - LLM이 만든 본문을 한 번 훑으면서 정리(normalize)하고 검증
+#
+# - 허용 태그(h2~h4, p, strong, ul/li, a 등)만 남기고 나머지는 태그만 벗김 (script/style 등은 내용까지 제거)
+# - 닫히지 않은 태그는 닫고, 짝 없는 닫는 태그는 버리고, p/제목 안에 블록이 오면 앞 태그를 닫음
+# - 태그 밖 맨 텍스트는 빈 줄 단위로 <p>로 감싸고, 남아 있는 마크다운(## 제목, **굵게**)은 HTML로 바꿈
+# - 글자 수/제목 수 등 통계를 같이 계산해서, 너무 짧거나 JSON/코드 블록이 그대로 들어간 글은 거부
+# html.parser는 입력을 순서대로 한 번만 읽으므로 본문 길이에 비례한 시간만 든다.
+import json
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from html import escape
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+
+HEADINGS = ("h2", "h3", "h4")
+INLINE_TAGS = {"strong", "em", "a", "code", "br"}
+BLOCK_TAGS = {"p", "ul", "ol", "li", "blockquote", "pre", "table", "thead", "tbody", "tr", "th", "td", "hr", *HEADINGS}
+VOID_TAGS = {"br", "hr"}
+DROP_CONTENT_TAGS = {"script", "style", "iframe", "head", "title", "noscript"}
+# 같은 의미의 태그는 허용 태그로 바꿈 (h1은 블로그 글 제목과 겹치므로 h2로)
+RENAME_TAGS = {"b": "strong", "i": "em", "h1": "h2", "h5": "h4", "h6": "h4"}
+ALLOWED_TAGS = INLINE_TAGS | BLOCK_TAGS
+TEXT_ONLY_PARENTS = {"p", "pre", *HEADINGS, *INLINE_TAGS}  # 인라인 요소만 담을 수 있는 태그
+OPTIONAL_END_TAGS = {"p", "li", "tr", "th", "td", "thead", "tbody"}  # HTML에서 닫는 태그를 생략해도 되는 태그
+
+MIN_TEXT_CHARS = 500  # 이보다 짧은 본문은 거부
+MAX_STRUCTURE_FIXES = 20  # 닫는 태그 보정이 이보다 많으면 구조가 깨진 글로 보고 거부
+
+_MARKDOWN_HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+_MARKDOWN_BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+_PARAGRAPH_BREAK_RE = re.compile(r"\n[ \t]*\n")
+_FENCE_RE = re.compile(r"^```[a-zA-Z]*\s*\n(.*?)\n?```\s*$", re.S)
+
+
+@dataclass
+class NormalizedHTML:
+    """정리된 본문과 통계, 보정 내역, 거부 사유 (problems가 비어 있으면 통과)"""
+    html: str
+    stats: Dict[str, int] = field(default_factory=dict)
+    fixes: Dict[str, int] = field(default_factory=dict)
+    problems: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.problems
+
+
+class _Normalizer(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out: List[str] = []
+        self.stack: List[str] = []
+        self.implicit_p = False  # 맨 텍스트를 감싸려고 직접 연 <p>
+        self.implicit_depths = set()  # 짝 없는 <li>를 감싸려고 직접 연 <ul>의 스택 위치
+        self.skip_depth = 0
+        self.unwrapped_links = 0  # href가 없거나 허용되지 않아 벗긴 <a> (짝이 되는 </a>도 버림)
+        self.stats: Counter = Counter()
+        self.fixes: Counter = Counter()
+
+    # --- 출력 ---
+
+    def _open(self, tag: str, attrs: str = ""):
+        self.out.append(f"<{tag}{attrs}>")
+        if tag in HEADINGS:
+            self.stats["headings"] += 1
+            self.stats[tag] += 1
+        elif tag in ("p", "li", "a"):
+            self.stats[{"p": "paragraphs", "li": "list_items", "a": "links"}[tag]] += 1
+        if tag not in VOID_TAGS:
+            self.stack.append(tag)
+
+    def _close_top(self):
+        tag = self.stack.pop()
+        self.implicit_depths.discard(len(self.stack))
+        self.out.append(f"</{tag}>")
+        if tag == "p":
+            self.implicit_p = False
+
+    def _needs_fix(self) -> bool:
+        """맨 위 태그를 명시적인 닫는 태그 없이 닫는 것이 보정인지 (생략 가능한 닫는 태그나 직접 연 태그는 제외)"""
+        return not (self.stack[-1] in OPTIONAL_END_TAGS or len(self.stack) - 1 in self.implicit_depths)
+
+    def _close_implicit_p(self):
+        if self.implicit_p and self.stack and self.stack[-1] == "p":
+            self._close_top()
+        self.implicit_p = False
+
+    def _make_room(self, tag: str):
+        """tag를 담을 수 없는 열린 태그들을 닫음 (예: <p> 안의 <ul>, 이전 <li> 뒤의 <li>)"""
+        while self.stack:
+            parent = self.stack[-1]
+            if parent in TEXT_ONLY_PARENTS and tag not in INLINE_TAGS:
+                pass
+            elif parent in ("ul", "ol") and tag != "li":
+                pass
+            elif parent == "li" and tag == "li":
+                pass
+            else:
+                break
+            if self._needs_fix():
+                self.fixes["auto_closed"] += 1
+            self._close_top()
+
+    def _text(self, text: str):
+        """이스케이프하면서 남은 **굵게** 마크다운을 <strong>으로"""
+        position = 0
+        for match in _MARKDOWN_BOLD_RE.finditer(text):
+            self.out.append(escape(text[position:match.start()], quote=False))
+            self.out.append(f"<strong>{escape(match.group(1), quote=False)}</strong>")
+            self.fixes["markdown"] += 1
+            position = match.end()
+        self.out.append(escape(text[position:], quote=False))
+        self.stats["text_chars"] += len(" ".join(text.split()))
+
+    def _top_level_text(self, text: str):
+        """블록 밖의 텍스트 - 빈 줄마다 문단을 나누고 마크다운 제목은 h 태그로"""
+        for i, chunk in enumerate(_PARAGRAPH_BREAK_RE.split(text)):
+            if i:
+                self._close_implicit_p()
+            for line in chunk.split("\n"):
+                heading = _MARKDOWN_HEADING_RE.match(line.strip())
+                if heading:
+                    self._close_implicit_p()
+                    level = min(max(len(heading.group(1)), 2), 4)
+                    self._open(f"h{level}")
+                    self._text(heading.group(2))
+                    self._close_top()
+                    self.fixes["markdown"] += 1
+                elif line.strip():
+                    if not self.implicit_p:
+                        self._open("p")
+                        self.implicit_p = True
+                    else:
+                        self.out.append("\n")
+                    self._text(line.strip())
+
+    # --- HTMLParser 콜백 ---
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]):
+        tag = RENAME_TAGS.get(tag, tag)
+        if tag in DROP_CONTENT_TAGS:
+            self.skip_depth += 1
+            self.fixes["dropped_tags"] += 1
+            return
+        if self.skip_depth:
+            return
+        if tag not in ALLOWED_TAGS:
+            self.fixes["dropped_tags"] += 1
+            return
+
+        attr_text = ""
+        if tag == "a":
+            href = dict(attrs).get("href") or ""
+            if not href.startswith(("http://", "https://")):
+                self.unwrapped_links += 1
+                self.fixes["dropped_tags"] += 1
+                return
+            attr_text = f' href="{escape(href)}"'
+
+        if tag in INLINE_TAGS:
+            if not self.stack:
+                self._open("p")
+                self.implicit_p = True
+        else:
+            if self.implicit_p:
+                self._close_implicit_p()
+            self._make_room(tag)
+            if tag == "li" and (not self.stack or self.stack[-1] not in ("ul", "ol")):
+                self._open("ul")
+                self.implicit_depths.add(len(self.stack) - 1)
+                self.fixes["wrapped_list_items"] += 1
+        self._open(tag, attr_text)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        tag = RENAME_TAGS.get(tag, tag)
+        if tag not in VOID_TAGS and self.stack and self.stack[-1] == tag:
+            self._close_top()
+
+    def handle_endtag(self, tag: str):
+        tag = RENAME_TAGS.get(tag, tag)
+        if tag in DROP_CONTENT_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+            return
+        if self.skip_depth or tag not in ALLOWED_TAGS or tag in VOID_TAGS:
+            return
+        if tag not in self.stack:
+            if tag == "a" and self.unwrapped_links:
+                self.unwrapped_links -= 1
+            else:
+                self.fixes["stray_end_tags"] += 1
+            return
+        while self.stack[-1] != tag:
+            if self._needs_fix():
+                self.fixes["unclosed_tags"] += 1
+            self._close_top()
+        self._close_top()
+
+    def handle_data(self, data: str):
+        if self.skip_depth:
+            return
+        if not self.stack or (self.implicit_p and self.stack == ["p"]):
+            self._top_level_text(data)
+        elif self.stack[-1] in ("ul", "ol", "table", "thead", "tbody", "tr") and not data.strip():
+            self.out.append(data)
+        else:
+            self._text(data)
+
+    def close(self):
+        super().close()
+        while self.stack:
+            if self._needs_fix():
+                self.fixes["unclosed_tags"] += 1
+            self._close_top()
+
+
+def _unwrap(content: str, fixes: Counter) -> str:
+    """본문 전체가 JSON 응답이나 코드 블록으로 감싸인 경우 안쪽만 꺼냄"""
+    stripped = content.strip()
+    fence = _FENCE_RE.match(stripped)
+    if fence:
+        stripped = fence.group(1).strip()
+        fixes["code_fence"] += 1
+    if stripped.startswith("{"):
+        try:
+            data = json.loads(stripped)
+            if isinstance(data, dict) and isinstance(data.get("content"), str):
+                fixes["unwrapped_json"] += 1
+                return data["content"]
+        except ValueError:
+            pass
+    return stripped
+
+
+def normalize(content: str) -> NormalizedHTML:
+    """본문 HTML을 정리하고 검증 (결과의 ok가 False면 다시 생성해야 하는 글)"""
+    fixes: Counter = Counter()
+    source = _unwrap(content or "", fixes)
+
+    parser = _Normalizer()
+    parser.fixes.update(fixes)
+    parser.feed(source)
+    parser.close()
+
+    html = "".join(parser.out)
+    stats = dict(parser.stats)
+    stats["html_chars"] = len(html)
+
+    problems = []
+    if source.lstrip().startswith("{") and '"content"' in source:
+        problems.append("raw_json")
+    if "```" in html:
+        problems.append("code_fence")
+    if stats.get("text_chars", 0) < MIN_TEXT_CHARS:
+        problems.append(f"too_short({stats.get('text_chars', 0)})")
+    structure_fixes = parser.fixes["unclosed_tags"] + parser.fixes["stray_end_tags"] + parser.fixes["auto_closed"]
+    if structure_fixes > MAX_STRUCTURE_FIXES:
+        problems.append(f"malformed({structure_fixes})")
+
+    return NormalizedHTML(html=html, stats=stats, fixes=dict(+parser.fixes), problems=problems)
@@ -0,0 +1,258 @@
+# LLM 사용량/처리량 지표 - 호출마다 토큰, 속도, 첫 토큰 지연, 비용, 재시도 횟수를 기록
+#
+# 세트/프로바이더/모델 단위로 집계해서 Prometheus textfile과 JSON 실행 리포트로 내보낸다.
+# (어떤 세트를 Claude <-> Ollama 사이에서 옮길지 판단하는 근거 자료)
+import contextvars
+import json
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from modules.utils import logger
+
+METRICS_DIR = "data/metrics"
+PROM_PATH = os.path.join(METRICS_DIR, "llm.prom")
+
+# 100만 토큰당 USD (입력, 출력) - 모델명 접두어로 매칭, 없으면 0 (로컬 모델)
+PRICING: Dict[str, Tuple[float, float]] = {
+    "claude-opus-4": (15.0, 75.0),
+    "claude-sonnet-4": (3.0, 15.0),
+    "claude-3-7-sonnet": (3.0, 15.0),
+    "claude-3-5-sonnet": (3.0, 15.0),
+    "claude-3-5-haiku": (0.8, 4.0),
+    "claude-3-haiku": (0.25, 1.25),
+}
+
+
+@dataclass
+class LLMCall:
+    """프로바이더 호출 1회의 측정값"""
+    set_name: str
+    provider: str
+    model: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+    duration: float = 0.0  # 전체 호출 시간(초)
+    ttft: float = 0.0  # 첫 토큰까지 걸린 시간(초)
+    load_time: float = 0.0  # 모델 로딩 시간(초, Ollama만)
+    tokens_per_second: float = 0.0
+    cost: float = 0.0  # USD 추정치
+    retries: int = 0
+    ok: bool = True
+    cancelled: bool = False  # 다른 후보가 먼저 끝나서 중간에 끊은 호출 (오류로 세지 않음)
+
+
+@dataclass
+class LLMUsage:
+    """track_usage() 블록 안에서 기록된 호출의 합계 (provider/model은 마지막 호출 기준)"""
+    provider: str = ""
+    model: str = ""
+    calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost: float = 0.0
+    duration: float = 0.0
+
+    def add(self, call: LLMCall):
+        self.provider, self.model = call.provider, call.model
+        self.calls += 1
+        self.input_tokens += call.input_tokens
+        self.output_tokens += call.output_tokens
+        self.cost += call.cost
+        self.duration += call.duration
+
+
+# 이번 실행(또는 데몬 작업)의 호출 - export()가 리포트를 쓴 뒤 비움
+_calls: List[LLMCall] = []
+# 프로세스 전체 누적 카운터 (Prometheus counter는 프로세스가 살아 있는 동안 줄어들지 않아야 함)
+_COUNTER_KEYS = ("calls", "errors", "cancelled", "retries", "input_tokens", "output_tokens",
+                 "cost_usd", "duration_seconds", "load_seconds")
+_totals: Dict[Tuple[str, str, str], Dict[str, float]] = {}
+_gauges: Dict[Tuple[str, str, str], Dict[str, float]] = {}  # 마지막으로 내보낸 실행의 속도/지연 값
+_lock = threading.Lock()
+# 현재 컨텍스트의 사용량 합계 - 글 하나에 쓴 호출(요약, 생성, 재생성)을 모아서 생성 결과에 붙일 때 사용
+# (logger.submit으로 넘긴 워커 스레드도 같은 합계에 더해짐)
+_usage: contextvars.ContextVar[Optional[LLMUsage]] = contextvars.ContextVar("llm_usage", default=None)
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    """모델 단가표로 비용(USD) 추정"""
+    for prefix, (input_price, output_price) in PRICING.items():
+        if model.startswith(prefix):
+            return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+    return 0.0
+
+
+def record(call: LLMCall):
+    """호출 1회 기록 (세트명이 비어 있으면 현재 로그 컨텍스트의 set 사용)"""
+    if not call.set_name:
+        call.set_name = logger.get_context().get("set", "")
+    if not call.cost:
+        call.cost = estimate_cost(call.model, call.input_tokens, call.output_tokens)
+    with _lock:
+        _calls.append(call)
+        totals = _totals.setdefault((call.set_name, call.provider, call.model), dict.fromkeys(_COUNTER_KEYS, 0))
+        for key, value in _counter_values(call).items():
+            totals[key] += value
+        usage = _usage.get()
+        if usage is not None:
+            usage.add(call)
+    logger.log(
+        f"[LLM] {call.provider}/{call.model} 입력 {call.input_tokens} / 출력 {call.output_tokens} 토큰, "
+        f"{call.tokens_per_second:.1f} tok/s, TTFT {call.ttft:.2f}s, 재시도 {call.retries}회",
+        llm=asdict(call),
+    )
+
+
+def _counter_values(call: LLMCall) -> Dict[str, float]:
+    return {
+        "calls": 1,
+        "errors": int(not call.ok and not call.cancelled),
+        "cancelled": int(call.cancelled),
+        "retries": call.retries,
+        "input_tokens": call.input_tokens,
+        "output_tokens": call.output_tokens,
+        "cost_usd": call.cost,
+        "duration_seconds": call.duration,
+        "load_seconds": call.load_time,
+    }
+
+
+@contextmanager
+def track_usage():
+    """블록 안에서 기록되는 모든 호출의 합계(LLMUsage)를 모음"""
+    usage = LLMUsage()
+    token = _usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _usage.reset(token)
+
+
+def aggregate(calls: Optional[List[LLMCall]] = None) -> Dict[Tuple[str, str, str], Dict[str, float]]:
+    """이번 실행(또는 주어진 호출 목록)의 (세트, 프로바이더, 모델)별 집계"""
+    if calls is None:
+        with _lock:
+            calls = list(_calls)
+
+    groups: Dict[Tuple[str, str, str], List[LLMCall]] = {}
+    for call in calls:
+        groups.setdefault((call.set_name, call.provider, call.model), []).append(call)
+
+    result = {}
+    for key, items in sorted(groups.items()):
+        ok = [c for c in items if c.ok]
+        speeds = sorted(c.tokens_per_second for c in ok if c.tokens_per_second)
+        ttfts = sorted(c.ttft for c in ok if c.ttft)
+        counters = dict.fromkeys(_COUNTER_KEYS, 0)
+        for call in items:
+            for name, value in _counter_values(call).items():
+                counters[name] += value
+        result[key] = {
+            **counters,
+            "tokens_per_second_p50": logger.percentile(speeds, 50) if speeds else 0.0,
+            "ttft_seconds_p50": logger.percentile(ttfts, 50) if ttfts else 0.0,
+            "ttft_seconds_p95": logger.percentile(ttfts, 95) if ttfts else 0.0,
+        }
+    return result
+
+
+def _write_atomic(path: str, text: str):
+    # node_exporter가 쓰는 도중의 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# (지표 이름, 집계 키, 타입, 설명)
+_PROM_METRICS = [
+    ("blog_llm_calls_total", "calls", "counter", "LLM 호출 수"),
+    ("blog_llm_errors_total", "errors", "counter", "실패한 LLM 호출 수"),
+    ("blog_llm_cancelled_total", "cancelled", "counter", "중간에 취소한 LLM 호출 수"),
+    ("blog_llm_retries_total", "retries", "counter", "LLM 호출 재시도 수"),
+    ("blog_llm_input_tokens_total", "input_tokens", "counter", "입력 토큰 수"),
+    ("blog_llm_output_tokens_total", "output_tokens", "counter", "출력 토큰 수"),
+    ("blog_llm_cost_usd_total", "cost_usd", "counter", "추정 비용(USD)"),
+    ("blog_llm_duration_seconds_total", "duration_seconds", "counter", "LLM 호출 시간 합계"),
+    ("blog_llm_load_seconds_total", "load_seconds", "counter", "모델 로딩 시간 합계"),
+    ("blog_llm_tokens_per_second", "tokens_per_second_p50", "gauge", "출력 토큰 생성 속도 중앙값"),
+    ("blog_llm_ttft_seconds_p50", "ttft_seconds_p50", "gauge", "첫 토큰 지연 중앙값"),
+    ("blog_llm_ttft_seconds_p95", "ttft_seconds_p95", "gauge", "첫 토큰 지연 p95"),
+]
+
+
+def cumulative() -> Dict[Tuple[str, str, str], Dict[str, float]]:
+    """프로세스 시작 이후 누적 카운터 + 마지막 실행의 속도/지연 값 (Prometheus용)"""
+    with _lock:
+        return {
+            key: {**totals, **_gauges.get(key, {
+                "tokens_per_second_p50": 0.0, "ttft_seconds_p50": 0.0, "ttft_seconds_p95": 0.0})}
+            for key, totals in sorted(_totals.items())
+        }
+
+
+def export_prometheus(path: str = PROM_PATH, stats: Optional[Dict] = None) -> str:
+    """node_exporter textfile collector 형식으로 저장 (기본값: 누적 카운터)"""
+    stats = cumulative() if stats is None else stats
+    lines = []
+    for name, key, metric_type, help_text in _PROM_METRICS:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for (set_name, provider, model), values in stats.items():
+            labels = f'set="{_escape(set_name)}",provider="{_escape(provider)}",model="{_escape(model)}"'
+            lines.append(f"{name}{{{labels}}} {values[key]:g}")
+    _write_atomic(path, "\n".join(lines) + "\n")
+    return path
+
+
+def write_report(path: Optional[str] = None, stats: Optional[Dict] = None) -> str:
+    """실행 단위 JSON 리포트 저장 (data/metrics/llm_report_YYYY-MM-DD_HHMMSS.json)"""
+    stats = aggregate() if stats is None else stats
+    if path is None:
+        path = os.path.join(METRICS_DIR, f"llm_report_{datetime.now().strftime('%Y-%m-%d_%H%M%S')}.json")
+    report = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "groups": [
+            {"set": set_name, "provider": provider, "model": model, **values}
+            for (set_name, provider, model), values in stats.items()
+        ],
+        "total_cost_usd": sum(values["cost_usd"] for values in stats.values()),
+    }
+    _write_atomic(path, json.dumps(report, ensure_ascii=False, indent=2))
+    return path
+
+
+def export():
+    """
+    Prometheus textfile(누적) + 이번 실행의 JSON 리포트를 저장하고 실행 기록을 비움 (호출 기록이 없으면 생략)
+    데몬처럼 오래 도는 프로세스에서도 호출 기록이 쌓이지 않고, 리포트는 실행 단위 값만 담음
+    """
+    # 꺼낸 호출만 비움 - 집계하는 동안 다른 스레드가 기록한 호출은 다음 리포트에 들어감
+    with _lock:
+        calls = list(_calls)
+        _calls.clear()
+    stats = aggregate(calls)
+    if not stats:
+        return
+    with _lock:
+        for key, values in stats.items():
+            _gauges[key] = {name: values[name] for name in
+                            ("tokens_per_second_p50", "ttft_seconds_p50", "ttft_seconds_p95")}
+    prom_path = export_prometheus()
+    report_path = write_report(stats=stats)
+    logger.log(f"[LLM] 사용량 지표 저장: {prom_path}, {report_path}")
+
+
+def reset():
+    """이번 실행의 호출 기록 비움 (누적 카운터는 유지)"""
+    with _lock:
+        _calls.clear()
@@ -1,21 +1,316 @@
 # LLM Provider 추상화 인터페이스
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional
+from contextlib import contextmanager
+from datetime import date, timedelta
+from urllib.parse import urlparse
+import hashlib
 import os
 import json
+import sqlite3
+import threading
+import time
 import anthropic
 import requests
 from pydantic import BaseModel
+from modules.ai import llm_metrics
+from modules.ai.llm_metrics import LLMCall
 from modules.utils import logger
 
 DEFAULT_CLAUDE_MODEL="claude-sonnet-4-20250514"
 DEFAULT_OLLAMA_MODEL="deepseek-r1:8b"
 
+# 일시적인 오류(429, 5xx, 연결 끊김) 재시도 - SDK 내부 재시도 대신 직접 해서 횟수를 지표에 남김
+MAX_RETRIES = 2
+RETRY_BACKOFF_SECONDS = 2
+CLAUDE_RETRYABLE_ERRORS = (anthropic.RateLimitError, anthropic.InternalServerError, anthropic.APIConnectionError)
+OLLAMA_RETRYABLE_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+
+def _backoff(attempt: int) -> float:
+    return RETRY_BACKOFF_SECONDS * (2 ** attempt)
+
+
+def _retry_after(source) -> float:
+    """429 응답(또는 응답을 가진 SDK 예외)의 retry-after 헤더(초), 없으면 0"""
+    headers = getattr(getattr(source, "response", source), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after", 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+# 호출 속도 제한 - 같은 API 키(Claude) / 같은 호스트(Ollama)를 쓰는 세트끼리 공유
+# llm 설정의 requests_per_minute, tokens_per_minute, max_concurrency로 덮어쓸 수 있음 (처음 만든 설정 기준)
+CLAUDE_REQUESTS_PER_MINUTE = 50
+CLAUDE_TOKENS_PER_MINUTE = 30_000
+OLLAMA_MAX_CONCURRENCY = 1  # Ollama는 동시 요청을 서버 큐에 쌓을 뿐이라 호스트당 1~2개면 충분
+CHARS_PER_TOKEN = 3  # 호출 전 입력 토큰 추정용 (한국어 기준 보수적으로)
+THROTTLE_STATUS = (429, 503)
+AIMD_DECREASE = 0.5  # 429를 받으면 속도/동시성을 절반으로
+AIMD_INCREASE = 0.05  # 성공할 때마다 설정값의 5%씩 회복
+
+# 일일 LLM 예산 (환경변수, 비우면 무제한) - 소진되면 호출하지 않고 None 반환
+DAILY_TOKEN_BUDGET_ENV = "LLM_DAILY_TOKEN_BUDGET"
+DAILY_COST_BUDGET_ENV = "LLM_DAILY_COST_BUDGET"  # USD
+DEFAULT_BUDGET_PATH = "data/llm_budget.db"  # 날짜별 사용량 - 재실행/--resume/데몬 재시작에도 한도가 이어지도록
+BUDGET_KEEP_DAYS = 30
+
+
+class TokenBucket:
+    """분당 rate만큼 채워지는 토큰 버킷 (최대 1분치 저장, 실제 사용량이 추정보다 많으면 음수로 빚을 짐)"""
+
+    def __init__(self, per_minute: float):
+        self.max_rate = per_minute
+        self.rate = per_minute
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate / 60)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """amount만큼 꺼내려면 기다려야 하는 시간(초), 1분치보다 큰 요청은 1분치만 있으면 통과"""
+        self._refill(now)
+        missing = min(amount, self.rate) - self.tokens
+        return missing * 60 / self.rate if missing > 0 else 0.0
+
+    def take(self, amount: float):
+        self.tokens -= amount
+
+
+class RateLimiter:
+    """요청 수/토큰 수 토큰 버킷 + 동시 실행 제한, 429를 받으면 AIMD로 속도를 줄였다가 서서히 회복"""
+
+    def __init__(self, name: str, requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None, max_concurrency: Optional[int] = None):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_concurrency = max_concurrency
+        self.concurrency = float(max_concurrency) if max_concurrency else None
+        self.in_flight = 0
+        self._cond = threading.Condition()
+
+    def _wait_time(self, tokens: int) -> Optional[float]:
+        """바로 실행 가능하면 0, 버킷이 모자라면 기다릴 시간, 동시 실행 자리가 없으면 None(알림 대기)"""
+        if self.concurrency is not None and self.in_flight >= int(self.concurrency):
+            return None
+        now = time.monotonic()
+        return max(
+            self.requests.wait_time(1, now) if self.requests else 0.0,
+            self.tokens.wait_time(tokens, now) if self.tokens else 0.0,
+        )
+
+    @contextmanager
+    def slot(self, tokens: int):
+        """호출 1회 자리 확보 (tokens: 추정 입력 토큰, 실제 사용량은 charge()로 정산)"""
+        with self._cond:
+            wait = self._wait_time(tokens)
+            if wait != 0:
+                with logger.span("llm.rate_limit", limiter=self.name):
+                    while wait != 0:
+                        self._cond.wait(timeout=wait)
+                        wait = self._wait_time(tokens)
+            if self.requests:
+                self.requests.take(1)
+            if self.tokens:
+                self.tokens.take(tokens)
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.in_flight -= 1
+                self._cond.notify_all()
+
+    def charge(self, tokens: int):
+        """추정치와 실제 사용 토큰의 차이 정산 (출력 토큰 포함)"""
+        if self.tokens and tokens:
+            with self._cond:
+                self.tokens.take(tokens)
+
+    def throttled(self):
+        """429/503 - 속도와 동시 실행 수를 곱으로 줄임"""
+        with self._cond:
+            for bucket in (self.requests, self.tokens):
+                if bucket:
+                    bucket.rate = max(bucket.max_rate * 0.05, bucket.rate * AIMD_DECREASE)
+                    bucket.tokens = min(bucket.tokens, 0.0)
+            if self.concurrency is not None:
+                self.concurrency = max(1.0, self.concurrency * AIMD_DECREASE)
+        logger.log(f"[LLM] {self.name} 속도 제한 응답 - 요청 속도를 낮춤 ({self.describe()})")
+
+    def succeeded(self):
+        """성공 - 설정값까지 합으로 회복"""
+        with self._cond:
+            for bucket in (self.requests, self.tokens):
+                if bucket:
+                    bucket.rate = min(bucket.max_rate, bucket.rate + bucket.max_rate * AIMD_INCREASE)
+            if self.concurrency is not None:
+                self.concurrency = min(float(self.max_concurrency), self.concurrency + AIMD_INCREASE * self.max_concurrency)
+            self._cond.notify_all()
+
+    def describe(self) -> str:
+        parts = []
+        if self.requests:
+            parts.append(f"{self.requests.rate:.0f} req/min")
+        if self.tokens:
+            parts.append(f"{self.tokens.rate:.0f} tok/min")
+        if self.concurrency is not None:
+            parts.append(f"동시 {int(self.concurrency)}")
+        return ", ".join(parts)
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str, **limits) -> RateLimiter:
+    """이름(프로바이더 + 키/호스트)별 공용 제한기 반환"""
+    with _limiters_lock:
+        if name not in _limiters:
+            _limiters[name] = RateLimiter(name, **limits)
+        return _limiters[name]
+
+
+class TokenBudget:
+    """하루 동안 쓸 수 있는 토큰/비용 한도 (날짜가 바뀌면 초기화)
+
+    path가 주어지면 날짜별 사용량을 SQLite에 누적해서, 같은 날 다시 실행한 프로세스(또는 동시에 도는 다른
+    프로세스)도 이미 쓴 양부터 이어서 센다
+    """
+
+    def __init__(self, max_tokens: Optional[int] = None, max_cost: Optional[float] = None,
+                 path: Optional[str] = None):
+        self.max_tokens = max_tokens
+        self.max_cost = max_cost
+        self._lock = threading.Lock()
+        self._conn = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS usage (day TEXT PRIMARY KEY, tokens INTEGER NOT NULL, cost REAL NOT NULL)"
+            )
+            self._conn.execute("DELETE FROM usage WHERE day < ?",
+                               ((date.today() - timedelta(days=BUDGET_KEEP_DAYS)).isoformat(),))
+            self._conn.commit()
+        self._reset(date.today())
+
+    def _reset(self, day: date):
+        self.day = day
+        self.used_tokens = 0
+        self.used_cost = 0.0
+        self._announced = False
+        self._load()
+
+    def _load(self):
+        """저장된 오늘 사용량 반영 (다른 프로세스가 쓴 양 포함)"""
+        if self._conn is None:
+            return
+        row = self._conn.execute("SELECT tokens, cost FROM usage WHERE day = ?", (self.day.isoformat(),)).fetchone()
+        if row:
+            self.used_tokens, self.used_cost = row
+
+    def _roll(self):
+        if date.today() != self.day:
+            self._reset(date.today())
+
+    def exhausted(self) -> bool:
+        with self._lock:
+            self._roll()
+            self._load()
+            over = (self.max_tokens is not None and self.used_tokens >= self.max_tokens) or \
+                   (self.max_cost is not None and self.used_cost >= self.max_cost)
+            if over and not self._announced:
+                self._announced = True
+                logger.log(f"[LLM] 일일 예산 소진 - 오늘은 더 이상 LLM을 호출하지 않음 ({self.describe()})")
+        return over
+
+    def add(self, call: LLMCall):
+        tokens = call.input_tokens + call.output_tokens
+        with self._lock:
+            self._roll()
+            if self._conn is None:
+                self.used_tokens += tokens
+                self.used_cost += call.cost
+                return
+            with self._conn:
+                self._conn.execute(
+                    "INSERT INTO usage (day, tokens, cost) VALUES (?, ?, ?) "
+                    "ON CONFLICT(day) DO UPDATE SET tokens = tokens + excluded.tokens, cost = cost + excluded.cost",
+                    (self.day.isoformat(), tokens, call.cost),
+                )
+            self._load()
+
+    def describe(self) -> str:
+        tokens = f"{self.used_tokens}/{self.max_tokens if self.max_tokens is not None else '∞'} 토큰"
+        cost = f"${self.used_cost:.2f}/{f'${self.max_cost:.2f}' if self.max_cost is not None else '∞'}"
+        return f"{tokens}, {cost}"
+
+
+def _env_number(name: str, cast):
+    value = os.getenv(name)
+    return cast(value) if value else None
+
+
+_budget: Optional[TokenBudget] = None
+_budget_lock = threading.Lock()
+
+
+def get_budget() -> TokenBudget:
+    """프로세스 공용 일일 예산 반환 (사용량은 DEFAULT_BUDGET_PATH에 저장)"""
+    global _budget
+    with _budget_lock:
+        if _budget is None:
+            _budget = TokenBudget(_env_number(DAILY_TOKEN_BUDGET_ENV, int), _env_number(DAILY_COST_BUDGET_ENV, float),
+                                  path=DEFAULT_BUDGET_PATH)
+        return _budget
+
+
+def budget_exhausted() -> bool:
+    """오늘 LLM 예산을 다 썼는지 (글 생성 루프를 멈추는 데 사용)"""
+    return get_budget().exhausted()
+
+
+def _estimate_tokens(system_prompt: str, messages: list) -> int:
+    chars = len(system_prompt) + sum(len(str(msg.get("content", ""))) for msg in messages)
+    return chars // CHARS_PER_TOKEN + 1
+
+
+class GenerationCancelled(Exception):
+    """cancel 이벤트로 생성을 중간에 끊음 (끊기 전까지 쓴 토큰 수를 담음)"""
+
+    def __init__(self, input_tokens: int = 0, output_tokens: int = 0):
+        super().__init__("생성 취소")
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+
+
+def _check_cancel(cancel: Optional[threading.Event]):
+    if cancel is not None and cancel.is_set():
+        raise GenerationCancelled()
+
+
+def _finish(call: LLMCall):
+    llm_metrics.record(call)
+    get_budget().add(call)
+
+
 class LLMProvider(ABC):
     """LLM Provider 추상 베이스 클래스"""
+
+    set_name: str = ""  # 지표 집계용 - get_llm_provider()에서 설정
+    limiter: Optional[RateLimiter] = None
     
     @abstractmethod
-    def generate(self, messages: list, system_prompt: str = "", max_tokens: int = 4096, temperature: float = 0, format: Optional[BaseModel] = None) -> Optional[str]:
+    def generate(self, messages: list, system_prompt: str = "", max_tokens: int = 4096, temperature: float = 0, format: Optional[BaseModel] = None,
+                 cancel: Optional[threading.Event] = None) -> Optional[str]:
         """텍스트 생성
         
         Args:
@@ -24,6 +319,7 @@ class LLMProvider(ABC):
             max_tokens: 최대 토큰 수
             temperature: 온도 (창의성)
             format: 구조화된 출력을 위한 Pydantic 모델 (Ollama만 지원)
+            cancel: 설정되면 스트리밍을 끊고 None 반환 (여러 후보를 동시에 생성할 때 사용)
         """
         pass
     
@@ -32,22 +328,32 @@ class LLMProvider(ABC):
         """Provider 사용 가능 여부 확인"""
         pass
 
+    def warm_up(self):
+        """장시간 실행(데몬) 시작 시 미리 연결/모델 로딩 (기본은 아무것도 하지 않음)"""
+        pass
+
 
 class ClaudeProvider(LLMProvider):
     """Claude API Provider"""
     
-    def __init__(self, model: str = DEFAULT_CLAUDE_MODEL):
+    def __init__(self, model: str = DEFAULT_CLAUDE_MODEL, requests_per_minute: float = CLAUDE_REQUESTS_PER_MINUTE,
+                 tokens_per_minute: float = CLAUDE_TOKENS_PER_MINUTE, max_concurrency: Optional[int] = None):
         self.model = model
         self.api_key = os.getenv('ANTHROPIC_API_KEY')
         self.client = None
+        # 세트가 달라도 같은 키면 같은 한도를 나눠 씀 (키 자체는 이름에 남기지 않음)
+        key_id = hashlib.sha256((self.api_key or "").encode("utf-8")).hexdigest()[:8]
+        self.limiter = get_rate_limiter(f"claude:{key_id}", requests_per_minute=requests_per_minute,
+                                        tokens_per_minute=tokens_per_minute, max_concurrency=max_concurrency)
         
         if self.api_key:
             try:
-                self.client = anthropic.Anthropic(api_key=self.api_key)
+                self.client = anthropic.Anthropic(api_key=self.api_key, max_retries=0)
             except Exception as e:
                 logger.log(f"Claude 클라이언트 초기화 실패: {e}")
     
-    def generate(self, messages: list, system_prompt: str = "", max_tokens: int = 4096, temperature: float = 0, format: Optional[BaseModel] = None) -> Optional[str]:
+    def generate(self, messages: list, system_prompt: str = "", max_tokens: int = 4096, temperature: float = 0, format: Optional[BaseModel] = None,
+                 cancel: Optional[threading.Event] = None) -> Optional[str]:
         """Claude API로 텍스트 생성
         
         Note: Claude는 구조화된 출력 format을 지원하지 않으므로 format 파라미터는 무시됩니다.
@@ -60,21 +366,76 @@ class ClaudeProvider(LLMProvider):
         # format 파라미터 경고 (디버그용)
         if format is not None:
             logger.log("Claude는 구조화된 출력 format을 지원하지 않습니다. format 파라미터가 무시됩니다.")
+
+        if budget_exhausted():
+            return None
             
+        call = LLMCall(set_name=self.set_name, provider="claude", model=self.model)
+        estimated = _estimate_tokens(system_prompt, messages)
+        started = time.perf_counter()
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=max_tokens,
-                temperature=temperature,
-                system=system_prompt,
-                messages=messages
-            )
-            
+            for attempt in range(MAX_RETRIES + 1):
+                try:
+                    with self.limiter.slot(estimated), logger.span("llm", provider="claude", model=self.model):
+                        _check_cancel(cancel)
+                        response, attempt_started, first_token_at = self._stream(
+                            cancel,
+                            model=self.model,
+                            max_tokens=max_tokens,
+                            temperature=temperature,
+                            system=system_prompt,
+                            messages=messages
+                        )
+                    break
+                except CLAUDE_RETRYABLE_ERRORS as e:
+                    if isinstance(e, anthropic.RateLimitError):
+                        self.limiter.throttled()
+                    if attempt == MAX_RETRIES:
+                        raise
+                    call.retries += 1
+                    delay = max(_backoff(attempt), _retry_after(e))
+                    logger.log(f"Claude API 일시 오류, {delay}초 후 재시도 ({attempt + 1}/{MAX_RETRIES}): {e}")
+                    time.sleep(delay)
+
+            finished = time.perf_counter()
+            call.input_tokens = response.usage.input_tokens
+            call.output_tokens = response.usage.output_tokens
+            self.limiter.succeeded()
+            self.limiter.charge(call.input_tokens + call.output_tokens - estimated)
+            if first_token_at is not None:
+                call.ttft = first_token_at - attempt_started
+                if finished > first_token_at:
+                    call.tokens_per_second = call.output_tokens / (finished - first_token_at)
             return response.content[0].text
-            
+
+        except GenerationCancelled as e:
+            call.ok = False
+            call.cancelled = True
+            call.input_tokens, call.output_tokens = e.input_tokens, e.output_tokens
+            return None
         except Exception as e:
+            call.ok = False
             logger.log(f"Claude API 호출 실패: {e}")
             return None
+        finally:
+            call.duration = time.perf_counter() - started
+            _finish(call)
+
+    def _stream(self, cancel: Optional[threading.Event] = None, **request):
+        """스트리밍으로 호출해서 첫 토큰 시각을 잰 뒤 최종 메시지(usage 포함) 반환
+        cancel이 설정되면 스트림을 닫아(연결 종료) 남은 출력 토큰 생성을 멈춤
+        """
+        attempt_started = time.perf_counter()
+        first_token_at = None
+        with self.client.messages.stream(**request) as stream:
+            for _ in stream.text_stream:
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                if cancel is not None and cancel.is_set():
+                    usage = stream.current_message_snapshot.usage
+                    raise GenerationCancelled(usage.input_tokens, usage.output_tokens)
+            response = stream.get_final_message()
+        return response, attempt_started, first_token_at
     
     def is_available(self) -> bool:
         """Claude API 사용 가능 여부 확인"""
@@ -84,17 +445,29 @@ class ClaudeProvider(LLMProvider):
 class OllamaProvider(LLMProvider):
     """Ollama Provider"""
     
-    def __init__(self, model: str = DEFAULT_OLLAMA_MODEL, base_url: str = "http://localhost:11434"):
+    def __init__(self, model: str = DEFAULT_OLLAMA_MODEL, base_url: str = "http://localhost:11434",
+                 keep_alive: Optional[str] = None, requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None, max_concurrency: int = OLLAMA_MAX_CONCURRENCY):
         self.model = model
         self.base_url = base_url.rstrip('/')
         self.api_url = f"{self.base_url}/api/generate"
+        self.keep_alive = keep_alive  # 예: "30m" - 호출 후 모델을 메모리에 유지할 시간
+        # 같은 호스트의 모든 모델/세트가 동시 실행 제한을 공유
+        self.limiter = get_rate_limiter(f"ollama:{urlparse(self.base_url).netloc}", requests_per_minute=requests_per_minute,
+                                        tokens_per_minute=tokens_per_minute, max_concurrency=max_concurrency)
     
-    def generate(self, messages: list, system_prompt: str = "", max_tokens: int = 4096, temperature: float = 0, format: Optional[BaseModel] = None) -> Optional[str]:
+    def generate(self, messages: list, system_prompt: str = "", max_tokens: int = 4096, temperature: float = 0, format: Optional[BaseModel] = None,
+                 cancel: Optional[threading.Event] = None) -> Optional[str]:
         """Ollama API로 텍스트 생성
         
         Args:
             format: Pydantic BaseModel - 제공시 JSON 스키마로 구조화된 출력 강제
         """
+        if budget_exhausted():
+            return None
+
+        call = LLMCall(set_name=self.set_name, provider="ollama", model=self.model)
+        started = time.perf_counter()
         try:
             # messages를 Ollama 형식으로 변환
             prompt = ""
@@ -110,12 +483,14 @@ class OllamaProvider(LLMProvider):
             data = {
                 "model": self.model,
                 "prompt": prompt,
-                "stream": False,
+                "stream": True,  # 조각 단위로 받아 첫 토큰 시각을 재고, 취소 시 연결을 끊어 생성을 멈춤
                 "options": {
                     "temperature": temperature,
                     "num_predict": max_tokens
                 }
             }
+            if self.keep_alive:
+                data["keep_alive"] = self.keep_alive
             
             # 구조화된 출력을 위한 format 파라미터 추가 (Ollama 0.5.0+)
             if format is not None:
@@ -127,26 +502,109 @@ class OllamaProvider(LLMProvider):
                 except Exception as e:
                     logger.log(f"format 스키마 생성 실패, 일반 모드로 진행: {e}")
             
-            response = requests.post(
-                self.api_url,
-                json=data,
-                timeout=10 * 60  # 10분 타임아웃
-            )
+            estimated = _estimate_tokens(system_prompt, messages)
+            for attempt in range(MAX_RETRIES + 1):
+                delay = _backoff(attempt)
+                try:
+                    with self.limiter.slot(estimated), logger.span("llm", provider="ollama", model=self.model):
+                        _check_cancel(cancel)
+                        response, result, attempt_started, first_token_at = self._stream(data, cancel)
+                    if response.status_code in THROTTLE_STATUS:
+                        self.limiter.throttled()
+                        delay = max(delay, _retry_after(response))
+                    elif response.status_code < 500:
+                        break
+                    if attempt == MAX_RETRIES:
+                        break
+                    reason = f"{response.status_code} - {response.text}"
+                except OLLAMA_RETRYABLE_ERRORS as e:
+                    if attempt == MAX_RETRIES:
+                        raise
+                    reason = e
+                call.retries += 1
+                logger.log(f"Ollama API 일시 오류, {delay}초 후 재시도 ({attempt + 1}/{MAX_RETRIES}): {reason}")
+                time.sleep(delay)
             
             if response.status_code == 200:
-                result = response.json()
+                self.limiter.succeeded()
+                # Ollama 응답의 *_duration 값은 나노초 단위
+                call.input_tokens = result.get("prompt_eval_count", 0)
+                call.output_tokens = result.get("eval_count", 0)
+                call.load_time = result.get("load_duration", 0) / 1e9
+                if first_token_at is not None:
+                    call.ttft = first_token_at - attempt_started
+                if result.get("eval_duration"):
+                    call.tokens_per_second = call.output_tokens / (result["eval_duration"] / 1e9)
+                self.limiter.charge(call.input_tokens + call.output_tokens - estimated)
                 return result.get("response", "")
             else:
+                call.ok = False
                 logger.log(f"Ollama API 오류: {response.status_code} - {response.text}")
                 return None
-                
+
+        except GenerationCancelled as e:
+            call.ok = False
+            call.cancelled = True
+            call.output_tokens = e.output_tokens
+            return None
         except requests.exceptions.RequestException as e:
+            call.ok = False
             logger.log(f"Ollama API 연결 실패: {e}")
             return None
         except Exception as e:
+            call.ok = False
             logger.log(f"Ollama API 호출 실패: {e}")
             return None
+        finally:
+            call.duration = time.perf_counter() - started
+            _finish(call)
     
+    def _stream(self, data: dict, cancel: Optional[threading.Event] = None):
+        """
+        스트리밍 응답(NDJSON)을 이어 붙여 (응답, 마지막 조각 + 전체 텍스트, 시작 시각, 첫 토큰 시각) 반환
+        200이 아니면 결과는 None, cancel이 설정되면 연결을 끊어 Ollama가 생성을 멈추게 함
+        """
+        attempt_started = time.perf_counter()
+        first_token_at = None
+        response = requests.post(self.api_url, json=data, timeout=10 * 60, stream=True)  # 10분 타임아웃
+        if response.status_code != 200:
+            # 오류 본문(호출한 쪽에서 메시지/429 처리에 사용)만 읽어 두고 연결을 닫음
+            with response:
+                _ = response.content
+            return response, None, attempt_started, first_token_at
+
+        pieces = []
+        result = {}
+        with response:
+            for line in response.iter_lines(chunk_size=None):  # 조각이 도착하는 대로 (기본 512바이트 버퍼링 없이)
+                if cancel is not None and cancel.is_set():
+                    raise GenerationCancelled(output_tokens=len(pieces))  # 조각 하나가 대략 토큰 하나
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise RuntimeError(chunk["error"])
+                if chunk.get("response"):
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                    pieces.append(chunk["response"])
+                if chunk.get("done"):
+                    result = chunk
+                    break
+        result["response"] = "".join(pieces)
+        return response, result, attempt_started, first_token_at
+
+    def warm_up(self):
+        """프롬프트 없이 generate를 호출하면 Ollama가 모델만 메모리에 올림"""
+        data = {"model": self.model}
+        if self.keep_alive:
+            data["keep_alive"] = self.keep_alive
+        try:
+            with logger.span("llm.warm_up", provider="ollama", model=self.model):
+                requests.post(self.api_url, json=data, timeout=10 * 60)
+        except requests.exceptions.RequestException as e:
+            logger.log(f"Ollama 모델 미리 로딩 실패: {e}")
+
     def is_available(self) -> bool:
         """Ollama 서버 사용 가능 여부 확인"""
         try:
@@ -164,15 +622,17 @@ class LLMProviderFactory:
         """설정에 따라 LLM Provider 생성"""
         provider_type = config.get("provider", "ollama").lower()
         model = config.get("model", "")
+        # 설정에 있는 속도 제한만 넘기고 나머지는 프로바이더 기본값 사용
+        limits = {key: config[key] for key in ("requests_per_minute", "tokens_per_minute", "max_concurrency") if key in config}
         
         if provider_type == "claude":
             default_model = "claude-sonnet-4-20250514"
-            return ClaudeProvider(model=model or default_model)
+            return ClaudeProvider(model=model or default_model, **limits)
         
         elif provider_type == "ollama":
             default_model = "gemma3n:e2b"
             base_url = config.get("base_url", "http://localhost:11434")
-            return OllamaProvider(model=model or default_model, base_url=base_url)
+            return OllamaProvider(model=model or default_model, base_url=base_url, keep_alive=config.get("keep_alive"), **limits)
         
         else:
             logger.log(f"지원하지 않는 LLM Provider: {provider_type}")
@@ -184,22 +644,70 @@ class LLMProviderFactory:
         return ClaudeProvider()
 
 
+# 작업별 모델 분리 - llm.tasks.<작업>에 설정이 있으면 그 작업만 다른 Provider/모델 사용
+# (예: 주제 선정/요약은 작은 로컬 모델, 본문 작성만 Claude)
+TASK_SELECTION = "selection"
+TASK_WRITING = "writing"
+TASK_SNS = "sns"
+TASK_SUMMARIZATION = "summarization"
+LLM_TASKS = (TASK_SELECTION, TASK_WRITING, TASK_SNS, TASK_SUMMARIZATION)
+
+# 세트/설정별 Provider 재사용 (클라이언트 연결과 사용 가능 여부 확인을 호출마다 반복하지 않도록)
+_providers: Dict[str, LLMProvider] = {}
+_unknown_tasks = set()  # 오타 난 작업 이름은 한 번만 경고
+
+
+def resolve_llm_config(llm_config: Dict[str, Any], task: Optional[str] = None) -> Dict[str, Any]:
+    """
+    작업에 쓸 llm 설정 반환
+    작업 설정이 세트 기본값과 같은 provider면 기본값 위에 덮어쓰고, provider가 다르면 작업 설정만 사용
+    (기본값의 모델명/주소가 다른 provider로 새지 않도록)
+    """
+    base = {key: value for key, value in llm_config.items() if key != "tasks"}
+    tasks = llm_config.get("tasks") or {}
+    for name in tasks:
+        if name not in LLM_TASKS and name not in _unknown_tasks:
+            _unknown_tasks.add(name)
+            logger.log(f"알 수 없는 LLM 작업 설정 무시: {name} (가능한 값: {', '.join(LLM_TASKS)})")
+    task_config = tasks.get(task) if task else None
+    if not task_config:
+        return base
+    if task_config.get("provider", base.get("provider", "ollama")).lower() == str(base.get("provider", "ollama")).lower():
+        return {**base, **task_config}
+    return dict(task_config)
+
+
 # 편의 함수들
-def get_llm_provider(set_name: str, accounts_data: Dict[str, Any] = None) -> LLMProvider:
-    """계정 설정에 따라 LLM Provider 가져오기"""
+def get_llm_provider(set_name: str, accounts_data: Dict[str, Any] = None, task: Optional[str] = None) -> LLMProvider:
+    """계정 설정에 따라 LLM Provider 가져오기 (task: LLM_TASKS 중 하나, 작업별 설정이 없으면 세트 기본값)"""
     if accounts_data is None:
         from config import load_accounts
         accounts_data = load_accounts()
     
     account_info = accounts_data.get(set_name, {})
-    llm_config = account_info.get("llm", {})
+    llm_config = resolve_llm_config(account_info.get("llm", {}), task)
     
     if llm_config:
+        cache_key = f"{set_name}:{json.dumps(llm_config, sort_keys=True, default=str)}"
+        if cache_key in _providers:
+            return _providers[cache_key]
         provider = LLMProviderFactory.create_provider(llm_config)
         if provider and provider.is_available():
+            provider.set_name = set_name
+            _providers[cache_key] = provider
             return provider
+        elif task and llm_config != resolve_llm_config(account_info.get("llm", {})):
+            logger.log(f"{task} 작업용 LLM Provider를 사용할 수 없어 세트 기본 설정을 사용합니다: {set_name}")
+            return get_llm_provider(set_name, accounts_data)
         else:
             logger.log(f"설정된 LLM Provider를 사용할 수 없어 기본값(Claude)을 사용합니다: {set_name}")
     
     # 기본값으로 Claude 사용
-    return LLMProviderFactory.get_default_provider()
\ No newline at end of file
+    provider = LLMProviderFactory.get_default_provider()
+    provider.set_name = set_name
+    return provider
+
+
+def get_task_providers(set_name: str, accounts_data: Dict[str, Any] = None) -> Dict[str, LLMProvider]:
+    """세트가 쓰는 작업별 Provider (데몬 시작 시 미리 준비용)"""
+    return {task: get_llm_provider(set_name, accounts_data, task=task) for task in LLM_TASKS}
@@ -1,8 +1,143 @@
-# SNS용 짧은 글 작성
+# SNS용 짧은 글 작성 - 세트의 블로그 글 전체를 LLM 호출 한 번으로 X/Threads 포스트로 변환
+import json
+import re
+from typing import Dict, List
 
-def generate_sns_posts(blog_post):
-    print(f"[AI] SNS 글 생성")
+from pydantic import ValidationError
+
+from config import load_accounts
+from modules.ai.content_writer import Post
+from modules.ai.llm_providers import get_llm_provider, TASK_SNS
+from modules.ai.pydantic_models import SocialMediaBatch, SocialMediaPost, SocialMediaPostSet
+from modules.utils import logger
+
+SNS_PLATFORMS = ("x", "threads")
+SUMMARY_FALLBACK_CHARS = 200  # 요약이 없는 글은 본문 앞부분만 잘라서 전달
+TOKENS_PER_POST = 400
+MAX_CONTENT_CHARS = 280  # SocialMediaPost.content 최대 길이 - 넘으면 잘라서 사용
+
+
+def _plain_text(html: str) -> str:
+    return re.sub(r"\s+", " ", re.sub(r"<[^>]+>", " ", html)).strip()
+
+
+def _digest(post: Post) -> str:
+    """블로그 글 대신 프롬프트에 넣을 제목 + 요약"""
+    summary = post.summary or _plain_text(post.content)[:SUMMARY_FALLBACK_CHARS]
+    tags = ", ".join(post.tag) if post.tag else ""
+    return f"제목: {post.title}\n요약: {summary}\n태그: {tags}"
+
+
+def _format(sns: SocialMediaPost) -> str:
+    parts = [sns.content]
+    if sns.call_to_action:
+        parts.append(sns.call_to_action)
+    if sns.hashtags:
+        parts.append(" ".join(tag if tag.startswith("#") else f"#{tag}" for tag in sns.hashtags))
+    return "\n".join(parts)
+
+
+def _fallback(post: Post) -> Dict[str, str]:
+    """LLM 응답을 쓸 수 없을 때 제목으로 만드는 기본 문구"""
+    tags = " ".join(f"#{tag}" for tag in post.tag[:3]) or "#트렌드"
     return {
-        "x": f"🔥 {blog_post[:20]}... #트렌드",
-        "threads": f"💡 {blog_post[:30]}...\n여러분 생각은 어때요?"
+        "x": f"🔥 {post.title} {tags}",
+        "threads": f"💡 {post.title}\n여러분 생각은 어때요?",
     }
+
+
+def _trim(text: str) -> str:
+    return text if len(text) <= MAX_CONTENT_CHARS else text[:MAX_CONTENT_CHARS - 1].rstrip() + "…"
+
+
+def _parse(raw_response: str) -> List[SocialMediaPostSet]:
+    """
+    응답의 글별 항목을 하나씩 검증 (배치 전체를 한 번에 검증하면 한 항목만 틀려도 모든 글이 기본 문구가 됨)
+    content가 너무 길면 잘라서 쓰고, 그래도 검증에 실패한 항목만 버림
+    """
+    # JSON 코드 블록 마커 제거
+    cleaned_response = raw_response.strip()
+    if cleaned_response.startswith('```json'):
+        cleaned_response = cleaned_response[7:]
+    if cleaned_response.endswith('```'):
+        cleaned_response = cleaned_response[:-3]
+    data = json.loads(cleaned_response.strip())
+
+    items = []
+    for item in data.get("posts", []) if isinstance(data, dict) else []:
+        if isinstance(item, dict):
+            for platform in SNS_PLATFORMS:
+                sns = item.get(platform)
+                if isinstance(sns, dict) and isinstance(sns.get("content"), str):
+                    sns["content"] = _trim(sns["content"])
+        try:
+            items.append(SocialMediaPostSet.model_validate(item))
+        except ValidationError as e:
+            logger.log(f"[AI] SNS 글 항목 검증 실패 - 해당 글은 기본 문구 사용: {e.errors()[0]['msg']}")
+    return items
+
+
+def generate_sns_posts(set_name: str, blog_posts: List[Post]) -> Dict[str, List[str]]:
+    """
+    세트의 블로그 글 전체에 대한 SNS 포스트를 구조화된 출력 한 번으로 생성
+    :return: {'x': [...], 'threads': [...]} - 각 목록은 blog_posts와 같은 순서
+    """
+    if not blog_posts:
+        return {platform: [] for platform in SNS_PLATFORMS}
+
+    account_info = load_accounts().get(set_name, {})
+    account_topic = account_info.get('topic', '일반')
+    account_language = account_info.get('language', '한국어')
+
+    posts_text = "\n\n".join(f"[{i + 1}]\n{_digest(post)}" for i, post in enumerate(blog_posts))
+    prompt = f"""
+아래 블로그 글 {len(blog_posts)}개를 각각 홍보하는 SNS 포스트를 작성해줘.
+
+{posts_text}
+
+요구 사항:
+1. 글마다 X(트위터)용과 Threads용 포스트를 하나씩 작성해.
+2. content는 280자 이내로, X는 짧고 강렬하게, Threads는 대화하듯 질문을 던지는 톤으로 작성해.
+3. hashtags는 '#' 없이 2~4개, call_to_action은 블로그 글을 읽도록 유도하는 짧은 문구로 작성해.
+4. index에는 글 번호([1], [2] ...)를 그대로 넣어.
+5. {account_language}로 작성해.
+
+반드시 아래 형식의 JSON만 출력해.
+{{
+  "posts": [
+    {{"index": 1, "x": {{"content": "...", "hashtags": [...], "call_to_action": "..."}},
+                 "threads": {{"content": "...", "hashtags": [...], "call_to_action": "..."}}}}
+  ]
+}}
+"""
+
+    by_index: Dict[int, Dict[str, str]] = {}
+    try:
+        llm_provider = get_llm_provider(set_name, task=TASK_SNS)
+        raw_response = llm_provider.generate(
+            messages=[{"role": "user", "content": prompt}],
+            system_prompt=f'당신은 {account_topic} 블로그의 SNS 마케팅 담당자입니다.',
+            max_tokens=TOKENS_PER_POST * len(blog_posts) + 256,
+            temperature=0.7,
+            format=SocialMediaBatch
+        )
+        if raw_response and raw_response.strip():
+            for item in _parse(raw_response):
+                by_index[item.index] = {"x": _format(item.x), "threads": _format(item.threads)}
+        else:
+            logger.log("[AI] SNS 글 생성 - LLM 응답 없음")
+    except Exception as e:
+        logger.log(f"[AI] SNS 글 생성 중 오류 발생: {e}")
+
+    sns_posts: Dict[str, List[str]] = {platform: [] for platform in SNS_PLATFORMS}
+    missing = 0
+    for i, post in enumerate(blog_posts):
+        generated = by_index.get(i + 1)
+        if generated is None:
+            missing += 1
+            generated = _fallback(post)
+        for platform in SNS_PLATFORMS:
+            sns_posts[platform].append(generated[platform])
+
+    logger.log(f"[AI] {set_name} 세트 SNS 글 {len(blog_posts)}건 생성 (기본 문구 사용 {missing}건)")
+    return sns_posts
@@ -30,7 +30,8 @@ def get_default_prompt_template(topic: Dict, account_topic: str, account_languag
   "title": "블로그 글 제목",
   "content": "HTML 형식의 본문 전체",
   "category": {account_category} 중에서 가장 적합한 단어 1가지,
-  "tags": 해당 글의 해시태그에 적합한 단어의 배열
+  "tags": 해당 글의 해시태그에 적합한 단어의 배열,
+  "summary": "글의 핵심을 2~3문장으로 요약 (SNS 홍보 글에 사용)"
 }}
 """
 
@@ -51,7 +52,8 @@ def get_ollama_prompt_template(topic: Dict, account_topic: str, account_language
   "title": "제목 (클릭을 유도하는 형태)",
   "content": "HTML 형식의 본문 전체 (h3, h4, p, strong, ul/li, a 태그 등을 적절히 활용)",
   "category": {account_category} 중에서 가장 적합한 단어 1가지,
-  "tags": 해당 글의 해시태그에 적합한 단어의 배열
+  "tags": 해당 글의 해시태그에 적합한 단어의 배열,
+  "summary": "글의 핵심을 2~3문장으로 요약 (SNS 홍보 글에 사용)"
 }}
 3. 커뮤니티에서 본 내용을 소개한다 정도로 출처를 얘기하고 "레딧"이라는 단어는 사용하지 말아줘.
 4. 본문은 HTML 태그를 활용해 구성하되, **h3/h4 소제목**, **굵은 글씨(strong)**, **목록(ul/li)**, **링크(a)** 등을 적절히 배치해 가독성과 검색 최적화를 동시에 달성해라.
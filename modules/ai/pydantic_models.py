@@ -35,6 +35,18 @@ class SocialMediaPost(BaseModel):
     call_to_action: Optional[str] = Field(description="행동 유도 문구", default="")
 
 
+class SocialMediaPostSet(BaseModel):
+    """블로그 글 하나에 대한 플랫폼별 SNS 포스트"""
+    index: int = Field(description="입력 블로그 글 번호 (1부터)", ge=1)
+    x: SocialMediaPost = Field(description="X(트위터)용 포스트")
+    threads: SocialMediaPost = Field(description="Threads용 포스트")
+
+
+class SocialMediaBatch(BaseModel):
+    """세트의 모든 블로그 글에 대한 SNS 포스트를 한 번에 생성할 때 사용하는 응답 모델"""
+    posts: List[SocialMediaPostSet] = Field(description="블로그 글별 SNS 포스트 목록", default=[])
+
+
 # 분석 결과 응답 모델
 class AnalysisResult(BaseModel):
     """AI 분석 결과용 응답 모델"""
@@ -0,0 +1,116 @@
+# 원문 요약 단계 - 긴 기사 본문을 글 작성 전에 한 번만 짧은 브리프로 압축
+#
+# 글 작성 프롬프트에 원문 전체 대신 브리프를 넣어 Ollama의 프롬프트 처리 시간과 Claude 입력 토큰을 줄인다.
+# 요약은 기사 내용 지문(fingerprint)별로 캐시하므로 재시도/재생성/--resume 때 다시 만들지 않는다.
+import json
+from typing import Dict, Optional
+
+from modules.ai.llm_providers import get_llm_provider, TASK_SUMMARIZATION
+from modules.ai.pydantic_models import NewsSummary
+from modules.storage.summary_cache import get_cache
+from modules.utils import logger
+from modules.utils.fingerprint import content_hash
+
+MIN_CONTENT_CHARS = 1500  # 이보다 짧은 본문은 요약하지 않고 그대로 사용
+MAX_SOURCE_CHARS = 20000  # 요약 입력 상한 (아주 긴 글은 앞부분만)
+SUMMARY_MAX_TOKENS = 1024
+
+# NewsSummary 필드 길이 제한 (Claude는 스키마를 강제하지 않으므로 파싱 전에 잘라 맞춤)
+_FIELD_LIMITS = {"headline": 100, "summary": 500}
+
+
+def _fingerprint(topic: Dict) -> str:
+    """수집 시 기록된 지문 우선, 없으면 제목+본문으로 계산 (Article.fingerprint와 같은 방식)"""
+    return topic.get('fingerprint') or content_hash(f"{topic.get('title', '')}\n{topic.get('content', '')}")
+
+
+def _parse(raw_response: str) -> Optional[NewsSummary]:
+    try:
+        return NewsSummary.model_validate_json(raw_response)
+    except Exception:
+        pass
+    try:
+        cleaned = raw_response.strip().removeprefix('```json').removesuffix('```').strip()
+        data = json.loads(cleaned)
+        for field, limit in _FIELD_LIMITS.items():
+            if isinstance(data.get(field), str):
+                data[field] = data[field][:limit]
+        return NewsSummary.model_validate(data)
+    except Exception as e:
+        logger.log(f"요약 응답 파싱 실패: {e}")
+        return None
+
+
+def format_brief(summary: NewsSummary) -> str:
+    """글 작성 프롬프트의 '내용'에 넣을 브리프"""
+    lines = [summary.headline, summary.summary]
+    lines += [f"- {point}" for point in summary.key_points]
+    return "\n".join(line for line in lines if line)
+
+
+def summarize_topic(set_name: str, topic: Dict) -> Optional[NewsSummary]:
+    """긴 원문을 NewsSummary로 요약 (짧은 본문이거나 실패하면 None), 같은 지문은 캐시에서 반환"""
+    content = topic.get('content') or ''
+    if len(content) < MIN_CONTENT_CHARS:
+        return None
+
+    fingerprint = _fingerprint(topic)
+    cache = get_cache()
+    cached = cache.get(fingerprint)
+    if cached:
+        try:
+            return NewsSummary.model_validate(cached)
+        except Exception:
+            pass  # 모델이 바뀌어 맞지 않는 예전 캐시는 다시 요약
+
+    prompt = f"""
+아래 글을 블로그 글 작성용 자료로 쓸 수 있게 요약해줘.
+
+제목: {topic.get('title', '')}
+내용: {content[:MAX_SOURCE_CHARS]}
+
+요구 사항:
+1. 원문의 언어 그대로 작성해.
+2. 사실, 수치, 고유명사, 인용은 빠뜨리지 말고 정확히 옮겨.
+3. "headline"은 100자 이내, "summary"는 500자 이내, "key_points"는 핵심 내용 3~7개.
+4. "sentiment"는 positive/negative/neutral 중 하나.
+
+출력은 반드시 JSON 형식만 출력해.
+{{
+  "headline": "요약 헤드라인",
+  "summary": "요약 내용",
+  "key_points": ["핵심 내용"],
+  "sentiment": "neutral",
+  "category": "카테고리"
+}}
+"""
+    try:
+        llm_provider = get_llm_provider(set_name, task=TASK_SUMMARIZATION)
+        with logger.span("summarize"):
+            raw_response = llm_provider.generate(
+                messages=[{"role": "user", "content": prompt}],
+                system_prompt="당신은 긴 글에서 핵심 사실만 정확하게 뽑아내는 편집자입니다.",
+                max_tokens=SUMMARY_MAX_TOKENS,
+                temperature=0,
+                format=NewsSummary,
+            )
+    except Exception as e:
+        logger.log(f"원문 요약 중 오류 발생: {e}")
+        return None
+    if not raw_response or not raw_response.strip():
+        return None
+
+    summary = _parse(raw_response)
+    if summary is not None:
+        cache.put(fingerprint, summary.model_dump(), getattr(llm_provider, "model", ""))
+    return summary
+
+
+def brief_topic(set_name: str, topic: Dict) -> Dict:
+    """글 작성 프롬프트용 주제 - 본문이 길면 내용을 요약 브리프로 바꾼 사본 (요약하지 않으면 원래 주제)"""
+    summary = summarize_topic(set_name, topic)
+    if summary is None:
+        return topic
+    brief = format_brief(summary)
+    logger.log(f"원문 요약 사용: {len(topic['content'])}자 → {len(brief)}자 ({topic.get('title', '')})")
+    return {**topic, 'content': brief}
@@ -0,0 +1,94 @@
+# 수집기 공통 인터페이스 - 모든 소스는 Article을 반환
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Protocol
+
+from modules.models.article import Article
+
+
+class Collector(Protocol):
+    """accounts.yaml의 소스 설정 하나를 받아 Article을 만들어내는 수집기"""
+
+    def collect(self, set_name: str, config: dict) -> Iterable[Article]:
+        ...
+
+    # 선택 사항: commit(set_name, config, articles) - 수집한 Article이 저장된 뒤 호출됨 (수집 상태를 그때 기록하는 소스용)
+
+
+class RedditCollector:
+    """type: reddit / subreddits: [...]"""
+
+    def collect(self, set_name: str, config: dict) -> Iterable[Article]:
+        from modules.collect import reddit
+        return reddit.fetch_reddit_posts(subreddits=config["subreddits"])
+
+
+class NewsApiCollector:
+    """type: news_api / keywords: [[...], ...] / categories: [...] / count / language / country"""
+
+    def collect(self, set_name: str, config: dict) -> Iterable[Article]:
+        from modules.collect import news_api
+        keyword_groups = config.get("keywords", [])
+        # keywords: [a, b] 처럼 한 그룹만 적은 경우도 허용
+        if keyword_groups and isinstance(keyword_groups[0], str):
+            keyword_groups = [keyword_groups]
+        return news_api.fetch_news_concurrently(
+            keyword_groups=keyword_groups,
+            categories=config.get("categories", []),
+            count=config.get("count", 100),
+            language=config.get("language", "en"),
+            country=config.get("country", "us"),
+        )
+
+
+class RssCollector:
+    """type: rss / feeds: [...]"""
+
+    def collect(self, set_name: str, config: dict) -> Iterable[Article]:
+        from modules.collect import rss
+        return rss.fetch_news_by_rss(config.get("feeds"), subject=set_name, set_name=set_name)
+
+    def commit(self, set_name: str, config: dict, articles: List[Article]):
+        from modules.collect import rss
+        rss.commit_state(set_name, config.get("feeds"), articles)
+
+
+class GoogleTrendsCollector:
+    """type: google_trends / geo / count - 인기 검색어와 관련 뉴스를 Article로 변환"""
+
+    def collect(self, set_name: str, config: dict) -> Iterable[Article]:
+        from modules.collect import google_trends
+        geo = config.get("geo", "KR")
+        for item in google_trends.get_trends(geo)[:config.get("count", 5)]:
+            snippets = "\n".join(news["snippet"] or news["title"] for news in item.news if news.get("title"))
+            published_at = ""
+            if item.started_timestamp:
+                published_at = datetime.fromtimestamp(item.started_timestamp, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+            yield Article(
+                title=item.keyword,
+                content=snippets,
+                url=item.news[0]["url"] if item.news else "",
+                source="google_trends",
+                subject=geo,
+                published_at=published_at,
+                source_id=item.keyword,
+                score=item.volume,
+            )
+
+
+# 소스 type -> 수집기 레지스트리
+COLLECTORS: Dict[str, Collector] = {
+    "reddit": RedditCollector(),
+    "news_api": NewsApiCollector(),
+    "rss": RssCollector(),
+    "google_trends": GoogleTrendsCollector(),
+}
+
+
+def get_sources(account_set: dict) -> List[dict]:
+    """세트의 소스 목록 (sources가 없으면 기존 subreddits 설정을 reddit 소스로 사용)"""
+    sources = account_set.get("sources")
+    if sources:
+        return sources
+    if account_set.get("subreddits"):
+        return [{"type": "reddit", "subreddits": account_set["subreddits"]}]
+    return []
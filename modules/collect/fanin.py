@@ -0,0 +1,87 @@
+# 세트의 모든 소스를 병렬로 수집해서 하나로 합치는 fan-in 단계
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, List, Optional
+
+from modules.collect.base import COLLECTORS, get_sources
+from modules.models.article import Article
+from modules.utils import logger
+
+DEFAULT_SOURCE_TIMEOUT = 120  # 초
+
+
+def _run_collector(collector, set_name: str, source: dict) -> List[Article]:
+    # 제너레이터 수집기도 워커 스레드 안에서 끝까지 소비
+    with logger.span("collect.source", source=source.get("type")):
+        return list(collector.collect(set_name, source))
+
+
+def collect_for_set(set_name: str, account_set: dict,
+                    on_batch: Optional[Callable[[List[Article]], None]] = None) -> List[Article]:
+    """
+    세트에 선언된 소스를 동시에 수집
+    :param on_batch: 소스 하나가 끝날 때마다 새 Article 묶음으로 호출 (예: 스프레드시트에 바로 저장)
+                     on_batch가 성공한 뒤에 수집기의 commit을 호출하므로, 저장에 실패한 소스는 다음에 다시 수집됨
+    :return: URL과 내용 지문 기준으로 중복 제거된 전체 Article 목록
+    """
+    sources = get_sources(account_set)
+    if not sources:
+        logger.log(f"[Collect] {set_name} 세트에 설정된 소스가 없습니다.")
+        return []
+
+    executor = ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix="collect")
+    started = time.monotonic()
+    pending = {}
+    for source in sources:
+        collector = COLLECTORS.get(source.get("type"))
+        if collector is None:
+            logger.log(f"[Collect] 지원하지 않는 소스: {source.get('type')}")
+            continue
+        future = logger.submit(executor, _run_collector, collector, set_name, source)
+        pending[future] = (collector, source, started + source.get("timeout", DEFAULT_SOURCE_TIMEOUT))
+
+    merged: List[Article] = []
+    seen = set()
+    try:
+        while pending:
+            now = time.monotonic()
+            # 제한 시간이 지난 소스는 포기 (스레드는 백그라운드에서 끝나도록 둠)
+            for future, (_, source, deadline) in list(pending.items()):
+                if deadline <= now and not future.done():
+                    logger.log(f"[Collect] {source['type']} 소스 시간 초과 - 건너뜀")
+                    future.cancel()
+                    del pending[future]
+            if not pending:
+                break
+
+            next_deadline = min(deadline for _, _, deadline in pending.values())
+            done, _ = wait(pending, timeout=max(0, next_deadline - now), return_when=FIRST_COMPLETED)
+            for future in done:
+                collector, source, _ = pending.pop(future)
+                try:
+                    articles = future.result()
+                except Exception as e:
+                    logger.log(f"[Collect] {source['type']} 소스 수집 실패: {e}")
+                    continue
+
+                batch = []
+                for article in articles:
+                    if article.fingerprint in seen or (article.url and article.url in seen):
+                        continue
+                    seen.add(article.fingerprint)
+                    if article.url:
+                        seen.add(article.url)
+                    batch.append(article)
+
+                logger.log(f"[Collect] {source['type']} 소스에서 {len(batch)}개 수집")
+                if batch:
+                    merged.extend(batch)
+                    if on_batch:
+                        on_batch(batch)
+                if hasattr(collector, "commit"):
+                    collector.commit(set_name, source, articles)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    logger.log(f"[Collect] {set_name} 세트 총 {len(merged)}개 수집 완료 ({time.monotonic() - started:.1f}초)")
+    return merged
@@ -1,4 +1,92 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
 from trendspy import Trends
+from modules.utils import logger
+
+CACHE_TTL_SECONDS = 30 * 60  # 같은 지역은 30분 동안 한 번만 조회
+
+_client: Optional[Trends] = None
+_client_lock = threading.Lock()
+_cache: Dict[str, Tuple[float, List["TrendItem"]]] = {}
+_geo_locks: Dict[str, threading.Lock] = {}
+
+
+@dataclass
+class TrendItem:
+    """실시간 인기 검색어 + 순위 산정에 쓸 부가 정보"""
+    keyword: str
+    volume: int = 0
+    volume_growth_pct: float = 0.0
+    related_keywords: List[str] = field(default_factory=list)
+    topics: List[str] = field(default_factory=list)
+    news: List[Dict] = field(default_factory=list)  # [{'title', 'url', 'source', 'time', 'snippet'}, ...]
+    started_timestamp: Optional[int] = None
+
+
+def _get_client() -> Trends:
+    """프로세스 공용 trendspy 클라이언트"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = Trends()
+        return _client
+
+
+def _geo_lock(geo: str) -> threading.Lock:
+    with _client_lock:
+        return _geo_locks.setdefault(geo, threading.Lock())
+
+
+def _to_item(trend) -> TrendItem:
+    news = [
+        {
+            "title": article.title,
+            "url": article.url,
+            "source": article.source,
+            "time": article.time,
+            "snippet": article.snippet,
+        }
+        for article in (trend.news or [])
+    ]
+    return TrendItem(
+        keyword=trend.keyword,
+        volume=trend.volume or 0,
+        volume_growth_pct=trend.volume_growth_pct or 0.0,
+        related_keywords=list(trend.trend_keywords or []),
+        topics=list(trend.topic_names),
+        news=news,
+        started_timestamp=trend.started_timestamp[0] if trend.started_timestamp else None,
+    )
+
+
+def get_trends(geo: str = "KR", ttl: int = CACHE_TTL_SECONDS) -> List[TrendItem]:
+    """
+    지역별 실시간 인기 검색어 조회 (TTL 캐시)
+    여러 세트가 같은 지역을 동시에 요청해도 실제 호출은 한 번만 일어남
+    :param geo: 지역 코드 (예: 'KR' 한국, 'US' 미국)
+    :param ttl: 캐시 유지 시간(초)
+    :return: TrendItem 리스트 (조회 실패 시 만료된 캐시라도 있으면 그것을 반환)
+    """
+    with _geo_lock(geo):
+        cached = _cache.get(geo)
+        if cached and time.time() - cached[0] < ttl:
+            return cached[1]
+
+        try:
+            trends = _get_client().trending_now(geo=geo)
+        except Exception as e:
+            logger.log(f"[GoogleTrends] 오류 발생: {e}")
+            return cached[1] if cached else []
+
+        items = [_to_item(t) for t in trends or []]
+        _cache[geo] = (time.time(), items)
+        if not items:
+            logger.log(f"[GoogleTrends] {geo} 지역 실시간 인기 검색어 없음")
+        return items
+
 
 def get_trending_keywords(geo: str = "KR", count: int = 5):
     """
@@ -7,27 +95,6 @@ def get_trending_keywords(geo: str = "KR", count: int = 5):
     :param count: 가져올 키워드 개수
     :return: 키워드 리스트
     """
-    try:
-        tr = Trends()
-
-        # 실시간 인기 키워드 조회
-        trends = tr.trending_now(geo=geo)
-        if not trends:
-            print(f"[GoogleTrends] {geo} 지역 실시간 인기 검색어 없음")
-            return []
-        
-        # print(dir(trends[0]))
-        # print(trends[0].news)
-        # print(trends[0].topic_names)
-        # print(trends[0].topics)
-        # print(trends[0].trend_keywords)
-        # print(trends[0].volume)
-
-        # 각 'title' 속성에서 상위 count개 추출
-        keywords = [t.keyword for t in trends[:count]]
-        print(f"[GoogleTrends] {geo} 인기 키워드 {len(keywords)}개 수집 완료")
-        return keywords
-
-    except Exception as e:
-        print(f"[GoogleTrends] 오류 발생: {e}")
-        return ["AI", "마케팅", "헬스케어"]  # fallback 더미 키워드
+    keywords = [item.keyword for item in get_trends(geo)[:count]]
+    logger.log(f"[GoogleTrends] {geo} 인기 키워드 {len(keywords)}개 수집 완료")
+    return keywords
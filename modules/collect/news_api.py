@@ -1,13 +1,30 @@
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from requests.adapters import HTTPAdapter
 from config import load_env
 from datetime import datetime, timedelta
 from modules.models.article import Article
+from modules.utils import logger
 
 # 환경 변수 로드
 ENV = load_env()
 NEWS_API_KEY = ENV.get("NEWS_API_KEY")
 
 BASE_URL = "https://newsapi.org/v2"
+CACHE_DIR = "data/cache/news_api"
+CACHE_KEEP_DAYS = 1  # 캐시는 당일 요청에만 쓰이므로 오늘/어제 디렉터리만 남김
+REQUEST_TIMEOUT = 30
+MAX_PAGE_SIZE = 100
+MAX_WORKERS = 4
+
+# 커넥션을 재사용하는 공유 세션
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS))
 
 # ----------------------------
 # 뉴스 카테고리 상수 정의
@@ -36,100 +53,172 @@ def get_yesterday_str():
     return yesterday.strftime("%Y-%m-%d")
 
 
-def _extract_fields(articles, keywords:str):
+def _extract_fields(articles, keywords: str):
     """
     NewsAPI articles에서 필요한 필드만 추출
     """
     result = []
     for a in articles:
+        if not a.get("title") or a.get("title") == "[Removed]":
+            continue
         result.append(Article(
             title=a.get("title"),
-            content=a.get("content"),
+            content=a.get("content") or a.get("description") or "",
             url=a.get("url"),
             source="news_api",
-            subject=keywords
+            subject=keywords,
+            published_at=a.get("publishedAt") or "",
         ))
     return result
 
 
-def fetch_news_by_keywords(keywords, count=100, language="en"):
+def _cache_path(endpoint: str, params: dict) -> str:
+    """(요청, 날짜) 단위 캐시 파일 경로 - apiKey는 키에서 제외"""
+    key_params = {k: v for k, v in params.items() if k != "apiKey"}
+    key = json.dumps({"endpoint": endpoint, "params": key_params}, sort_keys=True, ensure_ascii=False)
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return os.path.join(CACHE_DIR, get_today_str(), f"{digest}.json")
+
+
+def prune_cache(older_than_days: int = CACHE_KEEP_DAYS, cache_dir: str = CACHE_DIR) -> int:
+    """오래된 날짜별 캐시 디렉터리 삭제, 삭제된 디렉터리 수 반환"""
+    if not os.path.isdir(cache_dir):
+        return 0
+    cutoff = (datetime.today() - timedelta(days=older_than_days)).strftime("%Y-%m-%d")
+    pruned = 0
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        try:
+            datetime.strptime(name, "%Y-%m-%d")
+        except ValueError:
+            continue  # 날짜 디렉터리가 아니면 건드리지 않음
+        if name < cutoff and os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+            pruned += 1
+    return pruned
+
+
+def _get(endpoint: str, params: dict):
     """
-    키워드 기반 뉴스 검색
+    공유 세션으로 NewsAPI 호출, 성공한 응답은 당일 디스크 캐시에 저장 (일일 요청 한도 절약)
+    """
+    path = _cache_path(endpoint, params)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    resp = _session.get(f"{BASE_URL}/{endpoint}", params=params, timeout=REQUEST_TIMEOUT)
+    # 5xx/게이트웨이 오류는 본문이 JSON이 아닐 수 있으므로 상태 코드를 먼저 확인
+    if resp.status_code != 200:
+        logger.log(f"[NewsAPI] 오류 발생 ({resp.status_code}): {resp.text[:500]}")
+        return None
+    try:
+        data = resp.json()
+    except ValueError as e:
+        logger.log(f"[NewsAPI] 응답 파싱 실패: {e}")
+        return None
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    return data
+
+
+def _fetch_paginated(endpoint: str, params: dict, count: int):
+    """
+    count개(기사 예산)에 도달하거나 결과가 끝날 때까지 페이지를 넘기며 수집
     """
     if not NEWS_API_KEY:
         raise ValueError("❌ NEWS_API_KEY가 설정되지 않았습니다 (.env 확인 필요)")
 
+    articles = []
+    page = 1
+    page_size = min(MAX_PAGE_SIZE, count)
+    while len(articles) < count:
+        data = _get(endpoint, {**params, "pageSize": page_size, "page": page, "apiKey": NEWS_API_KEY})
+        if not data:
+            break
+
+        page_articles = data.get("articles", [])
+        articles.extend(page_articles)
+        total = data.get("totalResults", 0)
+        if len(page_articles) < page_size or page * page_size >= total:
+            break
+        page += 1
+
+    return articles[:count]
+
+
+def fetch_news_by_keywords(keywords, count=100, language="en"):
+    """
+    키워드 기반 뉴스 검색
+    """
     query = " OR ".join(keywords) if keywords else None
     params = {
         "q": query,
         "language": language,
-        "pageSize": count,
         "sortBy": "relevancy",
         "from": get_yesterday_str(),
-        "apiKey": NEWS_API_KEY,
     }
 
-    resp = requests.get(f"{BASE_URL}/everything", params=params)
-    data = resp.json()
+    articles = _fetch_paginated("everything", params, count)
+    logger.log(f"[NewsAPI] 키워드 {keywords} 관련 뉴스 {len(articles)}개 수집 완료")
+    return _extract_fields(articles, ", ".join(keywords) if keywords else "")
 
-    if resp.status_code != 200:
-        print(f"[NewsAPI] 오류 발생: {data}")
-        return []
-
-    articles = data.get("articles", [])
-    print(f"[NewsAPI] 키워드 {keywords} 관련 뉴스 {len(articles)}개 수집 완료")
-    return _extract_fields(articles, keywords)
-
-
-# def fetch_latest_news(count=5, language="ko"):
-#     """
-#     최신 뉴스 가져오기 (키워드 X, publishedAt 기준)
-#     """
-#     if not NEWS_API_KEY:
-#         raise ValueError("❌ NEWS_API_KEY가 설정되지 않았습니다 (.env 확인 필요)")
-
-#     params = {
-#         "language": language,
-#         "pageSize": count,
-#         "sortBy": "publishedAt",
-#         "apiKey": NEWS_API_KEY,
-#     }
-
-#     resp = requests.get(f"{BASE_URL}/everything", params=params)
-#     data = resp.json()
-
-#     if resp.status_code != 200:
-#         print(f"[NewsAPI] 오류 발생: {data}")
-#         return []
-
-#     articles = data.get("articles", [])
-#     print(f"[NewsAPI] 최신 뉴스 {len(articles)}개 수집 완료")
-#     return _extract_fields(articles)
-
-
-# def fetch_top_headlines(count=100, country="us", category=None):
-#     """
-#     많이 본 뉴스 / 주요 헤드라인 (국가별)
-#     """
-#     if not NEWS_API_KEY:
-#         raise ValueError("❌ NEWS_API_KEY가 설정되지 않았습니다 (.env 확인 필요)")
-
-#     params = {
-#         "country": country,
-#         "pageSize": count,
-#         "apiKey": NEWS_API_KEY,
-#     }
+
+def fetch_latest_news(count=5, language="ko"):
+    """
+    최신 뉴스 가져오기 (키워드 X, publishedAt 기준)
+    """
+    params = {
+        "language": language,
+        "sortBy": "publishedAt",
+    }
+
+    articles = _fetch_paginated("everything", params, count)
+    logger.log(f"[NewsAPI] 최신 뉴스 {len(articles)}개 수집 완료")
+    return _extract_fields(articles, "latest")
+
+
+def fetch_top_headlines(count=100, country="us", category=None):
+    """
+    많이 본 뉴스 / 주요 헤드라인 (국가별)
+    """
+    params = {
+        "country": country,
+    }
     
-#     if category:
-#         params["category"] = category
+    if category:
+        params["category"] = category
 
-#     resp = requests.get(f"{BASE_URL}/top-headlines", params=params)
-#     data = resp.json()
+    articles = _fetch_paginated("top-headlines", params, count)
+    logger.log(f"[NewsAPI] {country.upper()} 주요 헤드라인 {len(articles)}개 수집 완료")
+    return _extract_fields(articles, category or "headlines")
 
-#     if resp.status_code != 200:
-#         print(f"[NewsAPI] 오류 발생: {data}")
-#         return []
 
-#     articles = data.get("articles", [])
-#     print(f"[NewsAPI] {country.upper()} 주요 헤드라인 {len(articles)}개 수집 완료")
-#     return _extract_fields(articles)
+def fetch_news_concurrently(keyword_groups=None, categories=None, count=100, language="en", country="us"):
+    """
+    여러 키워드 그룹과 카테고리를 동시에 수집해서 하나의 Article 목록으로 반환 (URL 기준 중복 제거)
+    """
+    jobs = []
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        for keywords in keyword_groups or []:
+            jobs.append(executor.submit(fetch_news_by_keywords, keywords, count, language))
+        for category in categories or []:
+            jobs.append(executor.submit(fetch_top_headlines, count, country, category))
+
+        result = []
+        seen_urls = set()
+        for job in jobs:
+            try:
+                articles = job.result()
+            except Exception as e:
+                logger.log(f"[NewsAPI] 수집 실패: {e}")
+                continue
+            for article in articles:
+                if article.url in seen_urls:
+                    continue
+                seen_urls.add(article.url)
+                result.append(article)
+
+    return result
@@ -1,7 +1,9 @@
 import praw
 from typing import List
+from datetime import datetime, timezone
 from config import load_env
 from modules.models.article import Article
+from modules.utils import logger
 
 ENV = load_env()
 CLIENT_ID = ENV.get('CLIENT_ID')
@@ -36,10 +38,13 @@ def fetch_reddit_posts(subreddits: List[str]):
                             content=content,
                             url=url,
                             source="reddit",
-                            subject=subreddit
+                            subject=subreddit,
+                            published_at=datetime.fromtimestamp(submission.created_utc, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                            source_id=submission.id,
+                            score=submission.score
                     ))
         except Exception as e:
-            print(f"Error fetching posts from r/{subreddit}: {e}")
+            logger.log(f"Error fetching posts from r/{subreddit}: {e}")
             continue
                 
     return reddit_posts
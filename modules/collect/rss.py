@@ -1,10 +1,169 @@
-# RSS 피드로 개인 금융 뉴스 수집 (예: CNBC Personal Finance)
+# RSS 피드 뉴스 수집 - 여러 피드를 조건부 요청(ETag/Last-Modified)으로 동시에 수집
+#
+# 요청은 스레드에서, 파싱(feedparser는 순수 파이썬이라 GIL을 잡고 있음)은 별도 프로세스 풀에서 처리한다.
+# 프로세스 풀은 spawn으로 만들어서 워커 스레드에서 처음 만들어져도 fork로 잠금 상태가 복사되지 않는다.
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+
 import feedparser
+import requests
+from modules.models.article import Article
+from modules.storage.rss_state import get_state
+from modules.utils import logger
+
+DEFAULT_FEEDS = ["https://www.chosun.com/arc/outboundfeeds/rss/category/national/?outputType=xml"]
+REQUEST_TIMEOUT = 20
+MAX_WORKERS = 8
+PARSE_WORKERS = 2
+
+_session = requests.Session()
+
+# (세트, 피드)별로 수집했지만 아직 저장되지 않은 피드 validator (commit_state에서 소스 단위로 기록)
+_pending: Dict[Tuple[str, str], dict] = {}
+_pending_lock = threading.Lock()
+
+_parse_pool: Optional[ProcessPoolExecutor] = None
+_parse_pool_lock = threading.Lock()
+
+
+def _get_parse_pool() -> ProcessPoolExecutor:
+    """파싱용 프로세스 풀 (최초 1회 생성, 수집마다 다시 만들지 않음)"""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            _parse_pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS,
+                                              mp_context=multiprocessing.get_context("spawn"))
+        return _parse_pool
+
+
+def close_pool():
+    """파싱용 프로세스 풀 종료"""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is not None:
+            _parse_pool.shutdown(wait=True)
+            _parse_pool = None
+
+
+def _fetch_feed(url: str, validators: dict) -> Optional[requests.Response]:
+    """조건부 GET - 변경이 없으면(304) None 반환"""
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+
+    resp = _session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+    if resp.status_code == 304:
+        logger.log(f"[RSS] 변경 없음 (304): {url}")
+        return None
+    resp.raise_for_status()
+    return resp
+
+
+def _parse_feed(body: bytes) -> List[Dict]:
+    """피드 파싱 - 필요한 필드만 dict 목록으로 반환"""
+    feed = feedparser.parse(body)
+    entries = []
+    for entry in feed.entries:
+        content = entry.get("summary", "")
+        if entry.get("content"):
+            content = entry.content[0].get("value", content)
+        published = entry.get("published_parsed") or entry.get("updated_parsed")
+        entries.append({
+            "guid": entry.get("id") or entry.get("link", ""),
+            "title": entry.get("title", ""),
+            "content": content,
+            "link": entry.get("link", ""),
+            "published_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", published) if published else "",
+        })
+    return entries
+
+
+def _fetch_and_parse(url: str, validators: dict):
+    """피드 하나를 받아서 파싱 풀에 넘김 (변경이 없으면 None), (새 validator, 항목 목록) 반환"""
+    resp = _fetch_feed(url, validators)
+    if resp is None:
+        return None
+    new_validators = {
+        "etag": resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+    }
+    try:
+        entries = _get_parse_pool().submit(_parse_feed, resp.content).result()
+    except BrokenProcessPool as e:
+        # 파싱 프로세스가 죽었으면 이번 피드는 스레드에서 파싱하고 다음 수집에서 풀을 다시 만듦
+        logger.log(f"[RSS] 파싱 프로세스 풀 오류 - 스레드에서 파싱: {e}")
+        close_pool()
+        entries = _parse_feed(resp.content)
+    return new_validators, entries
+
+
+def fetch_news_by_rss(feeds: Optional[List[str]] = None, subject: str = "rss",
+                      set_name: Optional[str] = None) -> List[Article]:
+    """
+    RSS 피드 목록을 동시에 수집해서 Article 목록으로 반환
+    :param feeds: 피드 URL 목록 (accounts.yaml 세트의 rss 소스에 있는 feeds)
+    :param subject: Article.subject 값
+    :param set_name: 수집 상태를 구분할 세트 이름 (없으면 subject)
+    :return: 피드 간/실행 간 GUID(또는 링크) 기준으로 중복 제거된 Article 목록
+             (상태는 저장 후 commit_state를 호출해야 기록됨)
+    """
+    feeds = feeds or DEFAULT_FEEDS
+    set_name = set_name or subject
+    state = get_state()
+
+    validators: Dict[str, dict] = {}
+    entries: List[Dict] = []
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(feeds)), thread_name_prefix="rss") as executor:
+        futures = {
+            url: logger.submit(executor, _fetch_and_parse, url, state.validators(set_name, url))
+            for url in feeds
+        }
+        for url, future in futures.items():
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.log(f"[RSS] 피드 수집 실패 {url}: {e}")
+                continue
+            if result is None:
+                continue
+            validators[url], feed_entries = result
+            entries.extend(feed_entries)
+
+    seen = state.seen(set_name, {entry["guid"] for entry in entries if entry["guid"]})
+    articles: List[Article] = []
+    for entry in entries:
+        guid = entry["guid"]
+        if not guid or guid in seen:
+            continue
+        seen.add(guid)
+        articles.append(Article(
+            title=entry["title"],
+            content=entry["content"],
+            url=entry["link"],
+            source="rss",
+            subject=subject,
+            published_at=entry["published_at"],
+            source_id=guid,
+        ))
+
+    with _pending_lock:
+        _pending.update({(set_name, url): value for url, value in validators.items()})
+    logger.log(f"[RSS] 피드 {len(feeds)}개에서 새 기사 {len(articles)}개 수집 완료")
+    return articles
+
 
-def fetch_news_by_rss():
-    rss_url = "https://www.chosun.com/arc/outboundfeeds/rss/category/national/?outputType=xml"
-    feed = feedparser.parse(rss_url)
-    
-    rss_titles = [entry.title for entry in feed.entries[:10]]
-    
-    return feed.entries[0]
\ No newline at end of file
+def commit_state(set_name: str, feeds: Optional[List[str]], articles: List[Article]):
+    """
+    수집한 기사가 저장된 뒤 호출 - 피드 validator와 GUID를 기록해서 다음 수집에서 건너뜀
+    같은 세트의 다른 rss 소스 validator는 그 소스의 기사가 저장될 때까지 남겨 둠
+    """
+    feeds = feeds or DEFAULT_FEEDS
+    with _pending_lock:
+        validators = {url: _pending.pop((set_name, url)) for url in feeds if (set_name, url) in _pending}
+    get_state().commit(set_name, validators, [a.source_id for a in articles if a.source == "rss"])
@@ -1,9 +1,77 @@
-from dataclasses import dataclass
+import json
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, List, Sequence
 
-@dataclass
+from modules.utils.fingerprint import content_hash, text_simhash
+
+# 행(row) 직렬화 기본 컬럼 순서
+ROW_FIELDS = ("title", "content", "url", "source", "subject", "published_at", "source_id", "score", "fingerprint", "simhash")
+
+
+@dataclass(frozen=True, slots=True)
 class Article:
     title: str
     content: str
     url: str
     source: str
     subject: str
+    published_at: str = ""
+    source_id: str = ""  # 소스 내부 ID (reddit submission id, RSS GUID 등)
+    score: float = 0.0   # 소스 인기도 (reddit 점수, 검색량 등)
+    # 제목+본문 지문 - 생성 시 한 번만 계산 (직렬화된 값을 넘기면 재계산하지 않음)
+    fingerprint: str = field(default="", compare=False)
+    simhash: int = field(default=0, compare=False)
+
+    def __post_init__(self):
+        if not self.fingerprint:
+            text = f"{self.title}\n{self.content}"
+            object.__setattr__(self, "fingerprint", content_hash(text))
+            object.__setattr__(self, "simhash", text_simhash(text))
+
+    def __hash__(self) -> int:
+        return hash(self.fingerprint)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in ROW_FIELDS}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Article":
+        return cls(**{f.name: data[f.name] for f in fields(cls) if f.name in data})
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, text: str) -> "Article":
+        return cls.from_dict(json.loads(text))
+
+    def to_row(self, columns: Sequence[str] = ROW_FIELDS) -> List[Any]:
+        """지정한 컬럼 순서대로 값 목록 반환 (모르는 컬럼은 빈 값)
+
+        simhash는 스프레드시트 숫자 정밀도(53비트)를 넘으므로 16진수 문자열로 저장
+        """
+        row = []
+        for column in columns:
+            if column == "simhash":
+                row.append(f"0x{self.simhash:016x}")
+            elif column in ROW_FIELDS:
+                row.append(getattr(self, column))
+            else:
+                row.append("")
+        return row
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "Article":
+        """스프레드시트 레코드(dict)에서 복원 - 셀 값은 숫자로 올 수 있어 타입을 맞춤"""
+        return cls(
+            title=str(row.get("title", "")),
+            content=str(row.get("content", "")),
+            url=str(row.get("url", "")),
+            source=str(row.get("source", "")),
+            subject=str(row.get("subject", "")),
+            published_at=str(row.get("published_at", "")),
+            source_id=str(row.get("source_id", "")),
+            score=float(row.get("score") or 0),
+            fingerprint=str(row.get("fingerprint", "")),
+            simhash=int(str(row.get("simhash") or "0"), 16),
+        )
@@ -0,0 +1,160 @@
+# 발행 대기열 - 글 작성 단계가 만든 Post를 디스크 큐에 넣고, 발행 워커가 동시에 꺼내 발행
+#
+# 글 작성과 발행이 메모리로 직접 이어지지 않으므로 LLM이 느려도 발행은 이미 쌓인 글부터 진행하고,
+# 발행 쪽 장애(API 오류 등)가 나도 생성된 글은 큐에 남아 재시도된다.
+# 재시도해도 이미 성공한 계정은 publish ledger 덕분에 다시 발행되지 않는다.
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from modules.ai.content_writer import Post
+from modules.storage import post_archive
+from modules.storage.job_queue import Job, JobQueue, get_queue
+from modules.storage.publish_ledger import account_key, post_key, get_ledger
+from modules.utils import logger
+from . import runner
+from .runner import PublishSummary
+from .scheduler import Schedule
+
+PUBLISH_QUEUE = "publish"
+PUBLISH_WORKERS = 4
+VISIBILITY_TIMEOUT = 10 * 60  # 글 1개 발행(티스토리 브라우저 포함)에 충분한 시간
+MAX_ATTEMPTS = 5
+RETRY_DELAY = 60  # 초, 재시도마다 두 배
+
+
+def enqueue_posts(set_name: str, account_set: dict, blog_posts: List[Post],
+                  sns_posts: Optional[Dict[str, List[str]]] = None, schedule: Optional[Schedule] = None,
+                  queue: Optional[JobQueue] = None) -> int:
+    """
+    세트의 글을 발행 대기열에 추가 (글 1개 = 작업 1개), 새로 추가된 작업 수 반환
+    같은 세트의 같은 글은 한 번만 들어감 (--resume 등으로 다시 호출해도 안전)
+    """
+    queue = queue or get_queue()
+    schedule = schedule or {}
+    accounts = [account_key(acc) for acc in account_set.get("accounts", [])]
+
+    added = 0
+    for i, post in enumerate(blog_posts):
+        key = post_key(post)
+        payload = {
+            "set": set_name,
+            "post": asdict(post),
+            "sns": {platform: texts[i] for platform, texts in (sns_posts or {}).items() if i < len(texts)},
+            # 계정별 예약 시각 (scheduler가 정한 값만)
+            "publish_at": {
+                acc_key: schedule[(acc_key, key)].isoformat()
+                for acc_key in accounts if (acc_key, key) in schedule
+            },
+        }
+        if queue.put(PUBLISH_QUEUE, payload, dedup_key=f"{set_name}:{key}", max_attempts=MAX_ATTEMPTS) is not None:
+            added += 1
+    logger.log(f"[PublishQueue] [{set_name}] 발행 대기열에 {added}개 추가")
+    return added
+
+
+def reserved_times(queue: Optional[JobQueue] = None, days: int = 2) -> Dict[str, List[datetime]]:
+    """최근 대기열에 들어간 글의 계정별 예약 시각 (scheduler.build_schedule의 reserved 인자용)"""
+    queue = queue or get_queue()
+    reserved: Dict[str, List[datetime]] = {}
+    for payload in queue.payloads(PUBLISH_QUEUE, since=time.time() - days * 24 * 60 * 60):
+        for acc_key, publish_at in payload.get("publish_at", {}).items():
+            reserved.setdefault(acc_key, []).append(datetime.fromisoformat(publish_at))
+    return reserved
+
+
+def publish_job(job: Job, account_sets: dict) -> List[PublishSummary]:
+    """대기열 작업 하나(글 1개)를 세트의 모든 계정에 발행, 실패한 계정이 있으면 예외"""
+    payload = job.payload
+    set_name = payload["set"]
+    account_set = account_sets.get(set_name)
+    if account_set is None:
+        raise ValueError(f"설정에 없는 세트: {set_name}")
+
+    post = Post(**payload["post"])
+    key = post_key(post)
+    schedule = {
+        (acc_key, key): datetime.fromisoformat(publish_at)
+        for acc_key, publish_at in payload.get("publish_at", {}).items()
+    }
+    sns_posts = {platform: [text] for platform, text in payload.get("sns", {}).items()} or None
+
+    summaries = runner.publish_all(account_set, [post], set_name, sns_posts=sns_posts, schedule=schedule)
+    _archive_results(set_name, post, key, summaries)
+    failed = [s for s in summaries if s.failed or s.errors]
+    if failed:
+        raise RuntimeError(", ".join(f"{s.account}: {'; '.join(s.errors) or f'실패 {s.failed}건'}" for s in failed))
+    return summaries
+
+
+def _archive_results(set_name: str, post: Post, key: str, summaries: List[PublishSummary]):
+    """계정별 발행 결과를 생성 글 아카이브에 추가"""
+    ledger = get_ledger()
+    records = []
+    for summary in summaries:
+        if summary.failed or summary.errors:
+            status = "failed"
+        elif summary.succeeded:
+            status = "published"
+        elif summary.skipped:
+            status = "skipped"
+        elif summary.unsupported:
+            status = "unsupported"
+        else:
+            continue
+        entry = ledger.get(summary.account, key) or {}
+        records.append(post_archive.published_record(
+            post, summary.account, summary.platform, status,
+            remote_id=entry.get("remote_id"), url=entry.get("url", ""), error="; ".join(summary.errors),
+        ))
+    try:
+        post_archive.append(records, set_name)
+    except Exception as e:
+        logger.log(f"[PublishQueue] 발행 결과 아카이브 저장 실패: {e}")
+
+
+def work_once(account_sets: dict, queue: Optional[JobQueue] = None) -> Optional[List[PublishSummary]]:
+    """대기열에서 작업 하나를 꺼내 발행 (꺼낼 작업이 없으면 None)"""
+    queue = queue or get_queue()
+    job = queue.lease(PUBLISH_QUEUE, visibility_timeout=VISIBILITY_TIMEOUT)
+    if job is None:
+        return None
+
+    try:
+        with logger.span("publish.job", job=job.id, set=job.payload["set"]):
+            summaries = publish_job(job, account_sets)
+        if not queue.ack(job):
+            logger.log(f"[PublishQueue] 작업 #{job.id} 점유 시간이 지나 다른 워커가 다시 가져감 - 완료 처리 생략")
+        return summaries
+    except Exception as e:
+        retry = queue.fail(job, str(e), retry_delay=RETRY_DELAY)
+        logger.log(f"❌ [PublishQueue] 작업 #{job.id} 발행 실패 ({'재시도 예정' if retry else '재시도 한도 초과'}): {e}")
+        return []
+
+
+def drain(account_sets: dict, workers: int = PUBLISH_WORKERS, queue: Optional[JobQueue] = None) -> List[PublishSummary]:
+    """
+    지금 꺼낼 수 있는 작업이 없어질 때까지 여러 워커로 동시에 발행 (배치 실행용)
+    재시도 대기 중인 작업은 다음 실행(또는 데몬)에서 처리
+    """
+    queue = queue or get_queue()
+
+    def worker() -> List[PublishSummary]:
+        results: List[PublishSummary] = []
+        while True:
+            summaries = work_once(account_sets, queue)
+            if summaries is None:
+                return results
+            results.extend(summaries)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="publish-queue") as executor:
+        futures = [logger.submit(executor, worker) for _ in range(workers)]
+        summaries = [summary for future in futures for summary in future.result()]
+
+    logger.log(f"[PublishQueue] 발행 완료 - 성공 {sum(s.succeeded for s in summaries)} / "
+               f"건너뜀 {sum(s.skipped for s in summaries)} ({time.perf_counter() - started:.1f}초), "
+               f"대기열 상태: {queue.depth().get(PUBLISH_QUEUE, {})}")
+    return summaries
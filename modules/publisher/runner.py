@@ -1,19 +1,189 @@
-from typing import List
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Callable, Optional, Dict
 from modules.ai.content_writer import Post
+from modules.storage.publish_ledger import PublishLedger, get_ledger, account_key, post_key
 from . import tistory, x, threads, wordpress
+from .scheduler import Schedule
+from modules.utils import logger
 
-def publish_all(account_set, blog_posts: List[Post], set_name: str, sns_posts):
-    """계정 세트에 맞춰 블로그 + SNS 업로드"""
-    print(f"\n=== [{account_set['topic']}] 세트 발행 시작 ===")
-
-    for acc in account_set["accounts"]:
-        if acc['platform'] == 'wordpress':
-            wordpress.publish(blog_posts, acc, set_name)
-        elif acc["platform"] == "tistory":
-            tistory.publish(blog_posts, acc)
-        elif acc["platform"] == "x":
-            x.publish(sns_posts["x"], acc)
-        elif acc["platform"] == "threads":
-            threads.publish(sns_posts["threads"], acc)
-
-    print(f"=== [{account_set['topic']}] 세트 발행 완료 ===\n")
+# 플랫폼별 동시 발행 한도 (세트와 무관하게 프로세스 전체에서 공유)
+PLATFORM_CONCURRENCY = {
+    "wordpress": 4,
+    "tistory": 1,  # 브라우저 세션은 무거우므로 하나씩
+    "x": 2,
+    "threads": 2,
+}
+DEFAULT_CONCURRENCY = 2
+UNSUPPORTED = "unsupported"  # 아직 구현되지 않은 업로드 모듈이 돌려주는 status
+
+_semaphores: Dict[str, threading.Semaphore] = {}
+_semaphores_lock = threading.Lock()
+
+
+@dataclass
+class PublishSummary:
+    """계정별 발행 결과 요약"""
+    account: str
+    platform: str
+    succeeded: int = 0
+    failed: int = 0
+    skipped: int = 0
+    unsupported: int = 0  # 업로드가 구현되지 않아 발행하지 않은 글 (실패가 아니므로 재시도하지 않음)
+    latency: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+
+def _get_semaphore(platform: str) -> threading.Semaphore:
+    with _semaphores_lock:
+        if platform not in _semaphores:
+            _semaphores[platform] = threading.Semaphore(PLATFORM_CONCURRENCY.get(platform, DEFAULT_CONCURRENCY))
+        return _semaphores[platform]
+
+
+def _publish_with_ledger(ledger: PublishLedger, acc, posts: List[Post],
+                         publish_one: Callable[[Post, Optional[datetime]], Optional[dict]],
+                         summary: PublishSummary, schedule: Optional[Schedule]):
+    """ledger를 확인하며 포스트를 하나씩 발행하고 원격 포스트 ID를 기록"""
+    acc_key = account_key(acc)
+    schedule = schedule or {}
+    for post in posts:
+        key = post_key(post)
+        if ledger.is_published(acc_key, key):
+            logger.log(f"⏭️ 이미 발행된 글 건너뜀 ({acc_key}): {post.title}")
+            summary.skipped += 1
+            continue
+
+        with logger.span("publish.post"):
+            result = publish_one(post, schedule.get((acc_key, key)))
+        if result:
+            ledger.record(
+                acc_key, key, acc['platform'],
+                remote_id=result.get("id"),
+                url=result.get("link", ""),
+                title=post.title,
+            )
+            summary.succeeded += 1
+        else:
+            summary.failed += 1
+
+
+def _publish_wordpress(acc, blog_posts, sns_posts, set_name, ledger, summary, schedule):
+    _publish_with_ledger(ledger, acc, blog_posts,
+                         lambda post, publish_at: wordpress.publish_post(post, acc, set_name, publish_at),
+                         summary, schedule)
+
+
+def _publish_tistory(acc, blog_posts, sns_posts, set_name, ledger, summary, schedule):
+    # 티스토리는 예약 발행을 지원하지 않으므로 즉시 발행
+    _publish_with_ledger(ledger, acc, blog_posts,
+                         lambda post, publish_at: tistory.publish_post(post, acc),
+                         summary, schedule)
+
+
+def _publish_sns_texts(module, platform: str, acc, blog_posts: List[Post], sns_posts,
+                       ledger: PublishLedger, summary: PublishSummary):
+    """post_writer.generate_sns_posts 결과({'x': [...], 'threads': [...]}) 중 해당 플랫폼 글 발행
+
+    SNS 글은 다시 생성하면 문구가 바뀌므로 ledger 키는 SNS 문구가 아니라 원본 블로그 글 기준
+    """
+    acc_key = account_key(acc)
+    for post, text in zip(blog_posts, (sns_posts or {}).get(platform, [])):
+        key = f"{platform}:{post_key(post)}"
+        if ledger.is_published(acc_key, key):
+            summary.skipped += 1
+            continue
+        with logger.span("publish.post"):
+            result = module.publish(text, acc)
+        if result and result.get("status") == UNSUPPORTED:
+            summary.unsupported += 1
+        elif result:
+            ledger.record(acc_key, key, platform, remote_id=result.get("id"), url=result.get("link", ""),
+                          title=text.splitlines()[0] if text else "")
+            summary.succeeded += 1
+        else:
+            summary.failed += 1
+
+
+def _publish_x(acc, blog_posts, sns_posts, set_name, ledger, summary, schedule):
+    _publish_sns_texts(x, "x", acc, blog_posts, sns_posts, ledger, summary)
+
+
+def _publish_threads(acc, blog_posts, sns_posts, set_name, ledger, summary, schedule):
+    _publish_sns_texts(threads, "threads", acc, blog_posts, sns_posts, ledger, summary)
+
+
+# SNS 플랫폼 이름 -> 업로드 모듈
+SNS_MODULES = {"x": x, "threads": threads}
+
+
+def sns_implemented(platform: str) -> bool:
+    """실제로 업로드할 수 있는 SNS 플랫폼인지 (미구현 플랫폼은 SNS 글을 만들 필요가 없음)"""
+    module = SNS_MODULES.get(platform)
+    return module is not None and getattr(module, "IMPLEMENTED", True)
+
+
+# 플랫폼 이름 -> 발행 함수 레지스트리
+PUBLISHERS: Dict[str, Callable] = {
+    "wordpress": _publish_wordpress,
+    "tistory": _publish_tistory,
+    "x": _publish_x,
+    "threads": _publish_threads,
+}
+
+
+def _publish_account(acc, blog_posts, sns_posts, set_name, ledger, schedule) -> PublishSummary:
+    """계정 하나 발행 (플랫폼 동시성 한도 내에서 실행)"""
+    platform = acc.get('platform', '')
+    summary = PublishSummary(account=account_key(acc), platform=platform)
+
+    publisher = PUBLISHERS.get(platform)
+    if publisher is None:
+        summary.errors.append(f"지원하지 않는 플랫폼: {platform}")
+        return summary
+
+    started = time.perf_counter()
+    with _get_semaphore(platform), logger.span("publish.account", platform=platform, account=summary.account):
+        try:
+            publisher(acc, blog_posts, sns_posts, set_name, ledger, summary, schedule)
+        except Exception as e:
+            summary.errors.append(str(e))
+            logger.log(f"❌ [{summary.account}] 발행 중 오류 발생: {e}")
+    summary.latency = time.perf_counter() - started
+    return summary
+
+
+def publish_all(account_set, blog_posts: List[Post], set_name: str, sns_posts: Optional[Dict[str, List[str]]],
+                ledger: Optional[PublishLedger] = None, schedule: Optional[Schedule] = None) -> List[PublishSummary]:
+    """계정 세트에 맞춰 블로그 + SNS 업로드 (계정별 동시 실행)
+
+    sns_posts: post_writer.generate_sns_posts 결과 - 없으면 SNS 계정은 건너뜀
+    schedule: scheduler.build_schedule 결과 - 없으면 플랫폼 기본 예약 방식 사용
+    """
+    logger.log(f"\n=== [{account_set['topic']}] 세트 발행 시작 ===")
+    ledger = ledger or get_ledger()
+    accounts = account_set["accounts"]
+
+    summaries: List[PublishSummary] = []
+    if accounts:
+        with ThreadPoolExecutor(max_workers=len(accounts), thread_name_prefix="publish") as executor:
+            futures = [
+                logger.submit(executor, _publish_account, acc, blog_posts, sns_posts, set_name, ledger, schedule)
+                for acc in accounts
+            ]
+            summaries = [future.result() for future in futures]
+
+    for summary in summaries:
+        unsupported = f" / 미지원 {summary.unsupported}" if summary.unsupported else ""
+        logger.log(f"   [{summary.account}] 성공 {summary.succeeded} / 실패 {summary.failed} / "
+              f"건너뜀 {summary.skipped}{unsupported} ({summary.latency:.1f}초)")
+    logger.log(f"=== [{account_set['topic']}] 세트 발행 완료 ===\n")
+    return summaries
+
+
+def close_publishers():
+    """장수명 발행 리소스(티스토리 브라우저 등) 정리"""
+    tistory.close_pool()
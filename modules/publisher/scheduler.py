@@ -0,0 +1,118 @@
+# 예약 발행 시간 스케줄러 - 전체 세트/계정의 포스트를 다음날 시간대에 고르게 배치
+import random
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import pytz
+
+from modules.storage.publish_ledger import account_key, post_key
+from modules.utils import logger
+
+TIMEZONE = pytz.timezone("Asia/Seoul")
+
+# 예약 발행을 지원하는 플랫폼
+SCHEDULABLE_PLATFORMS = {"wordpress"}
+
+DEFAULT_WINDOW = (0, 19)  # 0시 ~ 18시 59분 (기존 random.randint(0, 18)과 동일한 범위)
+DEFAULT_MIN_SPACING_MINUTES = 60
+MINUTES_PER_DAY = 24 * 60
+
+Schedule = Dict[Tuple[str, str], datetime]
+
+
+def _window_of(account_set) -> Tuple[int, int]:
+    """세트의 선호 발행 시간대를 분 단위 [start, end) 로 반환
+
+    accounts.yaml 예시:
+        publish_window: [9, 22]   # 9시 ~ 21시 59분
+        upload_hour: 7            # 7시대 (publish_window가 없을 때만 사용)
+    """
+    window = account_set.get("publish_window")
+    if window:
+        start_hour, end_hour = window
+    elif account_set.get("upload_hour") is not None:
+        start_hour = int(account_set["upload_hour"])
+        end_hour = start_hour + 1
+    else:
+        start_hour, end_hour = DEFAULT_WINDOW
+    start = max(0, int(start_hour) * 60)
+    end = min(MINUTES_PER_DAY, int(end_hour) * 60)
+    if end <= start:
+        start, end = DEFAULT_WINDOW[0] * 60, DEFAULT_WINDOW[1] * 60
+    return start, end
+
+
+def _is_free(minute: int, taken: List[int], spacing: int, used_minutes: set) -> bool:
+    if minute in used_minutes:
+        return False
+    return all(abs(minute - other) >= spacing for other in taken)
+
+
+def _nearest_free(target: int, window: Tuple[int, int], taken: List[int], spacing: int, used_minutes: set) -> int:
+    """target에서 가장 가까운 빈 시간 탐색 (창 안 우선, 없으면 하루 전체, 그래도 없으면 간격 완화)"""
+    for low, high in (window, (0, MINUTES_PER_DAY)):
+        for offset in range(MINUTES_PER_DAY):
+            candidates = (target - offset, target + offset) if offset else (target,)
+            for minute in candidates:
+                if low <= minute < high and _is_free(minute, taken, spacing, used_minutes):
+                    return minute
+    # 간격 조건을 만족할 수 없을 만큼 포스트가 많으면 겹치는 분만 피한다
+    for offset in range(MINUTES_PER_DAY):
+        for minute in (target - offset, target + offset):
+            if 0 <= minute < MINUTES_PER_DAY and minute not in used_minutes:
+                return minute
+    return target
+
+
+def build_schedule(set_posts: List[Tuple[str, dict, list]], day: Optional[date] = None,
+                   seed: Optional[int] = None, reserved: Optional[Dict[str, List[datetime]]] = None) -> Schedule:
+    """모든 세트/계정의 포스트 발행 시간을 한 번에 계산
+
+    :param set_posts: [(set_name, account_set, blog_posts), ...]
+    :param day: 발행일 (기본값: 내일)
+    :param seed: 난수 시드 (기본값: 발행일) - 같은 시드면 같은 스케줄
+    :param reserved: 이미 잡힌 발행 시각 {account_key: [시각, ...]} - 세트를 따로 배치할 때(데몬) 겹치지 않도록
+    :return: {(account_key, post_key): 발행 시각}
+    """
+    if day is None:
+        day = (datetime.now(TIMEZONE) + timedelta(days=1)).date()
+    if seed is None:
+        seed = int(day.strftime("%Y%m%d"))
+    rng = random.Random(seed)
+    midnight = TIMEZONE.localize(datetime(day.year, day.month, day.day))
+
+    # 사이트(계정)별로 (세트, 포스트) 묶기 - 순서를 고정해야 시드로 재현 가능
+    by_site: Dict[str, List[Tuple[str, dict, list]]] = {}
+    for set_name, account_set, posts in sorted(set_posts, key=lambda item: item[0]):
+        for acc in account_set.get("accounts", []):
+            if acc.get("platform") in SCHEDULABLE_PLATFORMS and posts:
+                by_site.setdefault(account_key(acc), []).append((set_name, account_set, posts))
+
+    # 이미 잡힌 같은 날 시각은 분 단위로 미리 점유
+    reserved_minutes: Dict[str, List[int]] = {}
+    for site, times in (reserved or {}).items():
+        for at in times:
+            local = at.astimezone(TIMEZONE)
+            if local.date() == day:
+                reserved_minutes.setdefault(site, []).append(local.hour * 60 + local.minute)
+
+    schedule: Schedule = {}
+    used_minutes: set = {m for minutes in reserved_minutes.values() for m in minutes}  # 세트/사이트 간 같은 분에 겹치지 않도록
+    for site in sorted(by_site):
+        taken: List[int] = list(reserved_minutes.get(site, []))
+        # 선호 시간대가 좁은 세트부터 배치
+        groups = sorted(by_site[site], key=lambda item: (_window_of(item[1])[1] - _window_of(item[1])[0], item[0]))
+        for set_name, account_set, posts in groups:
+            window = _window_of(account_set)
+            spacing = int(account_set.get("min_spacing_minutes", DEFAULT_MIN_SPACING_MINUTES))
+            slot = (window[1] - window[0]) / len(posts)
+            for i, post in enumerate(posts):
+                # 창을 포스트 수만큼 균등 분할하고 각 구간 안에서 지터
+                target = window[0] + int(slot * (i + rng.uniform(0.2, 0.8)))
+                minute = _nearest_free(target, window, taken, spacing, used_minutes)
+                taken.append(minute)
+                used_minutes.add(minute)
+                schedule[(site, post_key(post))] = midnight + timedelta(minutes=minute)
+
+    logger.log(f"[Scheduler] {day} 발행 스케줄 {len(schedule)}건 배치 완료 (seed={seed})")
+    return schedule
@@ -1,10 +1,218 @@
-# 티스토리 업로드
-from playwright.sync_api import Page, expect
+# 티스토리 업로드 (Playwright 브라우저 기반)
+import os
+import queue
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
 
-def test_has_title(page: Page):
-    page.goto("https://playwright.dev/")
+from playwright.sync_api import sync_playwright, Browser, BrowserContext, Page, Playwright
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+from modules.utils import logger
 
-def publish(blog_posts, account):
-    
-    
-    print("temp")
+STATE_DIR = "data/tistory"
+LOGIN_URL_KEYWORD = "auth/login"
+
+# 티스토리 에디터 기본 셀렉터 (계정 설정의 selectors로 덮어쓸 수 있음)
+DEFAULT_SELECTORS = {
+    "title": "#post-title-inp",
+    "tag": "#tagText",
+    "publish_layer": "#publish-layer-btn",
+    "visibility_public": "#open20",
+    "publish": "#publish-btn",
+}
+# 본문은 TinyMCE API로 HTML을 직접 설정
+SET_CONTENT_SCRIPT = "html => window.tinymce.activeEditor.setContent(html)"
+# 발행 버튼이 호출하는 저장 API - 응답의 entryUrl(https://<blog>.tistory.com/<글 번호>)에서 글 번호를 얻음
+PUBLISH_RESPONSE_KEYWORD = "/manage/post.json"
+PUBLISH_RESPONSE_TIMEOUT_MS = 30 * 1000
+_POST_ID_RE = re.compile(r"^/(?:entry/|manage/post/)?(\d+)/?$")
+
+
+def _account_name(account) -> str:
+    return account.get("blog_name") or account.get("username", "")
+
+
+def _editor_url(account) -> str:
+    return account.get("editor_url") or f"https://{account['blog_name']}.tistory.com/manage/newpost"
+
+
+def _result_url_pattern(account) -> str:
+    return account.get("result_url_pattern", "**/manage/posts**")
+
+
+def _post_id(url: str) -> Optional[str]:
+    """글 주소에서 글 번호 추출 (https://blog.tistory.com/123, .../entry/123, .../manage/post/123)"""
+    match = _POST_ID_RE.match(urlparse(url).path)
+    return match.group(1) if match else None
+
+
+class TistoryBrowserPool:
+    """계정별 컨텍스트와 페이지 풀을 유지하는 장수명 Chromium 브라우저
+
+    Playwright sync API는 생성한 스레드에서만 사용할 수 있으므로
+    모든 브라우저 작업은 전용 워커 스레드 하나에서 실행한다.
+    """
+
+    def __init__(self, headless: bool = True, state_dir: str = STATE_DIR, pages_per_account: int = 1):
+        self.headless = headless
+        self.state_dir = state_dir
+        self.pages_per_account = pages_per_account
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tistory-browser")
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._contexts: Dict[str, BrowserContext] = {}
+        self._pages: Dict[str, "queue.Queue[Page]"] = {}
+
+    def _state_path(self, account) -> str:
+        return os.path.join(self.state_dir, f"{_account_name(account)}.json")
+
+    def _ensure_browser(self) -> Browser:
+        if self._browser is None:
+            self._playwright = sync_playwright().start()
+            self._browser = self._playwright.chromium.launch(headless=self.headless)
+        return self._browser
+
+    def _context(self, account) -> BrowserContext:
+        name = _account_name(account)
+        if name not in self._contexts:
+            state_path = self._state_path(account)
+            storage_state = state_path if os.path.exists(state_path) else None
+            context = self._ensure_browser().new_context(storage_state=storage_state)
+            self._contexts[name] = context
+            self._pages[name] = queue.Queue()
+        return self._contexts[name]
+
+    def _acquire_page(self, account) -> Page:
+        context = self._context(account)
+        pages = self._pages[_account_name(account)]
+        try:
+            return pages.get_nowait()
+        except queue.Empty:
+            page = context.new_page()
+            # "작성 중인 글이 있습니다" 등의 확인창은 무시
+            page.on("dialog", lambda dialog: dialog.dismiss())
+            return page
+
+    def _release_page(self, account, page: Page):
+        pages = self._pages[_account_name(account)]
+        if pages.qsize() < self.pages_per_account:
+            pages.put(page)
+        else:
+            page.close()
+
+    def _save_state(self, account):
+        os.makedirs(self.state_dir, exist_ok=True)
+        self._contexts[_account_name(account)].storage_state(path=self._state_path(account))
+
+    def _publish_post(self, post, account) -> Optional[dict]:
+        selectors = {**DEFAULT_SELECTORS, **account.get("selectors", {})}
+        page = self._acquire_page(account)
+        try:
+            page.goto(_editor_url(account))
+            if LOGIN_URL_KEYWORD in page.url:
+                logger.log(f"❌ [Tistory:{_account_name(account)}] 로그인 세션이 없습니다. tistory.login()으로 먼저 로그인하세요.")
+                return None
+
+            page.fill(selectors["title"], post.title)
+            page.evaluate(SET_CONTENT_SCRIPT, post.content)
+            for tag in post.tag:
+                page.fill(selectors["tag"], tag)
+                page.press(selectors["tag"], "Enter")
+
+            page.click(selectors["publish_layer"])
+            page.check(selectors["visibility_public"])
+            entry_url = ""
+            try:
+                with page.expect_response(lambda response: PUBLISH_RESPONSE_KEYWORD in response.url,
+                                          timeout=PUBLISH_RESPONSE_TIMEOUT_MS) as response_info:
+                    page.click(selectors["publish"])
+                entry_url = response_info.value.json().get("entryUrl", "")
+            except PlaywrightTimeoutError:
+                logger.log(f"[Tistory:{_account_name(account)}] 저장 API 응답을 찾지 못함 - 페이지 주소로 글 번호 확인")
+            page.wait_for_url(_result_url_pattern(account))
+
+            self._save_state(account)
+            # 저장 API 응답에 글 주소가 없으면 이동한 페이지 주소에서 글 번호를 찾음
+            post_id = _post_id(entry_url) or _post_id(page.url)
+            logger.log(f"✅ [Tistory:{_account_name(account)}] 글 발행 성공 (#{post_id}): {post.title}")
+            return {"id": post_id, "link": entry_url or page.url}
+        except Exception as e:
+            logger.log(f"❌ [Tistory:{_account_name(account)}] 글 발행 실패: {post.title} ({e})")
+            return None
+        finally:
+            self._release_page(account, page)
+
+    def _login(self, account, timeout_ms: int):
+        context = self._context(account)
+        page = context.new_page()
+        page.goto(_editor_url(account))
+        # 사용자가 직접 로그인해서 에디터 화면에 도달할 때까지 대기
+        page.wait_for_url(lambda url: LOGIN_URL_KEYWORD not in url and "newpost" in url, timeout=timeout_ms)
+        self._save_state(account)
+        page.close()
+        logger.log(f"✅ [Tistory:{_account_name(account)}] 로그인 세션 저장 완료")
+
+    def _close(self):
+        for context in self._contexts.values():
+            context.close()
+        self._contexts.clear()
+        self._pages.clear()
+        if self._browser is not None:
+            self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            self._playwright.stop()
+            self._playwright = None
+
+    def publish_post(self, post, account) -> Optional[dict]:
+        return self._executor.submit(self._publish_post, post, account).result()
+
+    def login(self, account, timeout_ms: int = 5 * 60 * 1000):
+        return self._executor.submit(self._login, account, timeout_ms).result()
+
+    def close(self):
+        self._executor.submit(self._close).result()
+        self._executor.shutdown()
+
+
+_pool: Optional[TistoryBrowserPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> TistoryBrowserPool:
+    """프로세스 공용 브라우저 풀 반환 (첫 사용 시 생성)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = TistoryBrowserPool(headless=os.getenv("TISTORY_HEADLESS", "1") != "0")
+        return _pool
+
+
+def close_pool():
+    """브라우저 풀 종료 (실행 종료 시 호출)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+def login(account, timeout_ms: int = 5 * 60 * 1000):
+    """브라우저 창을 띄워 수동 로그인 후 세션(storage state) 저장 - 최초 1회"""
+    pool = TistoryBrowserPool(headless=False)
+    try:
+        pool.login(account, timeout_ms)
+    finally:
+        pool.close()
+
+
+def publish_post(post, account, pool: Optional[TistoryBrowserPool] = None) -> Optional[dict]:
+    """티스토리에 포스트 1개 발행, 성공 시 원격 포스트 정보 반환"""
+    return (pool or get_pool()).publish_post(post, account)
+
+
+def publish(blog_posts, account, pool: Optional[TistoryBrowserPool] = None) -> List[Optional[dict]]:
+    """브라우저를 재실행하지 않고 포스트를 연달아 발행"""
+    return [publish_post(post, account, pool) for post in blog_posts]
@@ -1,4 +1,9 @@
 # X(트위터) 업로드
+from modules.utils import logger
+
+# 실제 업로드는 아직 구현되지 않음 - runner가 발행 실패가 아닌 '미지원'으로 집계하고 재시도하지 않음
+IMPLEMENTED = False
 
 def publish(post, account):
-    print(f"[X:{account['username']}] 업로드 완료: {post}")
+    logger.log(f"[X:{account['username']}] 업로드 미구현 (발행하지 않음): {post}")
+    return {"status": "unsupported"}
@@ -0,0 +1,67 @@
+# 파이프라인 단계별 체크포인트 저장소 - (날짜, 세트, 단계) 단위로 결과를 로컬에 저장
+import json
+import os
+from dataclasses import asdict, is_dataclass
+from datetime import datetime
+from typing import Any, Optional, Type
+
+DEFAULT_CHECKPOINT_DIR = "data/checkpoints"
+
+
+def _encode(output: Any) -> Any:
+    if isinstance(output, list):
+        return [asdict(item) if is_dataclass(item) else item for item in output]
+    if is_dataclass(output):
+        return asdict(output)
+    return output
+
+
+def _decode(data: Any, cls: Optional[Type]) -> Any:
+    if cls is None or data is None:
+        return data
+    if isinstance(data, list):
+        return [cls(**item) for item in data]
+    return cls(**data)
+
+
+class CheckpointStore:
+    """단계 결과(Article 목록, Post 목록 등)를 JSON 파일로 저장/복원"""
+
+    def __init__(self, base_dir: str = DEFAULT_CHECKPOINT_DIR):
+        self.base_dir = base_dir
+
+    def _path(self, date: str, set_name: str, stage: str) -> str:
+        return os.path.join(self.base_dir, date, set_name, f"{stage}.json")
+
+    def is_done(self, date: str, set_name: str, stage: str) -> bool:
+        """해당 단계가 완료되었는지 확인"""
+        return os.path.exists(self._path(date, set_name, stage))
+
+    def save(self, date: str, set_name: str, stage: str, output: Any):
+        """단계 결과 저장 (임시 파일에 쓴 뒤 교체해서 중간에 죽어도 깨지지 않음)"""
+        path = self._path(date, set_name, stage)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        payload = {
+            "stage": stage,
+            "completed_at": datetime.now().isoformat(timespec="seconds"),
+            "output": _encode(output),
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def load(self, date: str, set_name: str, stage: str, cls: Optional[Type] = None) -> Any:
+        """단계 결과 복원 (없으면 None), cls가 주어지면 dataclass로 변환"""
+        path = self._path(date, set_name, stage)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        return _decode(payload.get("output"), cls)
+
+    def clear(self, date: str, set_name: str, stage: str):
+        """단계 체크포인트 삭제"""
+        path = self._path(date, set_name, stage)
+        if os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,196 @@
+# 영속 작업 큐 - 데몬 작업(수집/생성)과 발행 대기 포스트를 로컬 SQLite에 보관
+#
+# 작업은 lease()로 가져가는 순간 visibility timeout 동안 다른 워커에게 보이지 않고,
+# ack()하지 못한 채 워커가 죽으면 timeout 이후 다시 꺼내진다. fail()은 재시도 횟수를 넘기면 failed로 남긴다.
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+DEFAULT_QUEUE_PATH = "data/job_queue.db"
+DEFAULT_VISIBILITY_TIMEOUT = 30 * 60  # 초
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_RETRY_DELAY = 60  # 초, 재시도마다 두 배
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+@dataclass
+class Job:
+    id: int
+    queue: str
+    payload: Any
+    attempts: int
+    max_attempts: int
+    leased_until: float
+
+
+class JobQueue:
+    """이름별 큐를 하나의 SQLite 파일(WAL)에 담는 작업 큐"""
+
+    def __init__(self, path: str = DEFAULT_QUEUE_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                queue TEXT NOT NULL,
+                dedup_key TEXT,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                available_at REAL NOT NULL,
+                leased_until REAL,
+                last_error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        # 꺼낼 작업 탐색 / 같은 작업 중복 등록 방지
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs (queue, status, available_at)")
+        self._conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_dedup ON jobs (queue, dedup_key)")
+        self._conn.commit()
+
+    def put(self, queue: str, payload: Any, delay: float = 0, dedup_key: Optional[str] = None,
+            max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> Optional[int]:
+        """작업 등록, dedup_key가 이미 있으면 등록하지 않고 None 반환"""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO jobs "
+                "(queue, dedup_key, payload, status, max_attempts, available_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (queue, dedup_key, json.dumps(payload, ensure_ascii=False), PENDING,
+                 max_attempts, now + delay, now, now),
+            )
+            self._conn.commit()
+        return cursor.lastrowid if cursor.rowcount else None
+
+    def lease(self, queue: str, visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT) -> Optional[Job]:
+        """꺼낼 수 있는 가장 오래된 작업을 visibility timeout 동안 점유
+
+        대기 중인 작업과, 점유 시간이 지났는데 완료되지 않은(워커가 죽은) 작업이 대상
+        워커를 죽이는 작업이 끝없이 다시 꺼내지지 않도록, 점유 시간이 지난 작업도 재시도 한도를 넘기면 failed로 남김
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, leased_until = NULL, last_error = ?, updated_at = ? "
+                "WHERE queue = ? AND status = ? AND leased_until <= ? AND attempts >= max_attempts",
+                (FAILED, "점유 시간 초과 (재시도 한도 초과)", now, queue, RUNNING, now),
+            )
+            row = self._conn.execute(
+                "SELECT id, payload, attempts, max_attempts FROM jobs "
+                "WHERE queue = ? AND ((status = ? AND available_at <= ?) OR (status = ? AND leased_until <= ?)) "
+                "ORDER BY available_at, id LIMIT 1",
+                (queue, PENDING, now, RUNNING, now),
+            ).fetchone()
+            if row is None:
+                self._conn.commit()
+                return None
+            job_id, payload, attempts, max_attempts = row
+            leased_until = now + visibility_timeout
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, leased_until = ?, updated_at = ? WHERE id = ?",
+                (RUNNING, leased_until, now, job_id),
+            )
+            self._conn.commit()
+        return Job(job_id, queue, json.loads(payload), attempts + 1, max_attempts, leased_until)
+
+    # ack/fail은 점유했을 때의 (attempts, leased_until)이 그대로일 때만 반영
+    # - 점유 시간이 지나 다른 워커가 다시 꺼낸 작업을 이전 워커가 완료/실패 처리하지 못하도록
+    _OWNED = f"id = ? AND status = '{RUNNING}' AND attempts = ? AND leased_until = ?"
+
+    def ack(self, job: Job) -> bool:
+        """작업 완료, 점유를 이미 잃었으면 False"""
+        with self._lock:
+            cursor = self._conn.execute(
+                f"UPDATE jobs SET status = ?, leased_until = NULL, updated_at = ? WHERE {self._OWNED}",
+                (DONE, time.time(), job.id, job.attempts, job.leased_until),
+            )
+            self._conn.commit()
+        return cursor.rowcount > 0
+
+    def fail(self, job: Job, error: str, retry_delay: float = DEFAULT_RETRY_DELAY) -> bool:
+        """작업 실패 처리 - 재시도 여유가 있으면 지연 후 다시 대기, 재시도 예정이면 True (점유를 잃었으면 False)"""
+        retry = job.attempts < job.max_attempts
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, available_at = ?, leased_until = NULL, last_error = ?, updated_at = ? "
+                f"WHERE {self._OWNED}",
+                (PENDING if retry else FAILED, now + retry_delay * (2 ** (job.attempts - 1)), error, now,
+                 job.id, job.attempts, job.leased_until),
+            )
+            self._conn.commit()
+        return retry and cursor.rowcount > 0
+
+    def payloads(self, queue: str, since: float) -> List[Any]:
+        """since 이후 등록된 작업의 payload 목록 (상태 무관)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT payload FROM jobs WHERE queue = ? AND created_at >= ? ORDER BY id", (queue, since)
+            ).fetchall()
+        return [json.loads(payload) for payload, in rows]
+
+    def depth(self) -> Dict[str, Dict[str, int]]:
+        """큐별 상태별 작업 수"""
+        with self._lock:
+            rows = self._conn.execute("SELECT queue, status, COUNT(*) FROM jobs GROUP BY queue, status").fetchall()
+        result: Dict[str, Dict[str, int]] = {}
+        for queue, status, count in rows:
+            result.setdefault(queue, {})[status] = count
+        return result
+
+    def in_flight(self) -> List[dict]:
+        """점유 중인 작업 목록"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, queue, payload, attempts, leased_until, updated_at FROM jobs WHERE status = ? ORDER BY id",
+                (RUNNING,),
+            ).fetchall()
+        return [
+            {"id": job_id, "queue": queue, "payload": json.loads(payload), "attempts": attempts,
+             "leased_until": leased_until, "started_at": started_at}
+            for job_id, queue, payload, attempts, leased_until, started_at in rows
+        ]
+
+    def prune(self, older_than_days: int = 7) -> int:
+        """완료/실패한 지 오래된 작업 삭제, 삭제된 개수 반환"""
+        cutoff = time.time() - older_than_days * 24 * 60 * 60
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?", (DONE, FAILED, cutoff))
+            self._conn.commit()
+        return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_queue() -> JobQueue:
+    """프로세스 공용 작업 큐 반환"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue()
+        return _queue
@@ -0,0 +1,173 @@
+# 생성 글 아카이브 - 생성된 Post와 원본 주제, LLM 사용량, 발행 결과를 날짜/세트별 gzip JSONL로 누적 저장
+#
+# 경로: data/archive/posts/date=YYYY-MM-DD/set=<세트>/part-<pid>.jsonl.gz
+#   - 추가만 하는(append-only) 파일이며, 쓸 때마다 gzip 멤버를 하나씩 이어 붙인다 (gzip.open으로 그대로 읽힘)
+#   - 레코드 종류: "generated" (글 생성 시 1회), "published" (발행 시도마다 계정별 결과)
+# 읽을 때는 iter_records()/iter_posts()로 파티션을 한 줄씩 스트리밍하므로 몇 달치도 메모리에 모두 올리지 않는다.
+#
+# 사용 예:
+#   python -m modules.storage.post_archive --since 2026-10-01 --set tech
+import argparse
+import gzip
+import json
+import os
+import threading
+from dataclasses import asdict
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Optional
+
+from modules.storage.publish_ledger import post_key
+
+ARCHIVE_DIR = "data/archive/posts"
+GENERATED = "generated"
+PUBLISHED = "published"
+
+# 토픽 dict에서 보관할 필드 (본문은 용량이 커서 제외)
+TOPIC_FIELDS = ("title", "url", "source", "subject", "fingerprint")
+
+_lock = threading.Lock()
+
+
+def _partition_dir(day: str, set_name: str, base_dir: str = ARCHIVE_DIR) -> str:
+    return os.path.join(base_dir, f"date={day}", f"set={set_name}")
+
+
+def append(records: List[dict], set_name: str, base_dir: str = ARCHIVE_DIR):
+    """레코드 묶음을 오늘 날짜 파티션에 gzip 멤버 하나로 추가"""
+    if not records:
+        return
+    now = datetime.now()
+    day = now.strftime("%Y-%m-%d")
+    archived_at = now.isoformat(timespec="seconds")
+    directory = _partition_dir(day, set_name, base_dir)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"part-{os.getpid()}.jsonl.gz")
+
+    lines = "".join(
+        json.dumps({"archived_at": archived_at, "date": day, "set": set_name, **record}, ensure_ascii=False, default=str) + "\n"
+        for record in records
+    )
+    with _lock, gzip.open(path, "at", encoding="utf-8") as f:
+        f.write(lines)
+
+
+def generated_record(post, topic: Optional[Dict] = None, usage=None) -> dict:
+    """글 생성 레코드 (post: content_writer.Post, usage: 글 하나에 쓴 호출 합계 llm_metrics.LLMUsage)"""
+    llm = None
+    if usage is not None and usage.calls:
+        llm = {
+            "provider": usage.provider,
+            "model": usage.model,
+            "calls": usage.calls,
+            "input_tokens": usage.input_tokens,
+            "output_tokens": usage.output_tokens,
+            "cost": usage.cost,
+            "duration": usage.duration,
+        }
+    return {
+        "kind": GENERATED,
+        "post_key": post_key(post),
+        "post": asdict(post),
+        "topic": {field: topic.get(field, "") for field in TOPIC_FIELDS} if topic else None,
+        "llm": llm,
+    }
+
+
+def published_record(post, account: str, platform: str, status: str,
+                     remote_id: Optional[str] = None, url: str = "", error: str = "") -> dict:
+    """발행 결과 레코드 (status: published / skipped / unsupported / failed)"""
+    return {
+        "kind": PUBLISHED,
+        "post_key": post_key(post),
+        "account": account,
+        "platform": platform,
+        "status": status,
+        "remote_id": remote_id,
+        "url": url,
+        "error": error,
+    }
+
+
+def _partitions(start: Optional[str], end: Optional[str], set_name: Optional[str], base_dir: str) -> Iterator[str]:
+    """기간/세트 조건에 맞는 파일 경로 (날짜 순)"""
+    if not os.path.isdir(base_dir):
+        return
+    for day_dir in sorted(os.listdir(base_dir)):
+        day = day_dir[len("date="):]
+        if not day_dir.startswith("date=") or (start and day < start) or (end and day > end):
+            continue
+        for set_dir in sorted(os.listdir(os.path.join(base_dir, day_dir))):
+            if set_name and set_dir != f"set={set_name}":
+                continue
+            directory = os.path.join(base_dir, day_dir, set_dir)
+            for name in sorted(os.listdir(directory)):
+                if name.endswith(".jsonl.gz"):
+                    yield os.path.join(directory, name)
+
+
+def iter_records(start: Optional[str] = None, end: Optional[str] = None, set_name: Optional[str] = None,
+                 kind: Optional[str] = None, base_dir: str = ARCHIVE_DIR) -> Iterator[dict]:
+    """
+    아카이브 레코드를 한 줄씩 스트리밍
+    :param start: 시작일 (YYYY-MM-DD, 포함)
+    :param end: 종료일 (YYYY-MM-DD, 포함)
+    :param kind: "generated" / "published" 중 하나만
+    """
+    for path in _partitions(start, end, set_name, base_dir):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if kind is None or record.get("kind") == kind:
+                    yield record
+
+
+def iter_posts(start: Optional[str] = None, end: Optional[str] = None, set_name: Optional[str] = None,
+               base_dir: str = ARCHIVE_DIR) -> Iterator[dict]:
+    """
+    생성 레코드에 발행 결과(publish 목록)를 붙여서 스트리밍
+    발행 결과만 먼저 한 번 훑어 작은 색인으로 만들고, 생성 레코드는 두 번째로 읽으면서 하나씩 반환
+    (발행은 생성 다음 날에 일어날 수도 있으므로 발행 결과는 종료일 이후까지 포함)
+    """
+    results: Dict[str, List[dict]] = {}
+    for record in iter_records(start, None, set_name, PUBLISHED, base_dir):
+        results.setdefault(record["post_key"], []).append({
+            field: record.get(field) for field in ("account", "platform", "status", "remote_id", "url", "error", "archived_at")
+        })
+    for record in iter_records(start, end, set_name, GENERATED, base_dir):
+        yield {**record, "publish": results.get(record["post_key"], [])}
+
+
+def summarize(start: Optional[str] = None, end: Optional[str] = None, set_name: Optional[str] = None,
+              base_dir: str = ARCHIVE_DIR) -> Dict[str, Dict[str, float]]:
+    """날짜/세트별 생성 글 수, 토큰, 비용, 발행 성공 글 수 집계"""
+    stats: Dict[str, Dict[str, float]] = {}
+    for record in iter_posts(start, end, set_name, base_dir):
+        row = stats.setdefault(f"{record['date']} {record['set']}",
+                               {"posts": 0, "input_tokens": 0, "output_tokens": 0, "cost": 0.0, "published": 0})
+        row["posts"] += 1
+        llm = record.get("llm") or {}
+        row["input_tokens"] += llm.get("input_tokens", 0)
+        row["output_tokens"] += llm.get("output_tokens", 0)
+        row["cost"] += llm.get("cost", 0.0)
+        if any(result["status"] == "published" for result in record["publish"]):
+            row["published"] += 1
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="생성 글 아카이브 요약")
+    parser.add_argument("--since", default=None, help="시작일 (YYYY-MM-DD)")
+    parser.add_argument("--until", default=date.today().isoformat(), help="종료일 (YYYY-MM-DD)")
+    parser.add_argument("--set", dest="set_name", default=None, help="세트 이름")
+    args = parser.parse_args()
+
+    stats = summarize(args.since, args.until, args.set_name)
+    print(f"{'날짜 세트':<30}{'글':>6}{'발행':>6}{'입력 토큰':>12}{'출력 토큰':>12}{'비용($)':>10}")
+    for key, row in stats.items():
+        print(f"{key:<30}{row['posts']:>6}{row['published']:>6}{row['input_tokens']:>12}{row['output_tokens']:>12}{row['cost']:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# 발행 이력(ledger) 저장소 - 중복 발행 방지용
+import hashlib
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Optional, Union
+
+DEFAULT_LEDGER_PATH = "data/publish_ledger.db"
+
+
+def account_key(account: dict) -> str:
+    """계정 설정에서 ledger 키 생성 (플랫폼 + 사이트/사용자 식별자)"""
+    platform = account.get("platform", "")
+    for field in ("SITE_ID", "blog_name", "username"):
+        if account.get(field) not in (None, ""):
+            return f"{platform}:{account[field]}"
+    return f"{platform}:"
+
+
+def post_key(post: Union[str, object]) -> str:
+    """포스트 식별 키 생성 (원문 URL 우선, 없으면 제목+본문 해시)"""
+    if isinstance(post, str):
+        text = post
+    else:
+        source_url = getattr(post, "source_url", "")
+        if source_url:
+            return f"url:{source_url}"
+        text = f"{getattr(post, 'title', '')}\n{getattr(post, 'content', '')}"
+    return "sha256:" + hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class PublishLedger:
+    """(계정, 포스트) 단위로 발행 여부와 원격 포스트 ID를 기록하는 SQLite 저장소"""
+
+    def __init__(self, path: str = DEFAULT_LEDGER_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # 복합 기본키 인덱스로 조회는 이력 크기와 무관하게 일정한 비용
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS published (
+                account_key TEXT NOT NULL,
+                post_key TEXT NOT NULL,
+                platform TEXT NOT NULL,
+                remote_id TEXT,
+                url TEXT,
+                title TEXT,
+                published_at TEXT NOT NULL,
+                PRIMARY KEY (account_key, post_key)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_published_at ON published (published_at)")
+        self._conn.commit()
+
+    def is_published(self, account_key: str, post_key: str) -> bool:
+        """이미 발행된 포스트인지 확인"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM published WHERE account_key = ? AND post_key = ?",
+                (account_key, post_key),
+            ).fetchone()
+        return row is not None
+
+    def get(self, account_key: str, post_key: str) -> Optional[dict]:
+        """발행 기록 조회"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT platform, remote_id, url, title, published_at FROM published "
+                "WHERE account_key = ? AND post_key = ?",
+                (account_key, post_key),
+            ).fetchone()
+        if row is None:
+            return None
+        platform, remote_id, url, title, published_at = row
+        return {
+            "platform": platform,
+            "remote_id": remote_id,
+            "url": url,
+            "title": title,
+            "published_at": published_at,
+        }
+
+    def record(self, account_key: str, post_key: str, platform: str,
+               remote_id: Optional[str] = None, url: str = "", title: str = ""):
+        """발행 결과 기록"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO published "
+                "(account_key, post_key, platform, remote_id, url, title, published_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (account_key, post_key, platform,
+                 None if remote_id is None else str(remote_id),
+                 url, title, datetime.now().isoformat(timespec="seconds")),
+            )
+            self._conn.commit()
+
+    def prune(self, older_than_days: int = 90) -> int:
+        """오래된 발행 기록 삭제, 삭제된 개수 반환"""
+        cutoff = (datetime.now() - timedelta(days=older_than_days)).isoformat(timespec="seconds")
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM published WHERE published_at < ?", (cutoff,))
+            self._conn.commit()
+        return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_ledger: Optional[PublishLedger] = None
+_ledger_lock = threading.Lock()
+
+
+def get_ledger() -> PublishLedger:
+    """프로세스 공용 ledger 반환"""
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = PublishLedger()
+        return _ledger
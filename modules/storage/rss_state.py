@@ -0,0 +1,108 @@
+# RSS 수집 상태 - 세트+피드별 조건부 요청 값(ETag/Last-Modified)과 이미 저장한 항목(GUID)
+#
+# 같은 피드를 여러 세트가 써도 서로의 상태에 영향을 주지 않도록 모두 세트 단위로 기록하고,
+# 수집한 기사가 스프레드시트에 저장된 뒤에만 commit하므로 저장이 실패하면 다음 수집에서 다시 받는다.
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional, Set
+
+DEFAULT_STATE_PATH = "data/rss_state.db"
+SEEN_TTL_DAYS = 14
+
+
+class RssState:
+    """(세트, 피드) 단위 validator와 (세트, GUID) 단위 저장 기록을 보관하는 SQLite 저장소"""
+
+    def __init__(self, path: str = DEFAULT_STATE_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS feeds (
+                set_name TEXT NOT NULL,
+                url TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                PRIMARY KEY (set_name, url)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS seen (
+                set_name TEXT NOT NULL,
+                guid TEXT NOT NULL,
+                seen_at REAL NOT NULL,
+                PRIMARY KEY (set_name, guid)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.commit()
+
+    def validators(self, set_name: str, url: str) -> dict:
+        """피드의 마지막 ETag/Last-Modified (없으면 빈 dict)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified FROM feeds WHERE set_name = ? AND url = ?", (set_name, url)
+            ).fetchone()
+        return {"etag": row[0], "last_modified": row[1]} if row else {}
+
+    def seen(self, set_name: str, guids: Iterable[str]) -> Set[str]:
+        """guids 중 이미 저장된 것만 반환"""
+        guids = list(guids)
+        found = set()
+        with self._lock:
+            for start in range(0, len(guids), 500):  # SQLite 변수 개수 제한
+                chunk = guids[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT guid FROM seen WHERE set_name = ? AND guid IN ({','.join('?' * len(chunk))})",
+                    (set_name, *chunk),
+                ).fetchall()
+                found.update(row[0] for row in rows)
+        return found
+
+    def commit(self, set_name: str, validators: Dict[str, dict], guids: Iterable[str]):
+        """저장이 끝난 수집 결과 기록 - 피드 validator 갱신과 GUID 저장 표시를 한 트랜잭션으로"""
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO feeds (set_name, url, etag, last_modified) VALUES (?, ?, ?, ?)",
+                    [(set_name, url, v.get("etag"), v.get("last_modified")) for url, v in validators.items()],
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO seen (set_name, guid, seen_at) VALUES (?, ?, ?)",
+                    [(set_name, guid, now) for guid in guids if guid],
+                )
+
+    def prune(self, older_than_days: int = SEEN_TTL_DAYS) -> int:
+        """오래된 GUID 기록 삭제, 삭제된 개수 반환"""
+        cutoff = time.time() - older_than_days * 24 * 60 * 60
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM seen WHERE seen_at < ?", (cutoff,))
+            self._conn.commit()
+        return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_state: Optional[RssState] = None
+_state_lock = threading.Lock()
+
+
+def get_state() -> RssState:
+    """프로세스 공용 RSS 수집 상태 반환"""
+    global _state
+    with _state_lock:
+        if _state is None:
+            _state = RssState()
+        return _state
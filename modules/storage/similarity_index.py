@@ -0,0 +1,148 @@
+# 작성 이력 유사도 색인 - 이미 글로 쓴 주제와 비슷한 후보를 LLM 호출 전에 걸러내기 위한 SimHash 색인
+#
+# 스프레드시트의 used 표시는 매일 밤 clear_worksheet로 지워지므로, 같은 이야기가 다음 날 다른 URL로
+# 다시 수집되면 막을 방법이 없다. 글을 쓸 때마다 원본 주제와 생성된 글의 64비트 SimHash를 세트별 파일에 남기고,
+# 새 후보는 해밍 거리 MAX_DISTANCE 이하인 기록이 있으면 건너뛴다.
+#
+# 저장 형식: data/similarity/<세트>.bin - (simhash, 기록 시각) uint64 쌍을 이어 붙인 추가 전용 파일
+# 조회: 64비트를 BANDS개 구간으로 나눠 구간 값별 색인을 두므로(비둘기집 원리로 거리 BANDS-1 이하는 반드시
+# 한 구간이 같음) 이력 크기와 무관하게 후보 몇 개만 비교한다.
+import os
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional
+
+from modules.utils.fingerprint import hamming_distance
+
+DEFAULT_INDEX_DIR = "data/similarity"
+MAX_DISTANCE = 3  # 이 해밍 거리 이하면 같은 이야기로 판단 (64비트 중)
+BANDS = MAX_DISTANCE + 1
+RETENTION_DAYS = 30
+
+_BAND_BITS = 64 // BANDS
+_BAND_MASK = (1 << _BAND_BITS) - 1
+_RECORD_SIZE = 16  # uint64 두 개
+
+
+class SimilarityIndex:
+    """세트 하나의 작성 이력 SimHash 색인 (파일 + 메모리 구간 색인)"""
+
+    def __init__(self, path: str, retention_days: int = RETENTION_DAYS):
+        self.path = path
+        self.retention_days = retention_days
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._hashes = array("Q")
+        self._bands: List[Dict[int, List[int]]] = [{} for _ in range(BANDS)]
+        self._offset = 0  # 파일에서 읽어 들인 위치 (다른 프로세스가 추가한 기록을 이어 읽기 위함)
+        self._load()
+
+    def _cutoff(self) -> int:
+        return int(time.time()) - self.retention_days * 24 * 60 * 60
+
+    def _insert(self, simhash: int):
+        position = len(self._hashes)
+        self._hashes.append(simhash)
+        for band in range(BANDS):
+            key = (simhash >> (band * _BAND_BITS)) & _BAND_MASK
+            self._bands[band].setdefault(key, []).append(position)
+
+    def _read_tail(self) -> int:
+        """파일에서 아직 읽지 않은 기록을 색인에 추가, 보존 기간이 지나 버린 기록 수 반환"""
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+        size -= size % _RECORD_SIZE  # 쓰다 만 마지막 기록은 무시
+        if size < self._offset:
+            # 다른 프로세스가 파일을 정리(compact)함 - 처음부터 다시 읽기
+            self._hashes = array("Q")
+            self._bands = [{} for _ in range(BANDS)]
+            self._offset = 0
+        if size == self._offset:
+            return 0
+
+        records = array("Q")
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            records.frombytes(f.read(size - self._offset))
+        self._offset = size
+
+        cutoff = self._cutoff()
+        expired = 0
+        for i in range(0, len(records), 2):
+            if records[i + 1] < cutoff:
+                expired += 1
+            else:
+                self._insert(records[i])
+        return expired
+
+    def _load(self):
+        with self._lock:
+            expired = self._read_tail()
+            # 만료된 기록이 절반 이상이면 남은 기록만으로 파일을 다시 씀
+            if expired and expired >= len(self._hashes):
+                self._compact()
+
+    def _compact(self):
+        cutoff = self._cutoff()
+        records = array("Q")
+        with open(self.path, "rb") as f:
+            records.frombytes(f.read(self._offset))
+        kept = array("Q")
+        for i in range(0, len(records), 2):
+            if records[i + 1] >= cutoff:
+                kept.extend((records[i], records[i + 1]))
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            kept.tofile(f)
+        os.replace(tmp_path, self.path)
+        self._offset = len(kept) * kept.itemsize
+
+    def find(self, simhash: int, max_distance: int = MAX_DISTANCE) -> Optional[int]:
+        """해밍 거리 max_distance 이하인 기록이 있으면 그 SimHash 반환 (max_distance는 BANDS-1 이하)"""
+        if not simhash:
+            return None
+        with self._lock:
+            self._read_tail()
+            for band in range(BANDS):
+                key = (simhash >> (band * _BAND_BITS)) & _BAND_MASK
+                for position in self._bands[band].get(key, ()):
+                    candidate = self._hashes[position]
+                    if hamming_distance(simhash, candidate) <= max_distance:
+                        return candidate
+        return None
+
+    def add(self, *simhashes: int):
+        """작성한 글의 SimHash 기록"""
+        now = int(time.time())
+        records = array("Q")
+        for simhash in simhashes:
+            if simhash:
+                records.extend((simhash, now))
+        if not records:
+            return
+        with self._lock:
+            with open(self.path, "ab") as f:
+                records.tofile(f)
+            # 방금 쓴 기록(과 그 사이 다른 프로세스가 추가한 기록)을 파일에서 이어 읽어 색인에 반영
+            self._read_tail()
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+
+_indexes: Dict[str, SimilarityIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(set_name: str, base_dir: str = DEFAULT_INDEX_DIR) -> SimilarityIndex:
+    """세트별 프로세스 공용 색인 반환"""
+    path = os.path.join(base_dir, f"{set_name}.bin")
+    with _indexes_lock:
+        if path not in _indexes:
+            _indexes[path] = SimilarityIndex(path)
+        return _indexes[path]
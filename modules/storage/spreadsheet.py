@@ -1,82 +1,286 @@
-from typing import List
+from typing import Dict, Iterator, List, Tuple
 import gspread
+from gspread.utils import Dimension, rowcol_to_a1
 from config import load_env
-from datetime import datetime
+from datetime import datetime, timedelta
+import random
+import threading
 from modules.models.article import Article
+from modules.utils import logger
 
 ENV = load_env()
 GOOGLE_SHEET_KEY = ENV.get("GOOGLE_SHEET_KEY")
 SERVICE_ACCOUNT_FILE = ENV.get("GOOGLE_SERVICE_ACCOUNT_FILE", "service_account.json")  # 기본값 root/service_account.json
 
+# 기존 시트와 호환되도록 used는 6번째 컬럼에 두고 새 컬럼은 뒤에 추가
+SHEET_HEADER = ["title", "content", "url", "source", "subject", "used",
+                "published_at", "source_id", "score", "fingerprint", "simhash"]
+
+
+DEFAULT_ROWS = 1000
+DEFAULT_COLS = 20
+ARCHIVE_KEEP_DAYS = 7
+
+# 클라이언트/워크시트/헤더는 프로세스 안에서 재사용 (매번 인증·메타데이터 조회를 하지 않도록)
+_lock = threading.Lock()
+_spreadsheet = None
+_worksheets: Dict[str, gspread.Worksheet] = {}
+_headers: Dict[str, List[str]] = {}
+
+
+def _get_spreadsheet():
+    """스프레드시트 연결 (최초 1회)"""
+    global _spreadsheet
+    if _spreadsheet is None:
+        from google.oauth2.service_account import Credentials
+
+        scopes = [
+            "https://www.googleapis.com/auth/spreadsheets",
+            "https://www.googleapis.com/auth/drive",
+        ]
+
+        creds = Credentials.from_service_account_file(SERVICE_ACCOUNT_FILE, scopes=scopes)
+        client = gspread.authorize(creds)
+        _spreadsheet = client.open_by_key(GOOGLE_SHEET_KEY)
+    return _spreadsheet
+
 
 def _get_worksheet(set_name: str):
     """
     스프레드시트 연결 후 워크시트 객체 반환
     """
-    from google.oauth2.service_account import Credentials
+    with _lock:
+        if set_name in _worksheets:
+            return _worksheets[set_name]
+
+        sheet = _get_spreadsheet()
+
+        # 워크시트 이름: set_name, 없으면 새로 생성
+        try:
+            worksheet = sheet.worksheet(set_name)
+        except gspread.exceptions.WorksheetNotFound:
+            worksheet = sheet.add_worksheet(title=set_name, rows=str(DEFAULT_ROWS), cols=str(DEFAULT_COLS))
+
+        _worksheets[set_name] = worksheet
+        return worksheet
+
+
+def get_header(set_name: str) -> List[str]:
+    """워크시트 헤더 (캐시), 헤더가 없으면 기본 헤더를 추가"""
+    if set_name not in _headers:
+        worksheet = _get_worksheet(set_name)
+        with logger.span("sheets.header"):
+            header = worksheet.row_values(1)
+        if not header:
+            worksheet.update([SHEET_HEADER], "A1")
+            header = list(SHEET_HEADER)
+        _headers[set_name] = header
+    return _headers[set_name]
+
+
+def set_header(set_name: str, header: List[str]):
+    """헤더 갱신 (시트와 캐시 모두)"""
+    _get_worksheet(set_name).update([header], "1:1")
+    _headers[set_name] = list(header)
+
+
+def _header_cells(header: List[str]) -> List[dict]:
+    return [{"values": [{"userEnteredValue": {"stringValue": column}} for column in header]}]
+
+
+# 주제 선정에 필요한 컬럼 (content는 미사용 행만 따로 가져옴)
+TOPIC_COLUMNS = ["title", "url", "source", "subject", "fingerprint", "simhash"]
+CONTENT_RANGES_PER_REQUEST = 100  # batchGet은 GET 요청이라 범위 개수를 제한
+
+
+def _column_letter(col: int) -> str:
+    return rowcol_to_a1(1, col)[:-1]
+
+
+def _row_runs(rows: List[int]) -> List[Tuple[int, int]]:
+    """정렬된 행 번호를 연속 구간 (start, end) 목록으로 묶기"""
+    runs = []
+    for row in rows:
+        if runs and runs[-1][1] == row - 1:
+            runs[-1] = (runs[-1][0], row)
+        else:
+            runs.append((row, row))
+    return runs
+
+
+def iter_unused_topics(set_name: str) -> Iterator[Dict]:
+    """
+    사용되지 않은 주제를 실제 시트 행 번호와 함께 한 번의 순회로 반환
+    - 필요한 컬럼만 열 단위로 가져오고, content는 미사용 행만 가져와서 사용된 행의 본문은 내려받지 않음
+    - 중복된 행이 있어도 행 번호는 항상 실제 위치
+    """
+    worksheet = _get_worksheet(set_name=set_name)
+    header = get_header(set_name)
+
+    columns = [column for column in TOPIC_COLUMNS + ["used"] if column in header]
+    ranges = [f"{_column_letter(header.index(c) + 1)}2:{_column_letter(header.index(c) + 1)}" for c in columns]
+    with logger.span("sheets.read_topics"):
+        value_ranges = worksheet.batch_get(ranges, major_dimension=Dimension.cols)
+    values = {
+        column: (value_range[0] if value_range else [])
+        for column, value_range in zip(columns, value_ranges)
+    }
+
+    def cell(column: str, i: int) -> str:
+        column_values = values.get(column, [])
+        return column_values[i] if i < len(column_values) else ""
 
-    scopes = [
-        "https://www.googleapis.com/auth/spreadsheets",
-        "https://www.googleapis.com/auth/drive",
-    ]
+    row_count = max((len(v) for v in values.values()), default=0)
+    unused = {}
+    for i in range(row_count):
+        if cell("used", i):
+            continue
+        row_index = i + 2  # 헤더 포함해서 +2
+        unused[row_index] = {
+            'title': cell("title", i),
+            'content': '',
+            'url': cell("url", i),
+            'source': cell("source", i),
+            'subject': cell("subject", i),
+            'fingerprint': cell("fingerprint", i),
+            'simhash': int(cell("simhash", i) or "0", 16),
+            'row_index': row_index,
+        }
+
+    if not unused:
+        return
 
-    creds = Credentials.from_service_account_file(SERVICE_ACCOUNT_FILE, scopes=scopes)
-    client = gspread.authorize(creds)
-    sheet = client.open_by_key(GOOGLE_SHEET_KEY)
+    # 미사용 행의 content만 연속 구간 단위로 묶어서 가져오기
+    content_col = _column_letter(header.index("content") + 1) if "content" in header else None
+    runs = _row_runs(sorted(unused))
+    for start in range(0, len(runs), CONTENT_RANGES_PER_REQUEST):
+        chunk = runs[start:start + CONTENT_RANGES_PER_REQUEST]
+        if content_col:
+            with logger.span("sheets.read_content"):
+                content_ranges = worksheet.batch_get(
+                    [f"{content_col}{first}:{content_col}{last}" for first, last in chunk],
+                    major_dimension=Dimension.cols,
+                )
+        else:
+            content_ranges = [[] for _ in chunk]
 
-    # 워크시트 이름: set_name, 없으면 새로 생성
-    try:
-        worksheet = sheet.worksheet(set_name)
-    except gspread.exceptions.WorksheetNotFound:
-        worksheet = sheet.add_worksheet(title=set_name, rows="1000", cols="20")
+        for (first, last), value_range in zip(chunk, content_ranges):
+            contents = value_range[0] if value_range else []
+            for row_index in range(first, last + 1):
+                offset = row_index - first
+                topic = unused[row_index]
+                topic['content'] = contents[offset] if offset < len(contents) else ''
+                yield topic
 
-    return worksheet
 
+def _saved_fingerprints(worksheet, header: List[str]) -> set:
+    """시트에 이미 저장된 기사 지문 (fingerprint 컬럼만 조회)"""
+    if "fingerprint" not in header:
+        return set()
+    column = _column_letter(header.index("fingerprint") + 1)
+    with logger.span("sheets.read_fingerprints"):
+        value_ranges = worksheet.batch_get([f"{column}2:{column}"], major_dimension=Dimension.cols)
+    values = value_ranges[0][0] if value_ranges and value_ranges[0] else []
+    return {value for value in values if value}
 
-def save_news(set_name: str, news_list: List[Article]):
+
+def save_news(set_name: str, news_list: List[Article]) -> int:
     """
-    dict 타입 뉴스 리스트를 스프레드시트에 저장
-    :param news_list: [{'title':..., 'url':..., 'content':..., 'publishedAt':...}, ...]
+    Article 목록을 스프레드시트에 저장, 새로 추가한 행 수 반환
+    - 시트에 이미 있는 지문(fingerprint)의 기사는 건너뛰므로 수집/저장 단계를 다시 실행해도 중복 행이 생기지 않음
     """
     if not GOOGLE_SHEET_KEY:
         raise ValueError("❌ GOOGLE_SHEET_KEY가 설정되지 않았습니다 (.env 확인 필요)")
 
     worksheet = _get_worksheet(set_name=set_name)
 
-    # 스프레드시트에 헤더가 없으면 추가
-    if worksheet.row_count == 0 or not worksheet.cell(1, 1).value:
-        worksheet.append_row(["title", "content", "url", "source", "subject", "used"])
-
-    saved_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    # 스프레드시트에 헤더가 없으면 추가 (헤더는 캐시해서 저장할 때마다 조회하지 않음)
+    header = get_header(set_name)
 
-    rows = []
+    saved = _saved_fingerprints(worksheet, header)
+    new_items = []
     for news in news_list:
-        rows.append([
-            news.title,
-            news.content,
-            news.url,
-            news.source,
-            news.subject
-        ])
+        if news.fingerprint in saved:
+            continue
+        saved.add(news.fingerprint)
+        new_items.append(news)
+    if not new_items:
+        logger.log(f"[Spreadsheet] 새 뉴스 없음 (이미 저장됨 {len(news_list)}개)")
+        return 0
+
+    # 헤더 컬럼 순서에 맞춰 행 생성 (used 등 Article에 없는 컬럼은 빈 값)
+    rows = [news.to_row(header) for news in new_items]
 
     # 한 번에 여러 행 추가
-    worksheet.append_rows(rows)
-    print(f"[Spreadsheet] 뉴스 {len(news_list)}개 저장 완료")
+    with logger.span("sheets.append"):
+        worksheet.append_rows(rows)
+    logger.log(f"[Spreadsheet] 뉴스 {len(new_items)}개 저장 완료 (중복 {len(news_list) - len(new_items)}개 제외)")
+    return len(new_items)
 
-def clear_worksheet(set_name: str):
+def clear_worksheet(set_name: str, archive: bool = False, keep_days: int = ARCHIVE_KEEP_DAYS):
     """
     스프레드시트 워크시트 초기화 (헤더만 남기고 모든 데이터 삭제)
+    - 데이터를 내려받지 않고 batchUpdate 한 번으로 처리
+    - archive=True면 현재 탭을 날짜 탭(set_name_YYYYMMDD)으로 보관하고 새 탭을 만든 뒤,
+      keep_days보다 오래된 보관 탭은 삭제 (메타데이터 조회 포함 2회 호출)
     """
     worksheet = _get_worksheet(set_name=set_name)
-    
-    # 현재 데이터 개수 확인
-    all_records = worksheet.get_all_records()
-    if not all_records:
-        print(f"[Spreadsheet] {set_name} 워크시트가 이미 비어있습니다.")
+    sheet = _get_spreadsheet()
+
+    if archive:
+        archive_title = f"{set_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        new_sheet_id = random.randint(1, 2**31 - 1)
+        requests = [
+            {"updateSheetProperties": {
+                "properties": {"sheetId": worksheet.id, "title": archive_title},
+                "fields": "title",
+            }},
+            {"addSheet": {"properties": {
+                "sheetId": new_sheet_id,
+                "title": set_name,
+                "gridProperties": {"rowCount": DEFAULT_ROWS, "columnCount": DEFAULT_COLS},
+            }}},
+            {"updateCells": {
+                "start": {"sheetId": new_sheet_id, "rowIndex": 0, "columnIndex": 0},
+                "rows": _header_cells(SHEET_HEADER),
+                "fields": "userEnteredValue",
+            }},
+        ]
+
+        # 오래된 보관 탭 정리
+        cutoff = (datetime.now() - timedelta(days=keep_days)).strftime('%Y%m%d')
+        prefix = f"{set_name}_"
+        for other in sheet.worksheets():
+            suffix = other.title[len(prefix):]
+            if other.title.startswith(prefix) and suffix[:8].isdigit() and suffix[:8] < cutoff:
+                requests.append({"deleteSheet": {"sheetId": other.id}})
+
+        with logger.span("sheets.clear"):
+            sheet.batch_update({"requests": requests})
+        with _lock:
+            _worksheets.pop(set_name, None)
+        _headers[set_name] = list(SHEET_HEADER)
+        logger.log(f"[Spreadsheet] {set_name} 워크시트를 {archive_title}로 보관하고 새로 만들었습니다.")
         return
-    
-    # 헤더만 남기고 모든 행 삭제
-    worksheet.clear()
-    worksheet.append_row(["title", "content", "url", "source", "subject", "used"])
-    
-    print(f"[Spreadsheet] {set_name} 워크시트 초기화 완료 ({len(all_records)}개 기록 삭제)")
+
+    with logger.span("sheets.clear"):
+        _truncate(sheet, worksheet)
+    _headers[set_name] = list(SHEET_HEADER)
+
+    logger.log(f"[Spreadsheet] {set_name} 워크시트 초기화 완료")
+
+
+def _truncate(sheet, worksheet):
+    """1행(헤더)만 남기고 행을 잘라낸 뒤 빈 행을 다시 붙이고 헤더를 기본값으로 덮어쓰기"""
+    sheet.batch_update({"requests": [
+        {"updateSheetProperties": {
+            "properties": {"sheetId": worksheet.id, "gridProperties": {"rowCount": 1}},
+            "fields": "gridProperties.rowCount",
+        }},
+        {"appendDimension": {"sheetId": worksheet.id, "dimension": "ROWS", "length": DEFAULT_ROWS - 1}},
+        {"updateCells": {
+            "start": {"sheetId": worksheet.id, "rowIndex": 0, "columnIndex": 0},
+            "rows": _header_cells(SHEET_HEADER),
+            "fields": "userEnteredValue",
+        }},
+    ]})
@@ -0,0 +1,76 @@
+# 원문 요약 캐시 - 기사 내용 지문(fingerprint)별로 요약을 한 번만 만들고 재시도/재생성 때 재사용
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+DEFAULT_CACHE_PATH = "data/summary_cache.db"
+
+
+class SummaryCache:
+    """(지문) 단위로 요약 JSON을 보관하는 SQLite 저장소"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS summaries (
+                fingerprint TEXT PRIMARY KEY,
+                summary TEXT NOT NULL,
+                model TEXT,
+                created_at TEXT NOT NULL
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.commit()
+
+    def get(self, fingerprint: str) -> Optional[dict]:
+        """저장된 요약 조회"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary FROM summaries WHERE fingerprint = ?", (fingerprint,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, fingerprint: str, summary: dict, model: str = ""):
+        """요약 저장 (같은 지문이면 덮어씀)"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summaries (fingerprint, summary, model, created_at) VALUES (?, ?, ?, ?)",
+                (fingerprint, json.dumps(summary, ensure_ascii=False), model,
+                 datetime.now().isoformat(timespec="seconds")),
+            )
+            self._conn.commit()
+
+    def prune(self, older_than_days: int = 30) -> int:
+        """오래된 요약 삭제, 삭제된 개수 반환"""
+        cutoff = (datetime.now() - timedelta(days=older_than_days)).isoformat(timespec="seconds")
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM summaries WHERE created_at < ?", (cutoff,))
+            self._conn.commit()
+        return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_cache: Optional[SummaryCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> SummaryCache:
+    """프로세스 공용 요약 캐시 반환"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SummaryCache()
+        return _cache
@@ -0,0 +1,67 @@
+# 텍스트 지문(fingerprint) - 정규화 텍스트 해시 + SimHash
+import hashlib
+import re
+import unicodedata
+from typing import Iterable, List
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def normalize_text(text: str) -> str:
+    """HTML 태그 제거, 유니코드 정규화(NFKC), 소문자화, 공백 정리"""
+    text = _TAG_RE.sub(" ", text or "")
+    text = unicodedata.normalize("NFKC", text).lower()
+    return " ".join(text.split())
+
+
+def tokenize(text: str) -> List[str]:
+    """정규화된 텍스트를 단어 토큰으로 분리"""
+    return _TOKEN_RE.findall(text)
+
+
+def content_hash(text: str) -> str:
+    """정규화 텍스트의 128비트 해시 (완전 중복 판별용)"""
+    return hashlib.blake2b(normalize_text(text).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _hash64(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def simhash64(features: Iterable[str]) -> int:
+    """64비트 SimHash (유사 중복 판별용)
+
+    비트마다 카운터를 두는 대신 64개 카운터를 비트 슬라이스(planes[i] = 각 카운터의 i번째 비트)로
+    들고 있어서, 특성 하나를 더할 때 비트 64번 대신 평균 2번 정도의 정수 연산만 한다.
+    """
+    planes: List[int] = []
+    count = 0
+    for feature in features:
+        carry = _hash64(feature)
+        count += 1
+        for i, plane in enumerate(planes):
+            planes[i] = plane ^ carry
+            carry = plane & carry
+            if not carry:
+                break
+        if carry:
+            planes.append(carry)
+
+    result = 0
+    for bit in range(64):
+        ones = 0
+        for i, plane in enumerate(planes):
+            ones |= ((plane >> bit) & 1) << i
+        if ones * 2 > count:
+            result |= 1 << bit
+    return result
+
+
+def text_simhash(text: str) -> int:
+    """텍스트의 SimHash"""
+    return simhash64(tokenize(normalize_text(text)))
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
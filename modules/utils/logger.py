@@ -1,4 +1,190 @@
-# 로깅
+# 로깅 - JSON Lines 구조화 로그 + 구간(span) 타이머
+#
+# log()와 span()은 기록을 큐에 넣기만 하고, 콘솔 출력과 파일 쓰기는 백그라운드 스레드가 처리한다.
+# 세트/단계/프로바이더/모델 같은 공통 필드는 context()로 묶어두면 그 안의 모든 로그에 붙는다.
+import atexit
+import contextvars
+import json
+import math
+import os
+import queue
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
 
-def log(message: str):
-    print(f"[LOG] {message}")
+LOG_DIR = "data/logs"
+MAX_SPAN_SAMPLES = 10000  # 구간별로 백분위수 계산에 쓰는 최근 측정값 수 (데몬에서 메모리가 계속 늘지 않도록)
+
+_context: contextvars.ContextVar[Dict] = contextvars.ContextVar("log_context", default={})
+_queue: "queue.SimpleQueue[Optional[dict]]" = queue.SimpleQueue()
+_writer: Optional[threading.Thread] = None
+_writer_lock = threading.Lock()
+_atexit_registered = False
+
+_durations: Dict[str, deque] = defaultdict(lambda: deque(maxlen=MAX_SPAN_SAMPLES))
+_span_totals: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0])  # 구간별 전체 [횟수, 합계]
+_durations_lock = threading.Lock()
+
+
+def _write_loop():
+    os.makedirs(LOG_DIR, exist_ok=True)
+    day = None
+    f = None
+    try:
+        while True:
+            record = _queue.get()
+            if record is None:
+                break
+            # 기록 시각의 날짜로 파일을 고름 - 데몬처럼 여러 날 실행돼도 날짜별 파일로 나뉨
+            record_day = record["ts"][:10]
+            if record_day != day:
+                if f is not None:
+                    f.close()
+                day = record_day
+                f = open(os.path.join(LOG_DIR, f"{day}.jsonl"), "a", encoding="utf-8")
+            f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            # span 기록은 파일에만 남기고 콘솔에는 메시지만 출력
+            if record.get("event") == "log":
+                print(f"[LOG] {record['message']}")
+            if _queue.empty():
+                f.flush()
+    finally:
+        if f is not None:
+            f.close()
+
+
+def _ensure_writer():
+    global _writer, _atexit_registered
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = threading.Thread(target=_write_loop, name="log-writer", daemon=True)
+                _writer.start()
+                if not _atexit_registered:
+                    atexit.register(shutdown)
+                    _atexit_registered = True
+
+
+def _emit(record: dict):
+    _ensure_writer()
+    _queue.put(record)
+
+
+def log(message: str, **fields):
+    _emit({
+        "ts": datetime.now().isoformat(timespec="milliseconds"),
+        "event": "log",
+        "message": message,
+        **_context.get(),
+        **fields,
+    })
+
+
+@contextmanager
+def context(**fields):
+    """블록 안의 모든 로그에 공통 필드(set, stage, provider, model 등)를 붙임"""
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def get_context() -> Dict:
+    """현재 로그 컨텍스트 필드"""
+    return dict(_context.get())
+
+
+@contextmanager
+def span(name: str, **fields):
+    """블록 실행 시간을 측정해서 기록 (실행 종료 시 summary()에서 구간별 지연 시간 집계)"""
+    started = time.perf_counter()
+    status = "ok"
+    with context(**fields):
+        try:
+            yield
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            duration = time.perf_counter() - started
+            with _durations_lock:
+                _durations[name].append(duration)
+                totals = _span_totals[name]
+                totals[0] += 1
+                totals[1] += duration
+            _emit({
+                "ts": datetime.now().isoformat(timespec="milliseconds"),
+                "event": "span",
+                "span": name,
+                "duration_ms": round(duration * 1000, 2),
+                "status": status,
+                **_context.get(),
+            })
+
+
+def submit(executor, fn, *args, **kwargs):
+    """executor.submit과 같지만 현재 로그 컨텍스트를 워커 스레드로 전달"""
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """nearest-rank 백분위수"""
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def summary(reset: bool = False) -> Dict[str, Dict[str, float]]:
+    """구간별 지연 시간 집계 (초 단위 count/p50/p95/max/total, 백분위수와 max는 최근 MAX_SPAN_SAMPLES개 기준)
+
+    reset이면 집계한 기록을 같은 잠금 안에서 비움 (그 사이에 끝난 구간이 빠지지 않도록)
+    """
+    with _durations_lock:
+        snapshot = {name: sorted(values) for name, values in _durations.items()}
+        totals = {name: tuple(values) for name, values in _span_totals.items()}
+        if reset:
+            _durations.clear()
+            _span_totals.clear()
+    return {
+        name: {
+            "count": totals[name][0],
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "max": values[-1],
+            "total": totals[name][1],
+        }
+        for name, values in snapshot.items() if values
+    }
+
+
+def reset_summary():
+    """구간별 지연 시간 기록 비움"""
+    with _durations_lock:
+        _durations.clear()
+        _span_totals.clear()
+
+
+def print_summary(reset: bool = False):
+    """실행 종료 시 구간별 지연 시간 요약 출력 (reset이면 출력 후 기록을 비움)"""
+    stats = summary(reset=reset)
+    if not stats:
+        return
+    lines = ["", f"{'구간':<20}{'횟수':>6}{'p50':>10}{'p95':>10}{'max':>10}{'합계':>10}"]
+    for name, s in sorted(stats.items(), key=lambda item: -item[1]["total"]):
+        lines.append(f"{name:<20}{s['count']:>6}{s['p50']:>9.2f}s{s['p95']:>9.2f}s{s['max']:>9.2f}s{s['total']:>9.1f}s")
+    log("\n".join(lines))
+    _emit({"ts": datetime.now().isoformat(timespec="milliseconds"), "event": "summary", "spans": stats})
+
+
+def shutdown():
+    """남은 로그를 모두 쓰고 writer 스레드 종료"""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            return
+        _queue.put(None)
+        _writer.join()
+        _writer = None
@@ -1 +1,245 @@
-# AI 기능 테스트
\ No newline at end of file
+# AI 기능 테스트
+from datetime import date, timedelta
+
+import pytest
+
+from modules.ai.llm_metrics import LLMCall
+from modules.ai.llm_providers import AIMD_DECREASE, AIMD_INCREASE, RateLimiter, TokenBucket, TokenBudget
+
+
+def test_token_bucket_refills_at_rate_and_caps_at_one_minute():
+    bucket = TokenBucket(60)  # 초당 1개
+    bucket.updated = 0.0
+    bucket.take(60)
+
+    assert bucket.wait_time(1, now=0.0) == pytest.approx(1.0)
+    assert bucket.wait_time(1, now=10.0) == 0.0
+    assert bucket.tokens == pytest.approx(10)
+    # 오래 쉬어도 1분치 이상은 쌓이지 않음
+    assert bucket.wait_time(1, now=1000.0) == 0.0
+    assert bucket.tokens == pytest.approx(60)
+
+
+def test_token_bucket_debt_and_oversized_requests():
+    bucket = TokenBucket(60)
+    bucket.updated = 0.0
+    # 실제 사용량이 추정보다 많으면 음수(빚)가 되고 그만큼 더 기다림
+    bucket.take(90)
+    assert bucket.wait_time(1, now=0.0) == pytest.approx(31.0)
+    # 1분치보다 큰 요청은 버킷이 가득 차면 통과
+    assert bucket.wait_time(500, now=90.0) == 0.0
+
+
+def test_rate_limiter_aimd_halves_then_recovers_to_configured_limits():
+    limiter = RateLimiter("test", requests_per_minute=100, tokens_per_minute=1000, max_concurrency=4)
+
+    limiter.throttled()
+    assert limiter.requests.rate == pytest.approx(100 * AIMD_DECREASE)
+    assert limiter.tokens.rate == pytest.approx(1000 * AIMD_DECREASE)
+    assert limiter.concurrency == pytest.approx(4 * AIMD_DECREASE)
+    assert limiter.requests.tokens <= 0
+
+    limiter.succeeded()
+    assert limiter.requests.rate == pytest.approx(100 * (AIMD_DECREASE + AIMD_INCREASE))
+
+    for _ in range(100):
+        limiter.succeeded()
+    assert limiter.requests.rate == 100
+    assert limiter.tokens.rate == 1000
+    assert limiter.concurrency == 4
+
+
+def test_rate_limiter_never_drops_below_floor():
+    limiter = RateLimiter("test", requests_per_minute=100, max_concurrency=2)
+    for _ in range(50):
+        limiter.throttled()
+
+    assert limiter.requests.rate == pytest.approx(100 * 0.05)
+    assert limiter.concurrency == 1
+
+
+def test_rate_limiter_slot_counts_in_flight():
+    limiter = RateLimiter("test", requests_per_minute=100, max_concurrency=2)
+    with limiter.slot(tokens=10):
+        assert limiter.in_flight == 1
+        assert limiter.requests.tokens == pytest.approx(99, abs=0.1)
+    assert limiter.in_flight == 0
+
+
+def test_token_budget_exhausts_on_tokens_or_cost_and_resets_next_day():
+    budget = TokenBudget(max_tokens=100, max_cost=1.0)
+    budget.add(LLMCall("s", "claude", "m", input_tokens=60, output_tokens=30, cost=0.2))
+    assert not budget.exhausted()
+
+    budget.add(LLMCall("s", "claude", "m", input_tokens=5, output_tokens=5))
+    assert budget.exhausted()
+
+    budget.day = date.today() - timedelta(days=1)
+    assert not budget.exhausted()
+    assert budget.used_tokens == 0
+
+    budget.add(LLMCall("s", "claude", "m", cost=1.5))
+    assert budget.exhausted()
+
+
+def test_token_budget_persists_daily_usage_across_instances(tmp_path):
+    path = str(tmp_path / "budget.db")
+    first = TokenBudget(max_tokens=100, path=path)
+    first.add(LLMCall("s", "claude", "m", input_tokens=50, output_tokens=20, cost=0.1))
+
+    # 같은 날 다시 실행하거나 동시에 도는 다른 프로세스도 이미 쓴 양부터 셈
+    second = TokenBudget(max_tokens=100, path=path)
+    assert (second.used_tokens, second.used_cost) == (70, pytest.approx(0.1))
+    second.add(LLMCall("s", "claude", "m", input_tokens=30))
+    assert first.exhausted() and second.exhausted()
+
+    # 다음 날은 새 한도
+    second.day = date.today() - timedelta(days=1)
+    second._conn.execute("UPDATE usage SET day = ?", (second.day.isoformat(),))
+    assert not second.exhausted()
+    assert second.used_tokens == 0
+
+
+def test_ollama_stream_closes_non_200_response(monkeypatch):
+    import io
+
+    import requests
+
+    from modules.ai import llm_providers
+
+    class Raw(io.BytesIO):
+        released = False
+
+        def release_conn(self):
+            self.released = True
+
+    response = requests.Response()
+    response.status_code = 500
+    response.raw = Raw(b'{"error": "model not found"}')
+    monkeypatch.setattr(llm_providers.requests, "post", lambda *args, **kwargs: response)
+
+    provider = llm_providers.OllamaProvider(base_url="http://ollama.test")
+    returned, result, _, _ = provider._stream({"model": "m"})
+
+    assert returned is response and result is None
+    assert response.raw.released
+    assert "model not found" in response.text
+
+
+def test_token_budget_without_limits_is_never_exhausted():
+    budget = TokenBudget()
+    budget.add(LLMCall("s", "claude", "m", input_tokens=10**9, cost=10**6))
+    assert not budget.exhausted()
+
+
+LONG_TEXT = "충분히 긴 본문 문장입니다. " * 40
+
+
+def test_html_normalizer_keeps_allowed_markup_and_strips_the_rest():
+    from modules.ai import html_normalizer
+
+    result = html_normalizer.normalize(
+        f"<h3>소제목</h3><p>{LONG_TEXT}<b>굵게</b> <a href='javascript:alert(1)'>링크</a></p>"
+        "<script>alert(1)</script><div><span>감싼 글</span></div><img src='x.png'>"
+        "<a href=\"https://example.com/?a=1&b=2\">출처</a>"
+    )
+
+    assert result.ok
+    assert "<h3>소제목</h3>" in result.html
+    assert "<strong>굵게</strong>" in result.html
+    assert "script" not in result.html and "alert" not in result.html
+    assert "<div" not in result.html and "<img" not in result.html and "javascript" not in result.html
+    # 블록 밖으로 나온 글과 뒤따르는 링크는 한 문단으로 묶임
+    assert '<p>감싼 글<a href="https://example.com/?a=1&amp;b=2">출처</a></p>' in result.html
+    assert result.stats["headings"] == 1 and result.stats["links"] == 1
+
+
+def test_html_normalizer_repairs_structure():
+    from modules.ai import html_normalizer
+
+    result = html_normalizer.normalize(f"<p>{LONG_TEXT}<strong>안 닫힘</p></span></em><ul><li>하나<li>둘</ul><li>고아</li>")
+
+    assert result.html == (f"<p>{LONG_TEXT}<strong>안 닫힘</strong></p><ul><li>하나</li><li>둘</li></ul>"
+                           "<ul><li>고아</li></ul>")
+    # 생략 가능한 </li>와 직접 감싼 <ul>은 보정으로 세지 않음, 허용하지 않는 </span>은 세지 않고 버림
+    assert result.fixes == {"unclosed_tags": 1, "stray_end_tags": 1, "wrapped_list_items": 1}
+
+
+def test_html_normalizer_converts_markdown_and_bare_text():
+    from modules.ai import html_normalizer
+
+    result = html_normalizer.normalize(f"## 제목\n{LONG_TEXT}**강조**\n\n# 큰 제목\n두 번째 문단")
+
+    assert result.html == (f"<h2>제목</h2><p>{LONG_TEXT}<strong>강조</strong></p>"
+                           "<h2>큰 제목</h2><p>두 번째 문단</p>")
+    assert result.fixes["markdown"] == 3
+    assert result.stats["paragraphs"] == 2
+
+
+def test_html_normalizer_unwraps_json_and_code_fences():
+    import json
+    from modules.ai import html_normalizer
+
+    body = f"<p>{LONG_TEXT}</p>"
+    result = html_normalizer.normalize("```json\n" + json.dumps({"title": "t", "content": body}) + "\n```")
+
+    assert result.ok
+    assert result.html == body
+    assert result.fixes == {"code_fence": 1, "unwrapped_json": 1}
+
+
+def test_html_normalizer_rejects_bad_posts():
+    from modules.ai import html_normalizer
+
+    assert html_normalizer.normalize('{"title": "t", "content": "<p>끊긴 JSON').problems[0] == "raw_json"
+    assert html_normalizer.normalize("<p>짧은 글</p>").problems == ["too_short(4)"]
+    assert "code_fence" in html_normalizer.normalize(f"<p>{LONG_TEXT}</p>```python\nprint(1)```").problems
+
+    broken = LONG_TEXT + "</em>" * (html_normalizer.MAX_STRUCTURE_FIXES + 1)
+    assert html_normalizer.normalize(broken).problems == [f"malformed({html_normalizer.MAX_STRUCTURE_FIXES + 1})"]
+
+
+def test_track_usage_sums_every_call_for_a_post():
+    from concurrent.futures import ThreadPoolExecutor
+
+    from modules.ai import llm_metrics
+    from modules.storage import post_archive
+    from modules.ai.content_writer import Post
+    from modules.utils import logger
+
+    llm_metrics.record(LLMCall("s", "claude", "haiku", input_tokens=1000))  # 다른 글의 호출
+    with llm_metrics.track_usage() as usage:
+        llm_metrics.record(LLMCall("s", "claude", "haiku", input_tokens=100, output_tokens=10, cost=0.01))  # 요약
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            logger.submit(executor, llm_metrics.record,
+                          LLMCall("s", "ollama", "gemma", input_tokens=200, output_tokens=50, duration=2.0)).result()
+        llm_metrics.record(LLMCall("s", "ollama", "gemma", input_tokens=200, output_tokens=60, duration=3.0))  # 재생성
+    llm_metrics.record(LLMCall("s", "claude", "haiku", input_tokens=1000))
+    llm_metrics.reset()
+
+    post = Post(title="t", content="c", category="", tag=[])
+    llm = post_archive.generated_record(post, usage=usage)["llm"]
+    assert llm == {"provider": "ollama", "model": "gemma", "calls": 3, "input_tokens": 500, "output_tokens": 120,
+                   "cost": pytest.approx(0.01), "duration": pytest.approx(5.0)}
+    assert post_archive.generated_record(post, usage=llm_metrics.LLMUsage())["llm"] is None
+
+
+def test_sns_parse_trims_long_items_and_drops_only_invalid_ones():
+    import json
+
+    from modules.ai import post_writer
+
+    def sns(content):
+        return {"content": content, "hashtags": ["ai"], "call_to_action": "읽어보세요"}
+
+    raw = json.dumps({"posts": [
+        {"index": 1, "x": sns("가" * 400), "threads": sns("짧지 않은 스레드 문구입니다")},
+        {"index": 2, "x": sns("짧음"), "threads": sns("짧지 않은 스레드 문구입니다")},
+        {"index": 3, "x": sns("정상적인 X 포스트 문구"), "threads": sns("정상적인 스레드 문구입니다")},
+    ]}, ensure_ascii=False)
+
+    items = post_writer._parse(f"```json\n{raw}\n```")
+
+    assert [item.index for item in items] == [1, 3]
+    assert len(items[0].x.content) == post_writer.MAX_CONTENT_CHARS and items[0].x.content.endswith("…")
+    assert items[1].x.content == "정상적인 X 포스트 문구"
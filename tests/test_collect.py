@@ -1 +1,134 @@
-# 데이터 수집 테스트
\ No newline at end of file
+# 데이터 수집 테스트
+import threading
+
+import pytest
+
+from modules.models.article import Article, ROW_FIELDS
+from modules.utils.fingerprint import content_hash, hamming_distance, text_simhash
+
+
+def _article(**overrides):
+    values = dict(title="OpenAI releases a new model", content="<p>The model is faster and cheaper.</p>",
+                  url="https://example.com/a", source="reddit", subject="ai", published_at="2026-01-02T00:00:00Z",
+                  source_id="abc", score=12.0)
+    values.update(overrides)
+    return Article(**values)
+
+
+def test_fingerprint_ignores_markup_case_and_whitespace():
+    a = _article()
+    b = _article(title="  openai RELEASES a new   model ", content="The model is faster and cheaper.",
+                 url="https://example.com/b")
+
+    assert a.fingerprint == b.fingerprint == content_hash(f"{a.title}\n{a.content}")
+    assert a.simhash == b.simhash
+    # 해시는 지문 기준이라 URL이 달라도 같은 값
+    assert hash(a) == hash(b)
+
+
+def test_simhash_is_close_for_small_edits_and_far_for_different_text():
+    text = " ".join(f"word{i}" for i in range(200))
+    edited = text.replace("word10 ", "changed ")
+
+    assert hamming_distance(text_simhash(text), text_simhash(edited)) <= 3
+    assert hamming_distance(text_simhash(text), text_simhash("completely different story about sports")) > 3
+
+
+def test_row_round_trip_keeps_fields_and_64bit_simhash():
+    article = _article()
+    header = ["title", "content", "url", "source", "subject", "used", *ROW_FIELDS[5:]]
+    row = article.to_row(header)
+
+    assert row[header.index("used")] == ""
+    assert row[header.index("simhash")] == f"0x{article.simhash:016x}"
+    # 스프레드시트에서 숫자로 읽힌 셀도 원래 타입으로 복원
+    record = dict(zip(header, row), score="12")
+    restored = Article.from_row(record)
+    assert restored.to_dict() == article.to_dict()
+    assert restored.simhash == article.simhash
+
+
+def test_json_round_trip_does_not_recompute_fingerprint():
+    article = _article()
+    restored = Article.from_json(article.to_json())
+
+    assert restored.to_dict() == article.to_dict()
+    assert Article.from_dict({**article.to_dict(), "fingerprint": "given", "simhash": 5}).fingerprint == "given"
+
+
+FEED = """<?xml version="1.0"?><rss version="2.0"><channel><title>{name}</title>
+<item><guid>{name}-1</guid><title>{name} 기사</title><link>https://{name}/1</link><description>본문</description></item>
+</channel></rss>"""
+
+
+@pytest.fixture
+def feed_server():
+    """ETag를 주고 If-None-Match가 같으면 304를 돌려주는 로컬 RSS 서버"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            name = self.path.strip("/")
+            etag = f'"{name}-v1"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = FEED.format(name=name).encode("utf-8")
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Type", "application/rss+xml")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def test_rss_commit_records_only_the_committed_source(feed_server, tmp_path, monkeypatch):
+    from modules.collect import rss
+    from modules.storage.rss_state import RssState
+
+    state = RssState(str(tmp_path / "rss.db"))
+    monkeypatch.setattr(rss, "get_state", lambda: state)
+    monkeypatch.setattr(rss, "_pending", {})
+    first, second = [f"{feed_server}/a"], [f"{feed_server}/b"]
+    try:
+        a = rss.fetch_news_by_rss(first, set_name="s")
+        b = rss.fetch_news_by_rss(second, set_name="s")
+        assert [x.source_id for x in a + b] == ["a-1", "b-1"]
+
+        # 첫 번째 소스만 저장됨 - 두 번째 소스는 아직 저장 전이므로 304로 건너뛰면 안 됨
+        rss.commit_state("s", first, a)
+        assert state.validators("s", first[0]) == {"etag": '"a-v1"', "last_modified": None}
+        assert state.validators("s", second[0]) == {}
+
+        assert rss.fetch_news_by_rss(first, set_name="s") == []
+        assert [x.source_id for x in rss.fetch_news_by_rss(second, set_name="s")] == ["b-1"]
+        # 다른 세트는 같은 피드라도 따로 수집
+        assert [x.source_id for x in rss.fetch_news_by_rss(first, set_name="other")] == ["a-1"]
+    finally:
+        rss.close_pool()
+        state.close()
+
+
+def test_news_api_prune_cache_removes_old_date_directories(tmp_path):
+    from datetime import datetime, timedelta
+
+    from modules.collect import news_api
+
+    today = datetime.today()
+    days = [(today - timedelta(days=n)).strftime("%Y-%m-%d") for n in (0, 1, 2, 30)]
+    for day in days + ["keep-me"]:
+        (tmp_path / day).mkdir()
+        (tmp_path / day / "x.json").write_text("{}")
+
+    assert news_api.prune_cache(older_than_days=1, cache_dir=str(tmp_path)) == 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(days[:2] + ["keep-me"])
+    assert news_api.prune_cache(cache_dir=str(tmp_path / "missing")) == 0
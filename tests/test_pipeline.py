@@ -0,0 +1,87 @@
+from datetime import datetime
+
+import pytest
+
+import main
+from modules.ai.content_writer import Post
+from modules.storage.checkpoint import CheckpointStore
+
+TODAY = "2026-01-02"
+
+
+def _post(i):
+    return Post(title=f"제목 {i}", content="본문", category="", tag=["태그"], source_url=f"https://news/{i}")
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CheckpointStore(str(tmp_path / "checkpoints"))
+
+
+def test_checkpoint_round_trips_dataclasses_and_clears(store):
+    posts = [_post(0), _post(1)]
+
+    assert not store.is_done(TODAY, "a", "generate")
+    assert store.load(TODAY, "a", "generate", Post) is None
+
+    store.save(TODAY, "a", "generate", posts)
+    store.save(TODAY, "a", "enqueue", 2)
+
+    assert store.is_done(TODAY, "a", "generate")
+    assert store.load(TODAY, "a", "generate", Post) == posts
+    assert store.load(TODAY, "a", "enqueue") == 2
+    # 세트/날짜별로 따로 저장
+    assert not store.is_done(TODAY, "b", "generate")
+    assert not store.is_done("2026-01-03", "a", "generate")
+
+    store.clear(TODAY, "a", "generate")
+    assert not store.is_done(TODAY, "a", "generate")
+
+
+def test_run_stage_resume_uses_checkpoint_instead_of_running(store):
+    calls = []
+
+    def run():
+        calls.append(1)
+        return len(calls)
+
+    assert main.run_stage(store, TODAY, "a", "enqueue", run) == 1
+    assert main.run_stage(store, TODAY, "a", "enqueue", run, resume=True) == 1
+    assert main.run_stage(store, TODAY, "a", "enqueue", run) == 2
+    assert len(calls) == 2
+
+
+def test_only_stage_runs_just_that_stage_and_invalidates_dependents(store, monkeypatch):
+    old_posts, new_posts = [_post(0)], [_post(1), _post(2)]
+    store.save(TODAY, "a", "generate", old_posts)
+    store.save(TODAY, "a", "generate_sns", {"x": ["예전 글"]})
+    store.save(TODAY, "a", "enqueue", 1)
+    store.save(TODAY, "a", "clear_worksheet", None)
+    monkeypatch.setattr(main.content_writer, "generate_blog_post", lambda set_name, max_posts: new_posts)
+
+    account_set = {"accounts": [{"platform": "wordpress", "SITE_ID": "site"}]}
+    blog_posts, sns_posts = main.generate_set(store, TODAY, "a", account_set, only_stage="generate")
+
+    assert blog_posts == new_posts and sns_posts is None
+    # 새 글과 짝이 맞지 않는 SNS 글, 새 글이 들어가지 않은 대기열 체크포인트는 지워져서 --resume이 다시 실행
+    assert store.load(TODAY, "a", "generate", Post) == new_posts
+    assert not store.is_done(TODAY, "a", "generate_sns")
+    assert not store.is_done(TODAY, "a", "enqueue")
+    assert store.is_done(TODAY, "a", "clear_worksheet")
+
+
+def test_only_stage_clear_worksheet_runs_without_generate_checkpoint(store, monkeypatch):
+    cleared, enqueued = [], []
+    account_set = {"topic": "t", "accounts": [{"platform": "wordpress", "SITE_ID": "site"}]}
+    monkeypatch.setattr(main, "load_accounts", lambda: {"a": account_set})
+    monkeypatch.setattr(main, "CheckpointStore", lambda: store)
+    monkeypatch.setattr(main, "finish_run", lambda: None)
+    monkeypatch.setattr(main.spreadsheet, "clear_worksheet", lambda set_name, archive: cleared.append(set_name))
+    monkeypatch.setattr(main.publish_queue, "enqueue_posts", lambda *args, **kwargs: enqueued.append(args))
+    monkeypatch.setattr(main.publish_queue, "drain", lambda account_sets: [])
+
+    main.main(only_stage="clear_worksheet")
+
+    assert cleared == ["a"]
+    assert enqueued == []
+    assert store.is_done(datetime.now().strftime("%Y-%m-%d"), "a", "clear_worksheet")
@@ -1 +1,212 @@
-# 업로드 기능 테스트
\ No newline at end of file
+import functools
+import os
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from modules.ai.content_writer import Post
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "tistory")
+
+
+@pytest.fixture
+def stub_editor():
+    """로컬 티스토리 에디터 스텁 서버 - (에디터 URL, 저장 API로 보낸 글 목록)"""
+    saved = []
+
+    class Handler(SimpleHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/manage/post.json":
+                saved.append(parse_qs(url.query))
+            super().do_GET()
+
+        def log_message(self, *args):
+            pass
+
+    handler = functools.partial(Handler, directory=FIXTURE_DIR)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/newpost.html", saved
+    server.shutdown()
+
+
+@pytest.fixture
+def tistory_pool(tmp_path):
+    tistory = pytest.importorskip("modules.publisher.tistory")
+    pool = tistory.TistoryBrowserPool(headless=True, state_dir=str(tmp_path))
+    try:
+        pool._executor.submit(pool._ensure_browser).result()
+    except Exception as e:
+        pool._executor.shutdown()
+        pytest.skip(f"Chromium을 실행할 수 없습니다: {e}")
+    yield pool
+    pool.close()
+
+
+def test_tistory_publishes_back_to_back_on_one_browser(tistory_pool, stub_editor, tmp_path):
+    from modules.publisher import tistory
+
+    editor_url, saved = stub_editor
+    account = {"platform": "tistory", "blog_name": "stub", "editor_url": editor_url}
+    posts = [
+        Post(title=f"제목 {i}", content=f"<h3>본문 {i}</h3>", category="", tag=["태그", f"t{i}"])
+        for i in range(2)
+    ]
+    browser = tistory_pool._browser
+
+    results = tistory.publish(posts, account, pool=tistory_pool)
+
+    assert tistory_pool._browser is browser
+    assert len(saved) == len(posts)
+    for post, query, result in zip(posts, saved, results):
+        assert query["title"] == [post.title]
+        assert query["content"] == [post.content]
+        assert query["tags"] == [f"태그,{post.tag[1]},"]
+        # 원격 글 번호와 주소는 저장 API 응답의 entryUrl에서
+        assert result == {"id": "123", "link": "https://stub.tistory.com/123"}
+    # 로그인 세션(storage state)이 계정별로 저장됨
+    assert (tmp_path / "stub.json").exists()
+
+
+def _wordpress_set(window, spacing=60):
+    return {
+        "accounts": [{"platform": "wordpress", "SITE_ID": "site"}],
+        "publish_window": window,
+        "min_spacing_minutes": spacing,
+    }
+
+
+def _posts(prefix, count):
+    return [Post(title=f"{prefix} {i}", content="본문", category="", tag=[], source_url=f"https://{prefix}/{i}")
+            for i in range(count)]
+
+
+def test_schedule_is_reproducible_with_the_same_seed():
+    from datetime import date
+    from modules.publisher import scheduler
+
+    set_posts = [("a", _wordpress_set([9, 21]), _posts("a", 4))]
+    first = scheduler.build_schedule(set_posts, day=date(2026, 1, 2), seed=7)
+
+    assert first == scheduler.build_schedule(set_posts, day=date(2026, 1, 2), seed=7)
+    assert first != scheduler.build_schedule(set_posts, day=date(2026, 1, 2), seed=8)
+
+
+def test_schedule_spaces_posts_of_all_sets_on_a_shared_site():
+    from datetime import date
+    from modules.publisher import scheduler
+
+    set_posts = [
+        ("a", _wordpress_set([9, 21]), _posts("a", 3)),
+        ("b", _wordpress_set([9, 21]), _posts("b", 3)),
+    ]
+    schedule = scheduler.build_schedule(set_posts, day=date(2026, 1, 2), seed=1)
+
+    times = sorted(schedule.values())
+    assert len(times) == 6
+    assert all(t.date() == date(2026, 1, 2) and 9 <= t.hour < 21 for t in times)
+    assert all((later - earlier).total_seconds() >= 60 * 60 for earlier, later in zip(times, times[1:]))
+
+
+def test_schedule_avoids_reserved_times():
+    from datetime import date
+    from modules.publisher import scheduler
+
+    day = date(2026, 1, 2)
+    first = scheduler.build_schedule([("a", _wordpress_set([9, 12]), _posts("a", 2))], day=day, seed=1)
+    reserved = {}
+    for (site, _), at in first.items():
+        reserved.setdefault(site, []).append(at)
+
+    # 같은 시드로 다른 세트를 따로 배치해도 이미 잡힌 시각과 간격을 유지
+    second = scheduler.build_schedule([("b", _wordpress_set([9, 12]), _posts("b", 1))], day=day, seed=1,
+                                      reserved=reserved)
+
+    (at,) = second.values()
+    assert all(abs((at - other).total_seconds()) >= 60 * 60 for other in first.values())
+
+
+def test_unimplemented_sns_platform_is_unsupported_not_failed(tmp_path):
+    from modules.publisher import runner
+    from modules.storage.publish_ledger import PublishLedger
+
+    ledger = PublishLedger(str(tmp_path / "ledger.db"))
+    account_set = {"topic": "t", "accounts": [{"platform": "x", "username": "me"}]}
+    posts = _posts("a", 2)
+
+    (summary,) = runner.publish_all(account_set, posts, "a", sns_posts={"x": ["첫 글", "둘째 글"]}, ledger=ledger)
+
+    assert (summary.succeeded, summary.failed, summary.unsupported) == (0, 0, 2)
+    assert not summary.errors
+    # 미구현 플랫폼은 발행 기록을 남기지 않고, SNS 글을 만들 대상도 아님
+    assert not ledger.is_published("x:me", "x:url:https://a/0")
+    assert not runner.sns_implemented("x") and not runner.sns_implemented("threads")
+    ledger.close()
+
+
+@pytest.fixture
+def job_queue(tmp_path):
+    from modules.storage.job_queue import JobQueue
+
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    yield queue
+    queue.close()
+
+
+def test_enqueue_posts_adds_each_post_once(job_queue):
+    from modules.publisher import publish_queue
+
+    account_set = _wordpress_set([9, 21])
+    posts = _posts("a", 2)
+
+    assert publish_queue.enqueue_posts("a", account_set, posts, queue=job_queue) == 2
+    # --resume 등으로 다시 넣어도 같은 글은 추가되지 않음, 다른 세트는 따로
+    assert publish_queue.enqueue_posts("a", account_set, posts + _posts("b", 1), queue=job_queue) == 1
+    assert publish_queue.enqueue_posts("b", account_set, posts, queue=job_queue) == 2
+    assert job_queue.depth()[publish_queue.PUBLISH_QUEUE] == {"pending": 5}
+
+
+def test_work_once_retries_failed_publish_until_max_attempts(job_queue, monkeypatch):
+    from modules.publisher import publish_queue, runner
+
+    def publish_all(account_set, posts, set_name, sns_posts, schedule):
+        return [runner.PublishSummary(account="wordpress:site", platform="wordpress", failed=1)]
+
+    monkeypatch.setattr(runner, "publish_all", publish_all)
+    monkeypatch.setattr(publish_queue, "_archive_results", lambda *args: None)
+    monkeypatch.setattr(publish_queue, "RETRY_DELAY", 0)
+    publish_queue.enqueue_posts("a", _wordpress_set([9, 21]), _posts("a", 1), queue=job_queue)
+    account_sets = {"a": _wordpress_set([9, 21])}
+
+    for _ in range(publish_queue.MAX_ATTEMPTS):
+        assert publish_queue.work_once(account_sets, job_queue) == []
+    assert publish_queue.work_once(account_sets, job_queue) is None
+    assert job_queue.depth()[publish_queue.PUBLISH_QUEUE] == {"failed": 1}
+
+
+def test_publish_skips_posts_already_in_the_ledger(tmp_path, monkeypatch):
+    from modules.publisher import runner, wordpress
+    from modules.storage.publish_ledger import PublishLedger
+
+    ledger = PublishLedger(str(tmp_path / "ledger.db"))
+    published = []
+
+    def publish_post(post, acc, set_name, publish_at):
+        published.append(post.title)
+        return {"id": len(published), "link": f"https://site/{len(published)}"}
+
+    monkeypatch.setattr(wordpress, "publish_post", publish_post)
+    account_set = {"topic": "t", **_wordpress_set([9, 21])}
+    posts = _posts("a", 2)
+
+    (first,) = runner.publish_all(account_set, posts[:1], "a", sns_posts=None, ledger=ledger)
+    (second,) = runner.publish_all(account_set, posts, "a", sns_posts=None, ledger=ledger)
+
+    assert (first.succeeded, second.succeeded, second.skipped) == (1, 1, 1)
+    assert published == ["a 0", "a 1"]
+    assert ledger.get("wordpress:site", "url:https://a/1")["remote_id"] == "2"
+    ledger.close()
@@ -0,0 +1,283 @@
+import time
+
+import pytest
+
+from modules.storage import job_queue
+from modules.storage.job_queue import JobQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    yield queue
+    queue.close()
+
+
+def _status(queue, name="q"):
+    return queue.depth().get(name, {})
+
+
+def test_job_queue_put_dedups_by_key_and_leases_in_order(queue):
+    first = queue.put("q", {"n": 1}, dedup_key="a")
+    second = queue.put("q", {"n": 2}, dedup_key="b")
+
+    assert first is not None and second is not None
+    assert queue.put("q", {"n": 3}, dedup_key="a") is None
+    # 같은 키라도 다른 큐면 따로 등록
+    assert queue.put("other", {"n": 4}, dedup_key="a") is not None
+
+    job = queue.lease("q")
+    assert (job.id, job.payload, job.attempts) == (first, {"n": 1}, 1)
+    assert queue.ack(job)
+    assert queue.lease("q").payload == {"n": 2}
+    assert queue.lease("q") is None
+    assert _status(queue) == {job_queue.DONE: 1, job_queue.RUNNING: 1}
+
+
+def test_job_queue_delayed_jobs_are_not_leased_early(queue):
+    queue.put("q", {}, delay=60)
+
+    assert queue.lease("q") is None
+
+
+def test_job_queue_reclaims_expired_lease_and_fences_stale_worker(queue):
+    queue.put("q", {"n": 1})
+    stale = queue.lease("q", visibility_timeout=0)
+
+    # 점유 시간이 지나 다른 워커가 다시 꺼냄
+    fresh = queue.lease("q", visibility_timeout=60)
+    assert fresh.id == stale.id and fresh.attempts == 2
+
+    # 이전 워커의 완료/실패 처리는 반영되지 않음
+    assert not queue.ack(stale)
+    assert not queue.fail(stale, "늦은 실패")
+    assert _status(queue) == {job_queue.RUNNING: 1}
+
+    assert queue.ack(fresh)
+    assert _status(queue) == {job_queue.DONE: 1}
+
+
+def test_job_queue_fail_retries_then_marks_failed(queue):
+    queue.put("q", {}, max_attempts=2)
+
+    job = queue.lease("q")
+    assert queue.fail(job, "첫 실패", retry_delay=0)
+    assert _status(queue) == {job_queue.PENDING: 1}
+
+    job = queue.lease("q")
+    assert job.attempts == 2
+    assert not queue.fail(job, "두 번째 실패", retry_delay=0)
+    assert _status(queue) == {job_queue.FAILED: 1}
+    assert queue.lease("q") is None
+
+
+def test_job_queue_retry_delay_backs_off(queue):
+    queue.put("q", {}, max_attempts=3)
+    job = queue.lease("q")
+    queue.fail(job, "실패", retry_delay=60)
+
+    assert queue.lease("q") is None
+
+
+def test_job_queue_expired_lease_past_max_attempts_fails_instead_of_releasing(queue):
+    queue.put("q", {}, max_attempts=1)
+    queue.lease("q", visibility_timeout=0)
+
+    # 워커가 죽어 점유 시간이 지났지만 재시도 한도를 다 썼으므로 다시 꺼내지 않음
+    assert queue.lease("q") is None
+    assert _status(queue) == {job_queue.FAILED: 1}
+
+
+def test_job_queue_prune_keeps_recent_and_unfinished_jobs(queue):
+    queue.put("q", {"n": 1})
+    queue.put("q", {"n": 2})
+    queue.ack(queue.lease("q"))
+
+    assert queue.prune(older_than_days=1) == 0
+    assert queue.prune(older_than_days=-1) == 1
+    assert _status(queue) == {job_queue.PENDING: 1}
+
+
+def test_job_queue_payloads_since(queue):
+    queue.put("q", {"n": 1})
+    queue.put("other", {"n": 2})
+
+    assert queue.payloads("q", since=time.time() - 60) == [{"n": 1}]
+    assert queue.payloads("q", since=time.time() + 60) == []
+
+
+class FakeWorksheet:
+    """batch_get만 흉내 내는 워크시트 - 범위별로 열 단위(column-major) 값을 돌려주고 끝의 빈 칸은 잘라냄"""
+
+    def __init__(self, rows):
+        self.rows = rows  # 1행(헤더)부터
+        self.requests = []
+
+    def batch_get(self, ranges, major_dimension=None):
+        import re
+        from gspread.utils import a1_to_rowcol
+
+        self.requests.append(list(ranges))
+        result = []
+        for a1 in ranges:
+            start, end = a1.split(":")
+            row, col = a1_to_rowcol(start)
+            last = int(re.sub(r"[A-Z]", "", end) or len(self.rows))
+            column = [r[col - 1] if col - 1 < len(r) else "" for r in self.rows[row - 1:last]]
+            while column and not column[-1]:
+                column.pop()
+            result.append([column] if column else [])
+        return result
+
+
+@pytest.fixture
+def fake_sheet(monkeypatch):
+    from modules.storage import spreadsheet
+
+    header = ["title", "content", "url", "source", "subject", "used", "published_at", "source_id", "score",
+              "fingerprint", "simhash"]
+
+    def row(title, content, used="", simhash=""):
+        return [title, content, f"https://{title}", "rss", "s", used, "", "", "", f"fp-{title}", simhash]
+
+    worksheet = FakeWorksheet([
+        header,
+        row("중복", "본문 2", simhash="ff"),
+        row("중복", "본문 3", used="Y"),
+        row("중복", "본문 4"),
+        row("다른", ""),
+        row("사용", "본문 6", used="Y"),
+        row("사용", "본문 7", used="Y"),
+        row("끝", "본문 8")[:6],  # 뒤쪽 빈 칸은 시트가 잘라서 돌려줌
+    ])
+    monkeypatch.setitem(spreadsheet._worksheets, "fake", worksheet)
+    monkeypatch.setitem(spreadsheet._headers, "fake", header)
+    return worksheet
+
+
+def test_iter_unused_topics_returns_real_row_indices_with_duplicates(fake_sheet):
+    from modules.storage import spreadsheet
+
+    topics = list(spreadsheet.iter_unused_topics("fake"))
+
+    assert [(t["row_index"], t["title"], t["content"]) for t in topics] == [
+        (2, "중복", "본문 2"),
+        (4, "중복", "본문 4"),
+        (5, "다른", ""),
+        (8, "끝", "본문 8"),
+    ]
+    assert topics[0]["simhash"] == 0xFF and topics[1]["simhash"] == 0
+    assert topics[0]["url"] == "https://중복" and topics[3]["fingerprint"] == ""
+
+
+def test_iter_unused_topics_fetches_content_only_for_unused_runs(fake_sheet):
+    from modules.storage import spreadsheet
+
+    list(spreadsheet.iter_unused_topics("fake"))
+
+    # 첫 요청은 주제 컬럼, 두 번째는 미사용 행의 연속 구간별 content
+    assert len(fake_sheet.requests) == 2
+    assert fake_sheet.requests[1] == ["B2:B2", "B4:B5", "B8:B8"]
+    assert spreadsheet._row_runs([2, 4, 5, 8]) == [(2, 2), (4, 5), (8, 8)]
+    assert spreadsheet._row_runs([]) == []
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    from modules.storage.publish_ledger import PublishLedger
+
+    ledger = PublishLedger(str(tmp_path / "ledger.db"))
+    yield ledger
+    ledger.close()
+
+
+def test_ledger_records_and_reads_back_remote_ids(ledger):
+    assert not ledger.is_published("wordpress:site", "url:a")
+    assert ledger.get("wordpress:site", "url:a") is None
+
+    ledger.record("wordpress:site", "url:a", "wordpress", remote_id=17, url="https://site/17", title="제목")
+
+    assert ledger.is_published("wordpress:site", "url:a")
+    assert not ledger.is_published("tistory:blog", "url:a")
+    entry = ledger.get("wordpress:site", "url:a")
+    assert (entry["remote_id"], entry["url"], entry["title"]) == ("17", "https://site/17", "제목")
+
+
+def test_ledger_prune_removes_only_old_records(ledger):
+    ledger.record("wordpress:site", "url:old", "wordpress")
+    ledger.record("wordpress:site", "url:new", "wordpress")
+    with ledger._conn:
+        ledger._conn.execute("UPDATE published SET published_at = '2000-01-01T00:00:00' WHERE post_key = 'url:old'")
+
+    assert ledger.prune(older_than_days=90) == 1
+    assert not ledger.is_published("wordpress:site", "url:old")
+    assert ledger.is_published("wordpress:site", "url:new")
+
+
+def test_ledger_keys():
+    from types import SimpleNamespace
+
+    from modules.storage.publish_ledger import account_key, post_key
+
+    assert account_key({"platform": "wordpress", "SITE_ID": 3}) == "wordpress:3"
+    assert account_key({"platform": "x", "username": "me"}) == "x:me"
+    assert post_key(SimpleNamespace(source_url="https://a")) == "url:https://a"
+    untitled = post_key(SimpleNamespace(source_url="", title="t", content="c"))
+    assert untitled.startswith("sha256:") and untitled == post_key("t\nc")
+
+
+def _write_records(path, *records):
+    from array import array
+
+    with open(path, "ab") as f:
+        array("Q", [value for record in records for value in record]).tofile(f)
+
+
+def test_similarity_index_finds_near_duplicates_only(tmp_path):
+    from modules.storage.similarity_index import SimilarityIndex
+
+    index = SimilarityIndex(str(tmp_path / "a.bin"))
+    base = 0x0123_4567_89AB_CDEF
+    index.add(base)
+
+    # 서로 다른 구간의 비트 3개가 바뀌어도 한 구간은 같으므로 찾음
+    near = base ^ (1 << 0) ^ (1 << 20) ^ (1 << 40)
+    assert index.find(near) == base
+    assert index.find(base ^ 0b111) == base
+    # 거리 4 이상이거나 완전히 다른 글은 중복이 아님
+    assert index.find(base ^ 0b1111) is None
+    assert index.find(~base & (2 ** 64 - 1)) is None
+    assert index.find(0) is None
+    assert len(index) == 1
+
+
+def test_similarity_index_persists_and_sees_other_writers(tmp_path):
+    from modules.storage.similarity_index import SimilarityIndex
+
+    path = str(tmp_path / "a.bin")
+    writer, reader = SimilarityIndex(path), SimilarityIndex(path)
+    writer.add(0xAAAA, 0, 0xBBBB)
+
+    assert reader.find(0xAAAA) == 0xAAAA
+    assert len(SimilarityIndex(path)) == 2
+
+
+def test_similarity_index_drops_records_past_retention_and_compacts(tmp_path):
+    import os
+    import time
+
+    from modules.storage.similarity_index import SimilarityIndex
+
+    path = str(tmp_path / "a.bin")
+    now = int(time.time())
+    day = 24 * 60 * 60
+    _write_records(path, (0x1111, now - 40 * day), (0x2222, now - 31 * day), (0x3333, now - 29 * day))
+
+    index = SimilarityIndex(path, retention_days=30)
+
+    assert index.find(0x1111) is None and index.find(0x2222) is None
+    assert index.find(0x3333) == 0x3333
+    # 만료된 기록이 남은 기록보다 많으므로 파일을 남은 기록만으로 다시 씀
+    assert os.path.getsize(path) == 16
+    index.add(0x4444)
+    assert len(SimilarityIndex(path, retention_days=30)) == 2